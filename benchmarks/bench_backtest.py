@@ -0,0 +1,81 @@
+# benchmarks/bench_backtest.py
+"""
+run_backtest 벡터화 전/후 성능 비교 벤치마크.
+기존 행 단위 루프 구현과 결과가 동일한지 검증한 뒤 실행 시간을 비교합니다.
+
+실행: python benchmarks/bench_backtest.py [--years 25] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzer import MarketAnalyzer
+from benchmarks.synthetic import make_prices
+
+
+def legacy_run_backtest(df: pd.DataFrame, buy_quantity: int = 50):
+    """벡터화 이전의 행 단위 구현 (비교용)"""
+    total_quantity = 0
+    total_investment = 0
+    df['Buy_Signal'] = ""
+    df['Buy_Qty'] = 0
+    df['Buy_Amount'] = 0.0
+
+    for i in range(1, len(df)):
+        if not pd.isna(df['Std_Level_1'].iloc[i]) and df['Return'].iloc[i] < df['Std_Level_1'].iloc[i]:
+            price = df['Close'].iloc[i]
+            df.at[df.index[i], 'Buy_Signal'] = "매수"
+            df.at[df.index[i], 'Buy_Qty'] = buy_quantity
+            df.at[df.index[i], 'Buy_Amount'] = price * buy_quantity
+
+            total_quantity += buy_quantity
+            total_investment += (price * buy_quantity)
+
+    return df, total_quantity, total_investment
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run_backtest 벤치마크")
+    parser.add_argument("--years", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = MarketAnalyzer.calculate_statistics(make_prices(args.years), window=252)
+    overall_std = base['Return'].std()
+    base['Std_Level_1'] = -overall_std
+
+    legacy_df, legacy_qty, legacy_invest = legacy_run_backtest(base.copy(), buy_quantity=100)
+    new_df, new_qty, new_invest = MarketAnalyzer.run_backtest(base.copy(), buy_quantity=100)
+
+    # 결과 동일성 검증
+    assert legacy_qty == new_qty, (legacy_qty, new_qty)
+    assert legacy_invest == new_invest, (legacy_invest, new_invest)
+    for col in ['Buy_Signal', 'Buy_Qty', 'Buy_Amount']:
+        assert (legacy_df[col].to_numpy() == new_df[col].to_numpy()).all(), col
+
+    legacy_time = best_of(lambda: legacy_run_backtest(base.copy(), buy_quantity=100), args.repeat)
+    new_time = best_of(lambda: MarketAnalyzer.run_backtest(base.copy(), buy_quantity=100), args.repeat)
+
+    print(f"bars: {len(base)} ({args.years}y), buys: {int((new_df['Buy_Signal'] == '매수').sum())}")
+    print(f"legacy loop : {legacy_time * 1000:9.2f} ms")
+    print(f"vectorized  : {new_time * 1000:9.2f} ms")
+    print(f"speedup     : {legacy_time / new_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
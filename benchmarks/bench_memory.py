@@ -0,0 +1,116 @@
+# benchmarks/bench_memory.py
+"""
+분석 결과 프레임 표현의 메모리 비교 벤치마크.
+파이프라인에서 분석 단계와 출력 단계 사이에 종목별 결과가 쌓이는 상황을 재현해
+기존 표현(전체 컬럼 복사, 문자열 Buy_Signal, 원본 이력 보관, replace/fillna 복사)과
+압축 표현(MarketAnalyzer.compact)의 종목당 최대 RSS와 보관 프레임 크기를 측정합니다.
+각 방식은 별도 프로세스에서 실행되므로 최대 RSS가 섞이지 않습니다.
+
+실행: python benchmarks/bench_memory.py [--tickers 300] [--years 5]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _rss_bytes() -> int:
+    """현재 프로세스의 최대 RSS (ru_maxrss: Linux는 KB, macOS는 byte 단위)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def analyze(mode: str, ticker: str, years: float) -> dict:
+    """main.analyze_ticker와 같은 순서로 한 종목을 분석하고, 출력 단계로 넘길 작업 dict를 반환합니다."""
+    from config import settings
+    from src.analyzer import MarketAnalyzer
+    from src.data_fetcher import DataFetcher
+    from benchmarks.synthetic import make_ohlcv
+
+    fetched = DataFetcher.normalize_index(make_ohlcv(ticker, years=years))
+    start = fetched.index[0]
+    if mode == "legacy":
+        df = fetched.loc[start:].copy()
+    else:
+        df = fetched.loc[start:, ['Close']]
+
+    df = MarketAnalyzer.calculate_statistics(df, window=settings.LOOKBACK_PERIOD)
+    overall_std = df['Return'].std()
+    df['Std_Level_1'] = -overall_std
+    df['Std_Level_2'] = -overall_std * 2
+    df['Std_Level_3'] = -overall_std * 3
+    df, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=100)
+    summary = MarketAnalyzer.build_summary(ticker, df, total_qty, total_invest, overall_std, "", "", settings.THRESHOLDS)
+
+    if mode == "legacy":
+        # 기존 표현: 문자열 매수 여부, 원본 이력까지 작업에 보관
+        df['Buy_Signal'] = df['Buy_Signal'].astype(str).astype(object)
+        return {'ticker': ticker, 'fetched': fetched, 'df': df, 'summary': summary}
+    return {'ticker': ticker, 'df': MarketAnalyzer.compact(df), 'summary': summary}
+
+
+def run_mode(mode: str, n_tickers: int, years: float) -> dict:
+    import pandas as pd  # noqa: F401  (기준 RSS에 라이브러리 로드분을 포함)
+    from src.analyzer import MarketAnalyzer  # noqa: F401
+    from benchmarks.synthetic import ticker_names
+
+    baseline = _rss_bytes()
+    jobs = [analyze(mode, ticker, years) for ticker in ticker_names(n_tickers)]
+    retained = sum(int(job['df'].memory_usage(deep=True).sum()) for job in jobs)
+    retained += sum(int(job['fetched'].memory_usage(deep=True).sum()) for job in jobs if 'fetched' in job)
+
+    # 출력 단계: 기존 방식은 시트 쓰기 전에 inf/NaN 정리용 전체 복사본을 만듭니다.
+    for job in jobs:
+        if mode == "legacy":
+            clean_df = job['df'].replace([float('inf'), float('-inf')], 0).fillna(0)
+            del clean_df
+
+    peak = _rss_bytes()
+    return {
+        "mode": mode,
+        "tickers": n_tickers,
+        "rows_per_ticker": len(jobs[0]['df']),
+        "columns": list(jobs[0]['df'].columns),
+        "retained_bytes_per_ticker": retained // n_tickers,
+        "peak_rss_bytes_per_ticker": (peak - baseline) // n_tickers,
+        "peak_rss_bytes": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 결과 프레임 메모리 비교")
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--mode", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.tickers, args.years)))
+        return
+
+    results = {}
+    for mode in ("legacy", "compact"):
+        command = [sys.executable, os.path.abspath(__file__), "--mode", mode,
+                   "--tickers", str(args.tickers), "--years", str(args.years)]
+        completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            raise SystemExit(f"mode {mode} failed")
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    for mode, result in results.items():
+        print(f"{mode:<8} {result['tickers']} tickers x {result['rows_per_ticker']} rows: "
+              f"retained {result['retained_bytes_per_ticker'] / 1024:7.1f} KiB/ticker, "
+              f"peak RSS {result['peak_rss_bytes_per_ticker'] / 1024:7.1f} KiB/ticker "
+              f"({len(result['columns'])} columns)")
+    ratio = results["compact"]["peak_rss_bytes_per_ticker"] / max(1, results["legacy"]["peak_rss_bytes_per_ticker"])
+    print(f"compact peak RSS per ticker: {ratio:.0%} of legacy")
+
+
+if __name__ == "__main__":
+    main()
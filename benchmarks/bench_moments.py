@@ -0,0 +1,106 @@
+# benchmarks/bench_moments.py
+"""
+이동 통계 커널 벤치마크.
+기존 pandas 구현(컬럼마다 rolling 한 번씩)과 src/moments.rolling_moments를 한 종목 시리즈와
+봉 × 종목 패널에서 각각 비교하고, 윈도우를 직접 두 번 순회해 구한 표준편차 대비 상대 오차를 출력합니다.
+정밀도 비교용 시세는 가격이 수천 배 변하는 고변동성 경로(3배 레버리지 ETF 수준)입니다.
+numba가 없으면 커널이 파이썬 루프로 실행되므로 --bars/--tickers를 줄여서 실행하세요.
+
+실행: python benchmarks/bench_moments.py [--bars 6300] [--tickers 500] [--window 252] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import moments
+
+
+def pandas_statistics(close: pd.DataFrame, window: int) -> dict:
+    """기존 calculate_statistics와 같은 pandas 계산 (Std_Level 제외)"""
+    returns = close.pct_change(fill_method=None)
+    sma = close.rolling(window=window).mean()
+    std = close.rolling(window=window).std()
+    return {
+        'Return': returns,
+        'Vol_Std': returns.rolling(window=window).std(),
+        'SMA_Price': sma,
+        'STD_Price': std,
+        'Z_Score': (close - sma) / std,
+    }
+
+
+def leveraged_path(bars: int, seed: int = 7) -> np.ndarray:
+    """일 변동성 6%에 상승 추세가 있어 가격 수준이 수천 배 변하는 경로"""
+    rng = np.random.default_rng(seed)
+    return 0.1 * np.cumprod(1 + rng.normal(0.003, 0.06, bars))
+
+
+def best_time(fn, repeat: int) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def max_relative_error(actual: np.ndarray, expected: np.ndarray) -> float:
+    valid = ~np.isnan(expected)
+    if (np.isnan(actual) != ~valid).any():
+        return float("inf")
+    return float(np.max(np.abs(actual[valid] - expected[valid]) / np.abs(expected[valid])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이동 통계 커널 벤치마크")
+    parser.add_argument("--bars", type=int, default=6300)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--window", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    window = args.window
+    print(f"window={window}, numba {'JIT' if moments.JIT_ENABLED else 'disabled (Python loop)'}")
+
+    close = leveraged_path(args.bars)
+    series = pd.DataFrame({'Close': close})
+    baseline = best_time(lambda: pandas_statistics(series, window), args.repeat)
+    fused = best_time(lambda: moments.rolling_moments(close, window), args.repeat)
+    summary_only = best_time(
+        lambda: moments.rolling_moments(close, window, ('Return', 'SMA_Price', 'STD_Price', 'Z_Score')), args.repeat
+    )
+    print(f"  series {args.bars} bars: pandas {baseline * 1e3:7.2f}ms  fused {fused * 1e3:7.2f}ms "
+          f"x{baseline / fused:5.1f}  (without Vol_Std {summary_only * 1e3:6.2f}ms)")
+
+    # 정밀도: 윈도우마다 두 번 순회한 표준편차(np.std)를 기준값으로 사용
+    exact = np.full(len(close), np.nan)
+    exact[window - 1:] = np.lib.stride_tricks.sliding_window_view(close, window).std(axis=1, ddof=1)
+    expected = pandas_statistics(series, window)
+    actual = moments.rolling_moments(close, window)
+    print(f"  STD_Price max rel error vs two-pass: pandas {max_relative_error(expected['STD_Price']['Close'].to_numpy(), exact):.1e}"
+          f"  fused {max_relative_error(actual['STD_Price'], exact):.1e}"
+          f"  (price {close.min():.3g}..{close.max():.3g})")
+
+    # 패널: 상장일이 다른 종목이 섞이도록 앞부분을 NaN으로 둡니다.
+    rng = np.random.default_rng(11)
+    panel = 20 * np.cumprod(1 + rng.normal(0.0005, 0.03, (args.bars, args.tickers)), axis=0)
+    starts = rng.integers(0, args.bars // 2, args.tickers)
+    panel[np.arange(args.bars)[:, None] < starts[None, :]] = np.nan
+    frame = pd.DataFrame(panel)
+    baseline = best_time(lambda: pandas_statistics(frame, window), max(1, args.repeat // 5))
+    fused = best_time(lambda: moments.rolling_moments(panel, window), max(1, args.repeat // 5))
+    expected = pandas_statistics(frame, window)
+    actual = moments.rolling_moments(panel, window)
+    worst = max(max_relative_error(actual[name], expected[name].to_numpy()) for name in ('Vol_Std', 'SMA_Price', 'Z_Score'))
+    print(f"  panel {args.bars}x{args.tickers}: pandas {baseline:6.2f}s  fused {fused:6.2f}s  x{baseline / fused:5.1f}  "
+          f"max rel diff vs pandas {worst:.1e}")
+
+
+if __name__ == "__main__":
+    main()
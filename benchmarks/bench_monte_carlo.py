@@ -0,0 +1,73 @@
+# benchmarks/bench_monte_carlo.py
+"""
+몬테카를로/부트스트랩 견고성 점검 벤치마크.
+합성 종가로 src/monte_carlo.MonteCarlo.run을 실행해 종목 수 × 경로 수 전체 시간과 최대 메모리(tracemalloc)를 출력하고,
+실제 경로 한 개의 결과(hist_roi, hist_buys)가 MarketAnalyzer.run_backtest와 같은지 확인합니다.
+
+실행: python benchmarks/bench_monte_carlo.py [--tickers 7] [--paths 10000] [--years 5] [--method bootstrap]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import monte_carlo
+from src.analyzer import MarketAnalyzer
+from src.monte_carlo import MonteCarlo
+from benchmarks.synthetic import make_ohlcv, ticker_names
+
+
+def backtest_roi(close) -> tuple:
+    """main.py와 같은 방식(기간 전체 등락률 표준편차 기준)의 기존 백테스트 ROI와 매수 횟수"""
+    df = close.to_frame('Close')
+    df['Return'] = df['Close'].pct_change(fill_method=None)
+    df['Std_Level_1'] = -df['Return'].std()
+    df, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=1)
+    roi = total_qty * df['Close'].iloc[-1] / total_invest - 1 if total_invest > 0 else 0.0
+    return roi, total_qty
+
+
+def main():
+    parser = argparse.ArgumentParser(description="몬테카를로/부트스트랩 견고성 점검 벤치마크")
+    parser.add_argument("--tickers", type=int, default=7)
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--method", choices=("bootstrap", "gbm", "both"), default="bootstrap")
+    args = parser.parse_args()
+
+    closes = {ticker: make_ohlcv(ticker, years=args.years)['Close'] for ticker in ticker_names(args.tickers)}
+    prices = {ticker: close.to_numpy() for ticker, close in closes.items()}
+    methods = ("bootstrap", "gbm") if args.method == "both" else (args.method,)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    table = MonteCarlo.run(prices, args.paths, methods=methods)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    bars = int(table['bars'].iloc[0])
+    full = args.paths * bars * 8 / 1e6
+    print(f"{args.tickers} tickers x {args.paths} paths x {bars} bars x {len(methods)} method(s): {elapsed:.2f}s "
+          f"({elapsed / len(table) * 1e3:.0f}ms per ticker/method)")
+    print(f"  peak traced memory {peak / 1e6:.1f}MB (one unchunked float64 path array would be {full:.0f}MB, "
+          f"CHUNK_ELEMENTS={monte_carlo.CHUNK_ELEMENTS:,})")
+
+    mismatched = []
+    for ticker, close in closes.items():
+        roi, buys = backtest_roi(close)
+        row = table[table['ticker'] == ticker].iloc[0]
+        if not np.isclose(row['hist_roi'], roi, rtol=1e-9, atol=1e-12) or row['hist_buys'] != buys:
+            mismatched.append(ticker)
+    print(f"  historical path vs run_backtest: {'OK' if not mismatched else 'MISMATCH ' + ', '.join(mismatched)}")
+    print(table[['ticker', 'method', 'hist_roi', 'hist_percentile', 'roi_p5', 'roi_p50', 'roi_p95',
+                 'loss_prob', 'beat_hold', 'mdd_p50']].round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
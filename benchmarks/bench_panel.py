@@ -0,0 +1,90 @@
+# benchmarks/bench_panel.py
+"""
+공유 메모리 패널 분석 벤치마크.
+합성 종목으로 종목별 pandas 경로(main.analyze_ticker와 같은 계산)와 PanelAnalyzer.run을 비교하고,
+프로세스 수별 처리 시간과 요약 값 일치 여부를 출력합니다.
+코어 수보다 많은 프로세스로는 확장되지 않으므로 결과를 os.cpu_count()와 함께 보세요.
+
+실행: python benchmarks/bench_panel.py [--tickers 1000] [--years 10] [--processes 1,2,4]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from src.analyzer import MarketAnalyzer
+from src.data_fetcher import DataFetcher
+from src.panel import PanelAnalyzer
+from benchmarks.synthetic import make_ohlcv, ticker_names
+
+
+def per_ticker(frames: dict, start_date: str, end_date: str) -> list:
+    summaries = []
+    for ticker, fetched in frames.items():
+        df = fetched.loc[start_date:end_date, ['Close']]
+        df = MarketAnalyzer.calculate_statistics(df, window=settings.LOOKBACK_PERIOD)
+        overall_std = df['Return'].std()
+        df['Std_Level_1'] = -overall_std
+        df, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=100)
+        summaries.append(MarketAnalyzer.build_summary(
+            ticker, df, total_qty, total_invest, overall_std, start_date, end_date, settings.THRESHOLDS
+        ))
+    return summaries
+
+
+def max_difference(expected: list, actual: list) -> float:
+    """두 요약 목록의 숫자 값 최대 상대 오차 (키/종목/문자열이 다르면 inf)"""
+    if [item['ticker'] for item in expected] != [item['ticker'] for item in actual]:
+        return math.inf
+    worst = 0.0
+    for left, right in zip(expected, actual):
+        if left.keys() != right.keys():
+            return math.inf
+        for key, value in left.items():
+            other = right[key]
+            if isinstance(value, str):
+                if value != other:
+                    return math.inf
+            elif not (math.isnan(value) and math.isnan(other)):
+                worst = max(worst, abs(value - other) / max(1.0, abs(value)))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 메모리 패널 분석 벤치마크")
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--processes", default="1,2,4")
+    args = parser.parse_args()
+
+    # 상장일이 다른 종목이 섞이도록 일부 종목은 이력을 짧게 만듭니다.
+    frames = {
+        ticker: DataFetcher.normalize_index(make_ohlcv(ticker, years=args.years / (1 + i % 3)))
+        for i, ticker in enumerate(ticker_names(args.tickers))
+    }
+    last = max(df.index[-1] for df in frames.values())
+    end_date = last.strftime('%Y-%m-%d')
+    start_date = (last - pd.DateOffset(years=3)).strftime('%Y-%m-%d')
+    print(f"{args.tickers} tickers, up to {args.years:g} years, {start_date}~{end_date}, cpu_count={os.cpu_count()}")
+
+    started = time.perf_counter()
+    expected = per_ticker(frames, start_date, end_date)
+    baseline = time.perf_counter() - started
+    print(f"  per-ticker pandas   {baseline:7.2f}s")
+
+    for processes in (int(part) for part in args.processes.split(",")):
+        started = time.perf_counter()
+        summaries = PanelAnalyzer.run(frames, end_date=end_date, processes=processes, default_start=start_date)
+        elapsed = time.perf_counter() - started
+        print(f"  panel processes={processes:<3} {elapsed:7.2f}s  x{baseline / elapsed:5.1f}  "
+              f"max rel diff {max_difference(expected, summaries):.1e}")
+
+
+if __name__ == "__main__":
+    main()
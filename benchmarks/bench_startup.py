@@ -0,0 +1,56 @@
+# benchmarks/bench_startup.py
+"""
+콜드 스타트 비교: 일일 실행(main)과 시그널 전용 모드(src.signals)의 import 시간과
+불러오는 무거운 모듈을 새 프로세스에서 반복 측정합니다.
+
+실행: python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("pandas", "yfinance", "gspread", "oauth2client", "requests")
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, *loaded)
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        elapsed, *loaded = completed.stdout.split()
+        times.append(float(elapsed))
+    return {"median_sec": statistics.median(times), "min_sec": min(times), "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 비교")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {module: measure(module, args.repeat) for module in ("main", "src.signals")}
+    for module, result in results.items():
+        print(f"import {module:<12} median {result['median_sec'] * 1000:7.1f} ms  "
+              f"min {result['min_sec'] * 1000:7.1f} ms  heavy: {', '.join(result['loaded']) or '-'}")
+    saved = results["main"]["median_sec"] - results["src.signals"]["median_sec"]
+    print(f"signals-only saves {saved * 1000:.1f} ms per cold start "
+          f"({saved / results['main']['median_sec']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_strategy.py
+"""
+경로 의존 전략 커널 벤치마크.
+합성 종가로 src/strategy.simulate를 JIT(numba)와 파이썬 루프로 각각 실행해 시뮬레이션 1회당 시간을 비교하고,
+단계별 수량을 모두 같게 두고 익절/손절/한도를 끈 결과가 MarketAnalyzer.run_backtest와 같은지 확인합니다.
+numba가 없으면 파이썬 루프만 측정합니다.
+
+실행: python benchmarks/bench_strategy.py [--bars 2520] [--repeat 200] [--grid 20x10x5x3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from src import strategy
+from src.analyzer import MarketAnalyzer
+from src.sweep import ParameterSweep
+from benchmarks.synthetic import make_ohlcv
+
+FLAT_TIERS = {"QTY_LEVEL_1": 100, "QTY_LEVEL_2": 100, "QTY_LEVEL_3": 100}
+
+
+def make_inputs(bars: int):
+    close = make_ohlcv("BENCH", years=bars / 252)['Close'].to_numpy()[-bars:]
+    df = MarketAnalyzer.calculate_statistics(pd.DataFrame({'Close': close}), window=settings.LOOKBACK_PERIOD)
+    return close, df['Return'].to_numpy(), df['Std_Level_1'].to_numpy()
+
+
+def check_parity(close, returns, std_level) -> bool:
+    df = pd.DataFrame({'Close': close, 'Return': returns, 'Std_Level_1': std_level})
+    _, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=100)
+    result, _, _ = strategy.run(close, returns, -std_level, params=FLAT_TIERS)
+    return result["position"] == total_qty and abs(result["bought"] - total_invest) <= 1e-9 * max(1.0, total_invest)
+
+
+def time_simulations(close, returns, std, repeat: int) -> float:
+    """simulate 1회당 평균 시간(초). 첫 호출(JIT 컴파일)은 제외합니다."""
+    params = {"TAKE_PROFIT": 0.2, "STOP_LOSS": 0.3, "MAX_POSITION": 2000}
+    strategy.run(close, returns, std, params=params, trace=False)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        strategy.run(close, returns, std, params=params, trace=False)
+    return (time.perf_counter() - started) / repeat
+
+
+def time_grid(close, shape) -> tuple:
+    lookbacks, sigmas, take_profits, stop_losses = shape
+    args = (
+        "BENCH", close, np.linspace(20, 504, lookbacks).astype(int), np.linspace(0.5, 3.0, sigmas),
+        np.linspace(0.0, 0.5, take_profits), np.linspace(0.0, 0.3, stop_losses)
+    )
+    ParameterSweep.evaluate_strategy(*args)
+    started = time.perf_counter()
+    table = ParameterSweep.evaluate_strategy(*args)
+    return len(table), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경로 의존 전략 커널 벤치마크")
+    parser.add_argument("--bars", type=int, default=2520)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--grid", default="20x10x5x3", help="lookback x sigma x 익절 x 손절 개수")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if not args.child:
+        print(f"{args.bars} bars, numba {'available' if strategy.njit else 'missing'}")
+
+    close, returns, std_level = make_inputs(args.bars)
+    std = -std_level
+    mode = "jit" if strategy.JIT_ENABLED else "python"
+    parity = check_parity(close, returns, std_level)
+    per_sim = time_simulations(close, returns, std, args.repeat if strategy.JIT_ENABLED else max(1, args.repeat // 20))
+    combos, grid_time = time_grid(close, [int(part) for part in args.grid.split("x")])
+    print(f"  {mode:<7} {per_sim * 1e6:9.1f} us/simulation  grid {combos} combos {grid_time:6.2f}s  "
+          f"parity with run_backtest: {'OK' if parity else 'MISMATCH'}")
+    if args.child:
+        return
+
+    # JIT 여부는 import 시점에 정해지므로 파이썬 루프는 STRATEGY_JIT=0 자식 프로세스로 측정합니다.
+    if strategy.JIT_ENABLED:
+        env = dict(os.environ, STRATEGY_JIT="0")
+        subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--child"], env=env, check=True)
+    else:
+        print("  numba is not installed; only the Python loop was measured")
+
+
+if __name__ == "__main__":
+    main()
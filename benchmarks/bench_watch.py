@@ -0,0 +1,64 @@
+# benchmarks/bench_watch.py
+"""
+장중 감시 데몬의 틱 평가 성능 벤치마크.
+종목 수별로 TriggerIndex.evaluate 한 번의 시간과, 하루치 틱을 돌린 뒤의 메모리 증가량을 측정합니다.
+
+실행: python benchmarks/bench_watch.py [--sizes 100,1000,10000] [--ticks 390]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.watch import TriggerIndex, LEVEL_NAMES
+
+
+def make_index(n_tickers: int, seed: int = 0) -> TriggerIndex:
+    rng = np.random.default_rng(seed)
+    prev_close = rng.uniform(5, 500, n_tickers)
+    sigma = rng.uniform(0.01, 0.06, n_tickers)
+    steps = np.arange(1, 4)
+    sigma_triggers = prev_close[:, None] * (1 - sigma[:, None] * steps)
+    z_triggers = prev_close[:, None] * (1 - rng.uniform(0.02, 0.1, n_tickers)[:, None] * steps)
+    triggers = np.hstack([sigma_triggers, z_triggers])
+    return TriggerIndex([f"T{i:05d}" for i in range(n_tickers)], prev_close, triggers, "bench")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="감시 데몬 틱 평가 벤치마크")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--ticks", type=int, default=390, help="하루 틱 수 (1분 간격 정규장 390분)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    for size in (int(part) for part in args.sizes.split(",")):
+        index = make_index(size)
+        # 전일 종가에서 시작하는 랜덤워크 시세
+        prices = index.prev_close.copy()
+        index.evaluate(prices, now=0.0)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        elapsed = []
+        alerts = 0
+        for tick in range(args.ticks):
+            prices *= 1 + rng.normal(0, 0.004, size)
+            started = time.perf_counter()
+            fire = index.evaluate(prices, now=tick * 60.0)
+            elapsed.append(time.perf_counter() - started)
+            alerts += int(fire.sum())
+            del fire
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        print(f"[{size:>6} tickers x {len(LEVEL_NAMES)} levels] evaluate median {np.median(elapsed) * 1e3:.3f} ms, "
+              f"max {max(elapsed) * 1e3:.3f} ms, alerts {alerts}, memory growth after {args.ticks} ticks {growth} bytes")
+
+
+if __name__ == "__main__":
+    main()
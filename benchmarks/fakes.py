@@ -0,0 +1,302 @@
+# benchmarks/fakes.py
+"""
+외부 API(Yahoo Finance, Google Sheets, Telegram)의 프로세스 내 대체 구현.
+install()로 설치하면 main.main()을 네트워크 없이 실행할 수 있고, 호출 횟수를 집계합니다.
+"""
+import contextlib
+import json
+import threading
+from collections import Counter
+
+import pandas as pd
+import requests
+from gspread.utils import a1_range_to_grid_range
+
+from benchmarks.synthetic import make_ohlcv
+
+
+class CallCounter:
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def as_dict(self) -> dict:
+        return dict(sorted(self.counts.items()))
+
+
+# --- Yahoo Finance -----------------------------------------------------------
+
+class FakeYahoo:
+    """yf.Ticker(...).history(...)와 yf.download(...)를 합성 시세로 대체합니다."""
+
+    def __init__(self, counter: CallCounter, years: float = 5):
+        self.counter = counter
+        self.years = years
+
+    def _frame(self, ticker: str, start=None, period=None) -> pd.DataFrame:
+        df = make_ohlcv(ticker, years=self.years)
+        if start:
+            df = df[df.index.tz_localize(None) >= pd.Timestamp(start)]
+        elif period == "1d":
+            df = df.tail(1)
+        return df
+
+    def ticker(self, symbol: str):
+        fake = self
+
+        class _Ticker:
+            def __init__(self, ticker):
+                self.ticker = ticker
+
+            def history(self, start=None, end=None, period=None, **kwargs):
+                fake.counter.add("yahoo.history")
+                return fake._frame(self.ticker, start=start, period=period)
+
+        return _Ticker(symbol)
+
+    def download(self, tickers, start=None, period=None, **kwargs):
+        self.counter.add("yahoo.download")
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        return pd.concat({t: self._frame(t, start=start, period=period) for t in tickers}, axis=1)
+
+
+# --- Google Sheets -----------------------------------------------------------
+
+def _split_range(range_name: str):
+    """"'SOXL'!A13:F13" -> ("SOXL", grid range)"""
+    title, _, cells = range_name.rpartition("!")
+    return title.strip("'").replace("''", "'"), a1_range_to_grid_range(cells)
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title: str, sheet_id: int, rows: int, cols: int):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.row_count = int(rows)
+        self.col_count = int(cols)
+        self.cells = []
+
+    # 값 저장소 -----------------------------------------------------------
+    def _write(self, start_row: int, start_col: int, values: list):
+        for r, row in enumerate(values):
+            target = start_row + r
+            while len(self.cells) <= target:
+                self.cells.append([])
+            line = self.cells[target]
+            if len(line) < start_col + len(row):
+                line.extend([""] * (start_col + len(row) - len(line)))
+            for c, value in enumerate(row):
+                line[start_col + c] = "" if value is None else str(value)
+        self.row_count = max(self.row_count, len(self.cells))
+
+    def _read(self, grid: dict) -> list:
+        r0 = grid.get("startRowIndex", 0)
+        r1 = grid.get("endRowIndex", len(self.cells))
+        c0 = grid.get("startColumnIndex", 0)
+        c1 = grid.get("endColumnIndex", None)
+        rows = [list(row[c0:c1]) for row in self.cells[r0:r1]]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    # gspread Worksheet 표면 (레거시 경로용) ------------------------------
+    def get_all_values(self):
+        self.spreadsheet.counter.add("sheets.get_all_values")
+        width = max((len(row) for row in self.cells), default=0)
+        return [row + [""] * (width - len(row)) for row in self.cells]
+
+    def acell(self, label: str):
+        self.spreadsheet.counter.add("sheets.acell")
+        grid = a1_range_to_grid_range(label)
+        rows = self._read(grid)
+        value = rows[0][0] if rows and rows[0] else ""
+
+        class _Cell:
+            pass
+
+        cell = _Cell()
+        cell.value = value or None
+        return cell
+
+    def update(self, values=None, range_name=None, **kwargs):
+        self.spreadsheet.counter.add("sheets.update")
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        grid = a1_range_to_grid_range(range_name or "A1")
+        self._write(grid.get("startRowIndex", 0), grid.get("startColumnIndex", 0), values)
+
+    def insert_rows(self, values, row: int = 1, **kwargs):
+        self.spreadsheet.counter.add("sheets.insert_rows")
+        for _ in values:
+            self.cells.insert(row - 1, [])
+        self._write(row - 1, 0, values)
+
+    def clear(self):
+        self.spreadsheet.counter.add("sheets.clear")
+        self.cells = []
+
+    def format(self, *args, **kwargs):
+        self.spreadsheet.counter.add("sheets.format")
+
+    def update_note(self, *args, **kwargs):
+        self.spreadsheet.counter.add("sheets.update_note")
+
+    def resize(self, rows=None, cols=None):
+        self.spreadsheet.counter.add("sheets.resize")
+        self.row_count = int(rows or self.row_count)
+        self.col_count = int(cols or self.col_count)
+
+
+class FakeSpreadsheet:
+    """SheetsManager가 사용하는 gspread Spreadsheet 표면의 메모리 구현"""
+
+    def __init__(self, counter: CallCounter):
+        self.counter = counter
+        self.sheets = {}
+        self.payload_bytes = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def _by_id(self, sheet_id: int) -> FakeWorksheet:
+        return next(ws for ws in self.sheets.values() if ws.id == sheet_id)
+
+    def worksheets(self, exclude_hidden: bool = False):
+        self.counter.add("sheets.worksheets")
+        return list(self.sheets.values())
+
+    def worksheet(self, title: str):
+        import gspread
+
+        self.counter.add("sheets.worksheet")
+        if title not in self.sheets:
+            raise gspread.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title: str, rows, cols, index=None):
+        self.counter.add("sheets.add_worksheet")
+        with self._lock:
+            worksheet = FakeWorksheet(self, title, self._next_id, rows, cols)
+            self._next_id += 1
+            self.sheets[title] = worksheet
+        return worksheet
+
+    def batch_update(self, body: dict):
+        self.counter.add("sheets.batch_update")
+        self.payload_bytes += len(json.dumps(body))
+        for request in body.get("requests", []):
+            if "insertDimension" in request:
+                grid = request["insertDimension"]["range"]
+                worksheet = self._by_id(grid["sheetId"])
+                for _ in range(grid["endIndex"] - grid["startIndex"]):
+                    worksheet.cells.insert(grid["startIndex"], [])
+            elif "updateCells" in request and request["updateCells"].get("fields") == "userEnteredValue":
+                self._by_id(request["updateCells"]["range"]["sheetId"]).cells = []
+            elif "updateSheetProperties" in request:
+                props = request["updateSheetProperties"]["properties"]
+                grid_props = props.get("gridProperties", {})
+                worksheet = self._by_id(props["sheetId"])
+                worksheet.row_count = grid_props.get("rowCount", worksheet.row_count)
+                # 행 수를 줄이면 잘린 행의 값도 사라집니다.
+                del worksheet.cells[worksheet.row_count:]
+        return {"replies": []}
+
+    def values_batch_update(self, body: dict):
+        self.counter.add("sheets.values_batch_update")
+        self.payload_bytes += len(json.dumps(body))
+        for data in body.get("data", []):
+            title, grid = _split_range(data["range"])
+            self.sheets[title]._write(grid.get("startRowIndex", 0), grid.get("startColumnIndex", 0), data["values"])
+        return {}
+
+    def values_batch_get(self, ranges, params=None):
+        self.counter.add("sheets.values_batch_get")
+        value_ranges = []
+        for range_name in ranges:
+            title, grid = _split_range(range_name)
+            values = self.sheets[title]._read(grid) if title in self.sheets else []
+            value_ranges.append({"range": range_name, "values": values})
+        return {"valueRanges": value_ranges}
+
+
+class FakeClient:
+    def __init__(self, spreadsheet: FakeSpreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+    def open(self, name):
+        return self.spreadsheet
+
+    def create(self, name):
+        return self.spreadsheet
+
+
+# --- Telegram ----------------------------------------------------------------
+
+class FakeTelegram:
+    """Telegram Bot API 요청을 가로채 200 응답을 돌려줍니다."""
+
+    def __init__(self, counter: CallCounter):
+        self.counter = counter
+        self.messages = []
+
+    def request(self, session, method, url, **kwargs):
+        response = requests.Response()
+        response.url = url
+        if "api.telegram.org" not in url:
+            raise RuntimeError(f"offline benchmark: unexpected request to {url}")
+        self.counter.add("telegram.post")
+        self.messages.append(kwargs.get("json") or kwargs.get("data"))
+        response.status_code = 200
+        response._content = b'{"ok": true, "result": {}}'
+        return response
+
+
+@contextlib.contextmanager
+def install(years: float = 5):
+    """
+    Yahoo/Sheets/Telegram 대체 구현을 설치합니다.
+    반환: (CallCounter, FakeSpreadsheet, FakeTelegram)
+    """
+    import os
+
+    import gspread
+    import yfinance as yf
+    from oauth2client.service_account import ServiceAccountCredentials
+    from config import secrets_loader
+
+    counter = CallCounter()
+    yahoo = FakeYahoo(counter, years=years)
+    spreadsheet = FakeSpreadsheet(counter)
+    telegram = FakeTelegram(counter)
+
+    patches = [
+        (yf, "Ticker", yahoo.ticker),
+        (yf, "download", yahoo.download),
+        (gspread, "authorize", lambda creds: FakeClient(spreadsheet)),
+        (ServiceAccountCredentials, "from_json_keyfile_dict", classmethod(lambda cls, info, scope: object())),
+        (secrets_loader, "get_gcp_credentials", lambda: {"type": "service_account"}),
+        (requests.sessions.Session, "request", lambda session, method, url, **kw: telegram.request(session, method, url, **kw)),
+    ]
+    originals = [(obj, name, obj.__dict__.get(name, getattr(obj, name))) for obj, name, _ in patches]
+    env_backup = {key: os.environ.get(key) for key in ("TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID")}
+    try:
+        for obj, name, value in patches:
+            setattr(obj, name, value)
+        os.environ["TELEGRAM_BOT_TOKEN"] = "offline-token"
+        os.environ["TELEGRAM_CHAT_ID"] = "1"
+        yield counter, spreadsheet, telegram
+    finally:
+        for obj, name, value in originals:
+            setattr(obj, name, value)
+        for key, value in env_backup.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
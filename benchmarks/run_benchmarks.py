@@ -0,0 +1,180 @@
+# benchmarks/run_benchmarks.py
+"""
+오프라인 벤치마크 스위트.
+합성 시세와 Yahoo/Sheets/Telegram 대체 구현으로 main.main()을 종목 수별로 실행하고
+전체 시간, 단계별 시간, API 호출 수, 최대 메모리를 JSON으로 기록합니다.
+
+각 시나리오는 별도 프로세스에서 실행되므로 최대 RSS가 시나리오끼리 섞이지 않습니다.
+
+실행: python benchmarks/run_benchmarks.py [--sizes 7,100,1000] [--years 5] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _timed(fn, trace_memory: bool):
+    """fn을 실행하고 (결과, 경과 시간, tracemalloc 최대치)를 반환합니다. 표준 출력은 버립니다."""
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_scenario(n_tickers: int, years: float, trace_memory: bool) -> dict:
+    """한 가지 종목 수에 대해 콜드/웜 실행과 구성 요소별 시간을 측정합니다."""
+    from config import settings
+    from benchmarks import fakes
+    from benchmarks.synthetic import ticker_names
+
+    workdir = tempfile.mkdtemp(prefix="stockbot-bench-")
+    settings.TICKERS = ticker_names(n_tickers)
+    settings.PRICE_CACHE_DIR = os.path.join(workdir, "prices")
+    settings.STATS_STATE_DIR = os.path.join(workdir, "stats")
+    settings.SHEETS_PENDING_DIR = os.path.join(workdir, "sheets-pending")
+    settings.RESULT_DB_PATH = os.path.join(workdir, "results.sqlite")
+    settings.SHEETS_FINGERPRINT_DIR = os.path.join(workdir, "sheets-fingerprints")
+    # 대체 구현에는 API 할당량이 없으므로 속도 제한으로 측정이 늘어지지 않게 합니다.
+    settings.SHEETS_READ_QUOTA_PER_MIN = settings.SHEETS_WRITE_QUOTA_PER_MIN = 1e9
+
+    import main as bot
+    from src.analyzer import MarketAnalyzer
+    from src.data_fetcher import DataFetcher
+    from src.sheets_manager import SheetsManager
+
+    result = {"tickers": n_tickers, "years": years, "runs": {}, "components": {}}
+    with fakes.install(years=years) as (counter, spreadsheet, telegram):
+        # 1) main.main() 전체 실행: 첫 실행(캐시/시트 없음)과 다음 날 재실행(캐시/시트 있음)
+        for phase in ("cold", "warm"):
+            # 다음 날 재실행을 흉내 내도록 단계마다 새 실행 기록(체크포인트)을 사용합니다.
+            settings.RUN_DIR = os.path.join(workdir, f"runs-{phase}")
+            counter.counts.clear()
+            spreadsheet.payload_bytes = 0
+            report, elapsed, peak = _timed(bot.main, trace_memory)
+            result["runs"][phase] = {
+                "wall_sec": round(elapsed, 4),
+                "summaries": len(report["summaries"]),
+                "stages": report["stages"],
+                "api_calls": counter.as_dict(),
+                "api_calls_total": sum(counter.counts.values()),
+                "sheets_payload_bytes": spreadsheet.payload_bytes,
+                "tracemalloc_peak_bytes": peak,
+            }
+
+        # 2) 단계별 단독 측정
+        tickers = settings.TICKERS
+        counter.counts.clear()
+        frames, elapsed, _ = _timed(lambda: DataFetcher.get_many(tickers, period="5y"), False)
+        result["components"]["fetch"] = {"wall_sec": round(elapsed, 4), "api_calls": counter.as_dict()}
+
+        def analyze_all():
+            analyzed = {}
+            for ticker, df in frames.items():
+                df = MarketAnalyzer.calculate_statistics(df[["Close"]].copy(), window=settings.LOOKBACK_PERIOD)
+                overall_std = df["Return"].std()
+                df["Std_Level_1"] = -overall_std
+                df, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=100)
+                summary = MarketAnalyzer.build_summary(
+                    ticker, df, total_qty, total_invest, overall_std, "", "", settings.THRESHOLDS
+                )
+                analyzed[ticker] = (df, summary)
+            return analyzed
+
+        analyzed, elapsed, _ = _timed(analyze_all, False)
+        result["components"]["analyze"] = {"wall_sec": round(elapsed, 4)}
+
+        def write_sheets():
+            sheets = SheetsManager({"type": "service_account"}, settings.SPREADSHEET_NAME)
+            for ticker, (df, summary) in analyzed.items():
+                sheets.update_ticker_sheet(f"W_{ticker}", MarketAnalyzer.compact(df), summary)
+            sheets.update_dashboard([summary for _, summary in analyzed.values()])
+            stats = sheets.flush()
+            sheets.drain()
+            return stats
+
+        counter.counts.clear()
+        _, elapsed, _ = _timed(write_sheets, False)
+        result["components"]["sheets_output"] = {"wall_sec": round(elapsed, 4), "api_calls": counter.as_dict()}
+
+        from src.telegram_notifier import get_telegram_notifier
+        notifier = get_telegram_notifier()
+        summaries = [summary for _, summary in analyzed.values()]
+        counter.counts.clear()
+        _, elapsed, _ = _timed(lambda: notifier.send_messages(notifier.format_summary_chunks(summaries)), False)
+        result["components"]["telegram"] = {"wall_sec": round(elapsed, 4), "api_calls": counter.as_dict()}
+
+    # ru_maxrss: Linux는 KB, macOS는 byte 단위
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 스위트")
+    parser.add_argument("--sizes", default="7,100,1000", help="종목 수 목록 (쉼표 구분)")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc으로 파이썬 할당 최대치도 측정 (느려짐)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/<시각>.json)")
+    parser.add_argument("--scenario", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # 자식 프로세스: 시나리오 하나를 실행하고 JSON을 출력
+    if args.scenario is not None:
+        print(json.dumps(run_scenario(args.scenario, args.years, args.trace_memory)))
+        return
+
+    scenarios = []
+    for size in (int(part) for part in args.sizes.split(",")):
+        command = [sys.executable, os.path.abspath(__file__), "--scenario", str(size), "--years", str(args.years)]
+        if args.trace_memory:
+            command.append("--trace-memory")
+        completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            raise SystemExit(f"scenario {size} failed")
+        scenario = json.loads(completed.stdout.strip().splitlines()[-1])
+        scenarios.append(scenario)
+
+        cold, warm = scenario["runs"]["cold"], scenario["runs"]["warm"]
+        print(f"[{size:>5} tickers] cold {cold['wall_sec']:.2f}s ({cold['api_calls_total']} calls), "
+              f"warm {warm['wall_sec']:.2f}s ({warm['api_calls_total']} calls), "
+              f"peak RSS {scenario['peak_rss_bytes'] / 2**20:.0f} MiB")
+        for stage in warm["stages"]:
+            print(f"      warm {stage['stage']:<8} wall {stage['wall_sec']:.2f}s busy {stage['busy_sec']:.2f}s")
+        for name, component in scenario["components"].items():
+            print(f"      component {name:<14} {component['wall_sec']:.3f}s")
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scenarios": scenarios,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"Saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
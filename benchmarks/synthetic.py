@@ -0,0 +1,45 @@
+# benchmarks/synthetic.py
+"""
+벤치마크용 합성 시세 생성기.
+기하 브라운 운동(GBM)으로 종목별 일봉 OHLCV를 만들며, 같은 종목 코드는 항상 같은 시세를 냅니다.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+def ticker_names(count: int) -> list:
+    """SYN0000, SYN0001, ... 형식의 합성 종목 코드"""
+    return [f"SYN{i:04d}" for i in range(count)]
+
+
+def make_ohlcv(ticker: str, years: float = 5, end=None, drift: float = 0.10, volatility: float = 0.60) -> pd.DataFrame:
+    """
+    연 drift/volatility를 갖는 GBM 일봉을 생성합니다 (기본값은 3배 레버리지 ETF 수준의 변동성).
+    인덱스는 yfinance와 같이 America/New_York 타임존의 영업일입니다.
+    """
+    rng = np.random.default_rng(zlib.crc32(ticker.encode("utf-8")))
+    n = max(2, int(years * 252))
+    end = pd.Timestamp(end or pd.Timestamp.now()).normalize()
+    index = pd.bdate_range(end=end, periods=n, tz="America/New_York")
+
+    dt = 1 / 252
+    log_returns = rng.normal((drift - 0.5 * volatility ** 2) * dt, volatility * np.sqrt(dt), n)
+    close = 10 * np.exp(np.cumsum(log_returns))
+    open_ = close * np.exp(rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    volume = rng.integers(1_000_000, 50_000_000, n).astype(np.float64)
+
+    return pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+
+
+def make_prices(years: int, seed: str = "BENCH") -> pd.DataFrame:
+    """종가만 있는 타임존 없는 DataFrame (분석 함수 단독 벤치마크용)"""
+    df = make_ohlcv(seed, years=years)[["Close"]]
+    df.index = df.index.tz_localize(None)
+    return df
@@ -1,4 +1,5 @@
 # config/settings.py
+import os
 
 # 분석 대상 종목
 TICKERS = ["SOXL", "TQQQ", "FNGU", "BULZ", "TSLA", "TSLL", "KORU"]
@@ -14,6 +15,9 @@ TICKER_NAMES = {
     "KORU": "한국 3배",
 }
 
+# 종목 목록 파일 (한 줄에 "티커" 또는 "티커,종목명"). 지정하면 TICKERS 대신 사용합니다.
+UNIVERSE_FILE = os.getenv("UNIVERSE_FILE")
+
 # 분석 설정
 # 제도권주식분석 채널 전략: 1년(252 영업일) 기준 표준편차
 LOOKBACK_PERIOD = 252
@@ -25,7 +29,117 @@ THRESHOLDS = {
     "LEVEL_3": -3.0   # 3차 매수 (패닉)
 }
 
+# 경로 의존 전략(MarketAnalyzer.run_strategy) 기본값. 0은 해당 규칙을 쓰지 않음을 뜻합니다.
+STRATEGY = {
+    "QTY_LEVEL_1": 100,   # 등락률 < -1σ 일 때 매수 수량
+    "QTY_LEVEL_2": 200,   # 등락률 < -2σ
+    "QTY_LEVEL_3": 300,   # 등락률 < -3σ
+    "TAKE_PROFIT": 0.0,   # 평균 단가 대비 이 수익률 이상이면 전량 익절 (예: 0.2)
+    "STOP_LOSS": 0.0,     # 평균 단가 대비 이 손실률 이하이면 전량 손절 (예: 0.3)
+    "MAX_POSITION": 0,    # 최대 보유 수량
+    "CASH": 0.0,          # 초기 현금 (매수 시 차감, 매도 시 환입)
+}
+# numba가 설치되어 있으면 전략 루프를 JIT 컴파일합니다.
+STRATEGY_JIT = os.getenv("STRATEGY_JIT", "1") != "0"
+
 # 구글 스프레드시트 설정
 # URL: https://docs.google.com/spreadsheets/d/[이부분이_ID입니다]/edit
 SPREADSHEET_ID = "17BUNcyaiUBzDgPMnafvY9ky9gDllQyvry-QEEXDJl78" # 여기에 시트 ID를 입력하면 더 안정적으로 작동합니다.
 SPREADSHEET_NAME = "Stock_Bot_Dashboard"
+# 일괄 전송 시 batch_update 한 번에 담을 최대 요청 수 / values_batch_update 한 번에 담을 최대 셀 수
+SHEETS_BATCH_MAX_REQUESTS = 500
+SHEETS_BATCH_MAX_CELLS = 50000
+# 새 종목 시트의 상세 내역을 이 행 수 단위 범위로 나눠 씁니다.
+SHEETS_UPLOAD_CHUNK_ROWS = 5000
+# 시트 쓰기는 백그라운드 큐(write-behind)로 보내고 분석은 계속 진행합니다.
+SHEETS_WRITE_BEHIND = os.getenv("SHEETS_WRITE_BEHIND", "1") != "0"
+# 분당 요청 할당량 (Sheets API 기본: 사용자당 읽기/쓰기 각 60회/분)
+SHEETS_READ_QUOTA_PER_MIN = 60
+SHEETS_WRITE_QUOTA_PER_MIN = 60
+# 429/5xx 응답 시 최대 재시도 횟수와 백오프 상한(초)
+SHEETS_MAX_RETRIES = 6
+SHEETS_BACKOFF_MAX_SEC = 64
+# 실행 종료 시 쓰기 큐를 비우며 기다릴 최대 시간(초). 남은 요청은 아래 디렉터리에 저장해 다음 실행에서 보냅니다.
+SHEETS_DRAIN_TIMEOUT_SEC = 300
+SHEETS_PENDING_DIR = os.getenv("SHEETS_PENDING_DIR", ".cache/sheets-pending")
+# 범위별로 마지막으로 쓴 값의 해시를 저장해 바뀐 행만 씁니다 (0이면 매번 전체를 씀)
+SHEETS_FINGERPRINTS = os.getenv("SHEETS_FINGERPRINTS", "1") != "0"
+SHEETS_FINGERPRINT_DIR = os.getenv("SHEETS_FINGERPRINT_DIR", ".cache/sheets-fingerprints")
+# 종목 시트에 남길 상세 내역 최근 행 수 (0: 전체). 줄이면 전체 이력은 로컬 결과 저장소/가격 캐시에서 봅니다.
+SHEETS_HISTORY_ROWS = int(os.getenv("SHEETS_HISTORY_ROWS", "0"))
+
+# 분석 결과 출력 대상 (src/sinks.py, 쉼표 구분): sheets(구글 시트), sqlite(로컬 결과 저장소)
+RESULT_SINKS = os.getenv("RESULT_SINKS", "sheets,sqlite")
+# 로컬 결과 저장소 파일 (봉 단위 전체 이력 + 실행별 요약)
+RESULT_DB_PATH = os.getenv("RESULT_DB_PATH", ".cache/results.sqlite")
+
+# 데이터 수집 설정
+# 시작 날짜가 다른 종목(배치)을 동시에 가져올 최대 워커 수
+FETCH_MAX_WORKERS = 4
+
+# 로컬 가격 캐시 설정 (종목별 OHLCV .npy 파일)
+PRICE_CACHE_ENABLED = os.getenv("PRICE_CACHE_ENABLED", "1") != "0"
+PRICE_CACHE_DIR = os.getenv("PRICE_CACHE_DIR", ".cache/prices")
+# 마지막 전체 수집 후 이 기간이 지나면 전체 이력을 다시 받습니다 (수정주가 반영)
+PRICE_CACHE_MAX_AGE_DAYS = 30
+# 증분 수집 시 캐시와 겹치게 받을 기간(일). 겹침 구간 종가로 분할/배당 조정을 감지합니다.
+PRICE_CACHE_OVERLAP_DAYS = 7
+# 겹침 구간 종가의 허용 상대 오차
+PRICE_CACHE_ADJUST_TOLERANCE = 1e-4
+
+# 파이프라인 설정 (시트 읽기 → 가격 수집 → 분석 → 출력)
+# 단계 사이 큐의 최대 크기
+PIPELINE_QUEUE_SIZE = 16
+# 가격 수집 단계에서 한 번에 처리할 종목 수
+PIPELINE_FETCH_BATCH_SIZE = 50
+# 단계별 동시 실행 워커 수
+PIPELINE_WORKERS = {"fetch": 2, "analyze": 2, "output": 1}
+
+# 실행 기록(작업 큐/체크포인트) 설정
+RUN_DIR = os.getenv("RUN_DIR", ".cache/runs")
+# 이 개수만큼 종목이 끝날 때마다 시트 쓰기를 전송하고 완료로 기록합니다.
+RUN_CHECKPOINT_EVERY = 50
+# 선점 후 이 시간(초)이 지나도록 끝나지 않은 종목은 다른 워커가 다시 가져갑니다.
+RUN_CLAIM_TIMEOUT_SEC = 3600
+# 실행 기록 보관 기간(일)
+RUN_KEEP_DAYS = 7
+
+# 시그널 전용 모드(python -m src.signals) 설정
+# 가격 캐시가 없거나 LOOKBACK_PERIOD보다 짧을 때 받을 기간
+SIGNALS_FALLBACK_PERIOD = "2y"
+
+# 장중 감시 데몬(python -m src.watch) 설정
+# 시세 조회 간격(초)과 yf.download 한 번에 조회할 종목 수
+WATCH_INTERVAL_SEC = 60
+WATCH_QUOTE_CHUNK_SIZE = 200
+# 알림 후 가격이 트리거보다 이 비율 이상 회복해야 같은 단계를 다시 알립니다 (히스테리시스)
+WATCH_REARM_PCT = 0.005
+# 같은 종목/단계의 알림 최소 간격(초)
+WATCH_COOLDOWN_SEC = 1800
+
+# 공유 메모리 패널 분석(python -m src.panel) 설정
+# 프로세스 수 (0이면 CPU 코어 수)
+PANEL_PROCESSES = int(os.getenv("PANEL_PROCESSES", "0"))
+
+# 텔레그램 전송 설정
+# 요청 타임아웃(초)과 429/5xx/네트워크 오류 시 최대 재시도 횟수
+TELEGRAM_TIMEOUT = 10
+TELEGRAM_MAX_RETRIES = 3
+
+# 실행 계측 설정
+# 작업별 지연시간/행 수/바이트/재시도 집계와 실행 종료 시 JSON 보고서 저장
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+# 프로파일러: "cprofile"(모든 스레드) 또는 "pyinstrument"(메인 스레드만) (미설정 시 비활성화)
+PROFILE_MODE = os.getenv("STOCKBOT_PROFILE")
+
+# 이동 통계 증분 갱신 설정 (종목별 상태 파일로 새 봉만 O(1) 갱신)
+STATS_INCREMENTAL = os.getenv("STATS_INCREMENTAL", "1") != "0"
+STATS_STATE_DIR = os.getenv("STATS_STATE_DIR", ".cache/stats")
+# 증분 결과 검증과 허용 상대 오차: 기본은 매 실행 마지막 봉을 최근 window개 종가로 다시 계산해 비교하고,
+# STATS_VERIFY_FULL=1이면 pandas 전체 재계산과 비교합니다 (전체 기간 표준편차는 상태의 종가 해시로 보장).
+STATS_VERIFY = os.getenv("STATS_VERIFY", "1") != "0"
+STATS_VERIFY_FULL = os.getenv("STATS_VERIFY_FULL", "0") == "1"
+STATS_CONSISTENCY_TOLERANCE = 1e-8
+# numba가 설치되어 있으면 전체 재계산을 한 번의 순회로 하는 커널(src/moments.py)을 씁니다 (0이면 pandas rolling).
+STATS_JIT = os.getenv("STATS_JIT", "1") != "0"
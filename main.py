@@ -1,161 +1,346 @@
 # main.py
+import argparse
 import sys
+import functools
 import pandas as pd
 from datetime import datetime, timedelta
 from config import settings, secrets_loader
 from src.data_fetcher import DataFetcher
-from src.analyzer import MarketAnalyzer
+from src.analyzer import MarketAnalyzer, SUMMARY_STATS_COLUMNS
 from src.sheets_manager import SheetsManager
+from src.price_cache import PriceCache
+from src.pipeline import Pipeline, Stage
+from src.rolling_state import RollingStatsState
+from src.run_manifest import RunManifest, CheckpointBuffer
+from src.sinks import build_sinks, sink_names
+from src.universe import Universe
+from src.metrics import metrics
 
-def main():
-    print("=== Stock Analysis Bot Start ===")
-    
-    # 1. 인증 정보 로드
+
+def with_ticker_context(fn):
+    """단계 함수 실행 중 기록되는 지표에 종목 태그를 붙입니다."""
+    @functools.wraps(fn)
+    def wrapper(job, *args):
+        with metrics.context(ticker=job['ticker']):
+            return fn(job, *args)
+    return wrapper
+
+
+def read_sheet_state(tickers, sheets, price_cache, store=None):
+    """
+    [1단계] 시트에서 기존 데이터와 시작 날짜를 읽고, 가격 수집 배치로 나눕니다.
+    시트 출력을 쓰지 않으면 로컬 결과 저장소(store)에 기록된 시작 날짜를 씁니다.
+    """
+    # 로컬 가격 캐시를 쓰면 시트에서는 마지막 저장 날짜만 필요하므로 최신 1개 행만 읽습니다.
+    sheet_state = {}
+    if sheets:
+        sheet_state = sheets.read_all(tickers, tail_rows=1 if price_cache else None)
+    elif store:
+        sheet_state = {ticker: (start, None, None) for ticker, start in store.start_dates(tickers).items()}
+
+    jobs = []
+    for ticker in tickers:
+        # 시트에서 시작 날짜만 사용 (end_date는 항상 오늘)
+        start_date_str, _, existing_df = sheet_state.get(ticker, (None, None, None))
+
+        # 기본값 설정: 3년 전 ~ 오늘
+        if not start_date_str:
+            start_date_str = (datetime.now() - timedelta(days=365*3)).strftime('%Y-%m-%d')
+
+        # 기존 데이터가 있으면 마지막 날짜부터, 없으면(첫 실행) period="5y"로 가져옵니다.
+        fetch_start = None
+        if existing_df is not None and not existing_df.empty:
+            fetch_start = existing_df.index[-1].normalize().strftime('%Y-%m-%d')
+
+        jobs.append({
+            'ticker': ticker,
+            'start_date': start_date_str,
+            'existing_df': existing_df,
+            'fetch_start': fetch_start,
+        })
+
+    size = settings.PIPELINE_FETCH_BATCH_SIZE
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def fetch_prices(batch, price_cache):
+    """[2단계] 배치 단위로 가격을 일괄 수집해 종목별 작업으로 나눕니다."""
+    tickers = [job['ticker'] for job in batch]
+    if price_cache:
+        # 로컬 캐시의 마지막 날짜 이후만 받아 추가하고, 캐시된 전체 이력을 사용합니다.
+        # 전체 재수집(오래된 캐시, 수정주가 조정)도 분석 시작일 이전부터 받아 이력이 잘리지 않게 합니다.
+        history_start = {job['ticker']: job['start_date'] for job in batch}
+        fetched = DataFetcher.get_many_cached(tickers, price_cache, period="5y", history_start=history_start)
+    else:
+        start_by_ticker = {job['ticker']: job['fetch_start'] for job in batch if job['fetch_start']}
+        fetched = DataFetcher.get_many(tickers, start_by_ticker, period="5y")
+
+    for job in batch:
+        job['fetched'] = fetched[job['ticker']]
+    return batch
+
+
+@with_ticker_context
+def analyze_ticker(job, price_cache, end_date_str):
+    """[3단계] 기존 데이터와 새 데이터를 합쳐 통계 분석과 백테스트를 수행합니다."""
+    ticker = job['ticker']
+    start_date_str = job['start_date']
+    existing_df = job['existing_df']
+    new_df = job['fetched']
+    new_rows_count = 0
+    update_last_row = False
+
+    if price_cache:
+        df_full = new_df
+        if existing_df is not None and not existing_df.empty and not df_full.empty:
+            # 시트의 마지막 날짜를 기준으로 새로 추가할 행 수와 마지막 행 갱신 여부 결정
+            last_date = existing_df.index[-1].normalize()
+            new_rows_count = int((df_full.index > last_date).sum())
+            update_last_row = last_date in df_full.index
+    elif existing_df is not None and not existing_df.empty:
+        last_date = existing_df.index[-1].normalize()
+
+        if not new_df.empty:
+            new_rows = new_df[new_df.index > last_date]
+            new_rows_count = len(new_rows)
+
+            if len(new_df[new_df.index == last_date]) > 0:
+                update_last_row = True
+
+            combined_df = pd.concat([existing_df, new_df])
+            combined_df = combined_df[~combined_df.index.duplicated(keep='last')].sort_index()
+            df_full = combined_df
+        else:
+            df_full = existing_df
+    else:
+        # 시트에 데이터가 없거나 첫 실행인 경우
+        df_full = new_df
+
+    if df_full.empty:
+        return []
+
+    # 날짜 필터링 (분석에는 종가만 필요하므로 Close 컬럼만 복사합니다)
+    df = df_full.loc[start_date_str:end_date_str, ['Close']]
+    del df_full, new_df
+    job.pop('fetched', None)
+    job.pop('existing_df', None)
+    if df.empty:
+        print(f"[{ticker}] 해당 기간({start_date_str} ~ {end_date_str})에 데이터가 없습니다.")
+        return []
+
+    # 통계 분석 (이동평균윈도우는 설정 유지하되, 전체 기간의 표준편차 계산)
+    if settings.STATS_INCREMENTAL:
+        # 저장된 상태가 있으면 새 봉만 갱신, 없거나 이력이 바뀌었으면 전체 재계산
+        state = RollingStatsState.load(ticker)
+        df, state = MarketAnalyzer.calculate_statistics_incremental(df, state, window=settings.LOOKBACK_PERIOD)
+        if settings.STATS_VERIFY:
+            try:
+                state.check_consistency(df, full=settings.STATS_VERIFY_FULL)
+            except ValueError as e:
+                print(f"[{ticker}] {e}. 전체 재계산으로 대체합니다.")
+                df = MarketAnalyzer.calculate_statistics(df, window=settings.LOOKBACK_PERIOD, columns=SUMMARY_STATS_COLUMNS)
+                state = RollingStatsState.from_frame(df, settings.LOOKBACK_PERIOD)
+        state.save(ticker)
+        overall_std = state.overall_std()
+    else:
+        df = MarketAnalyzer.calculate_statistics(df, window=settings.LOOKBACK_PERIOD, columns=SUMMARY_STATS_COLUMNS)
+        overall_std = df['Return'].std()
+
+    # 전체 기간 표준편차로 타점 안정화
+    df['Std_Level_1'] = -overall_std
+    df['Std_Level_2'] = -overall_std * 2
+    df['Std_Level_3'] = -overall_std * 3
+
+    # 백테스트 실행 (수량 100주로 상향)
+    df, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=100)
+
+    ticker_summary = MarketAnalyzer.build_summary(
+        ticker, df, total_qty, total_invest, overall_std, start_date_str, end_date_str, settings.THRESHOLDS
+    )
+    print(f"[{ticker}] {start_date_str}~{end_date_str} 분석 완료. 수익률: {ticker_summary['roi']*100:.2f}%")
+
+    # 출력 단계에는 시트에 쓰는 컬럼만 담은 가벼운 프레임을 넘깁니다.
+    job.update(df=MarketAnalyzer.compact(df), summary=ticker_summary, new_rows_count=new_rows_count, update_last_row=update_last_row)
+    return [job]
+
+
+@with_ticker_context
+def write_ticker_output(job, sinks, checkpoint):
+    """[4단계] 출력 대상(시트, 로컬 결과 저장소)에 종목 쓰기를 쌓고 요약을 체크포인트에 넘깁니다."""
+    # job['df']는 MarketAnalyzer.compact에서 inf/NaN을 이미 0으로 바꾼 프레임입니다.
+    sinks.write_ticker(
+        job['ticker'], job['df'], job['summary'],
+        new_rows_count=job['new_rows_count'], update_last_row=job['update_last_row']
+    )
+    checkpoint.add(job['ticker'], job['summary'])
+    return []
+
+
+def describe_item(item):
+    """파이프라인 오류 메시지용 항목 이름"""
+    if isinstance(item, dict):
+        return item['ticker']
+    return ", ".join(job['ticker'] if isinstance(job, dict) else str(job) for job in item)
+
+
+def connect_sheets(ticker_names: dict = None):
+    """GCP 인증 정보가 있으면 SheetsManager를 만들고, 없으면 None"""
     creds = secrets_loader.get_gcp_credentials()
     if not creds:
         print("Error: GCP 인증 정보(service_account.json)를 찾을 수 없습니다.")
         print("GCP 세팅 후 루트 폴더에 파일을 놓아주세요.")
         # 시트 매니저 없이 분석 결과만 출력하도록 진행 가능
-        sheets = None
-    else:
-        sheets = SheetsManager(creds, settings.SPREADSHEET_NAME)
-        print("Connected to Google Sheets.")
+        return None
+    sheets = SheetsManager(creds, settings.SPREADSHEET_NAME, ticker_names)
+    print("Connected to Google Sheets.")
+    return sheets
 
-    summary_list = []
 
-    # 2. 종목별 분석 수행
-    for ticker in settings.TICKERS:
-        try:
-            # 1. 기존 데이터 읽어오기
-            existing_df = None
-            if sheets:
-                existing_df = sheets.get_history(ticker)
-            
-            new_rows_count = 0
-            update_last_row = False
-
-            # 시트에서 시작 날짜만 읽기 (end_date는 항상 오늘)
-            start_date_str = None
-            if sheets:
-                start_date_str, _ = sheets.get_date_range(ticker)
-            
-            # 기본값 설정: 3년 전 ~ 오늘
-            if not start_date_str:
-                start_date_str = (datetime.now() - timedelta(days=365*3)).strftime('%Y-%m-%d')
-            end_date_str = datetime.now().strftime('%Y-%m-%d')
-
-            if existing_df is not None and not existing_df.empty:
-                last_date = existing_df.index[-1].normalize()
-                start_fetch = last_date.strftime('%Y-%m-%d')
-                
-                new_df = DataFetcher.get_historical_data(ticker, start=start_fetch)
-                
-                if not new_df.empty:
-                    if new_df.index.tz is not None:
-                        new_df.index = new_df.index.tz_localize(None)
-                    new_df.index = new_df.index.normalize()
-                    
-                    new_rows = new_df[new_df.index > last_date]
-                    new_rows_count = len(new_rows)
-                    
-                    if len(new_df[new_df.index == last_date]) > 0:
-                        update_last_row = True
-                        
-                    combined_df = pd.concat([existing_df, new_df])
-                    combined_df = combined_df[~combined_df.index.duplicated(keep='last')].sort_index()
-                    df_full = combined_df
-                else:
-                    df_full = existing_df
-            else:
-                # 시트에 데이터가 없거나 첫 실행인 경우
-                df_full = DataFetcher.get_historical_data(ticker, period="5y")
-                if not df_full.empty:
-                    if df_full.index.tz is not None:
-                        df_full.index = df_full.index.tz_localize(None)
-                    df_full.index = df_full.index.normalize()
-            
-            if df_full.empty:
-                continue
-            
-            # 날짜 필터링
-            df = df_full.loc[start_date_str:end_date_str].copy()
-            if df.empty:
-                print(f"[{ticker}] 해당 기간({start_date_str} ~ {end_date_str})에 데이터가 없습니다.")
-                continue
-
-            # 통계 분석 (이동평균윈도우는 설정 유지하되, 전체 기간의 표준편차 계산)
-            df = MarketAnalyzer.calculate_statistics(df, window=settings.LOOKBACK_PERIOD)
-            
-            # 전체 기간 표준편차로 타점 안정화
-            overall_std = df['Return'].std()
-            df['Std_Level_1'] = -overall_std
-            df['Std_Level_2'] = -overall_std * 2
-            df['Std_Level_3'] = -overall_std * 3
-            
-            # 백테스트 실행 (수량 100주로 상향)
-            df, total_qty, total_invest = MarketAnalyzer.run_backtest(df, buy_quantity=100)
-            
-            # 최신 상태 추출
-            latest = df.iloc[-1]
-            current_price = latest['Close']
-            total_val = total_qty * current_price
-            total_profit = total_val - total_invest
-            roi = total_profit / total_invest if total_invest > 0 else 0
-            
-            ticker_summary = {
-                'ticker': ticker,
-                'current_price': float(current_price),
-                'start_date': start_date_str,
-                'end_date': end_date_str,
-                'total_qty': int(total_qty),
-                'total_invest': float(total_invest),
-                'total_val': float(total_val),
-                'total_profit': float(total_profit),
-                'roi': float(roi),
-                'volatility': float(overall_std),
-                's1': float(-overall_std),
-                's2': float(-overall_std * 2),
-                's3': float(-overall_std * 3),
-                'buy_count': int((df['Buy_Signal'] == "매수").sum()),
-                'max_gain': float(df['Return'].max()),
-                'max_loss': float(df['Return'].min()),
-                'z_score': float(latest['Z_Score']) if not pd.isna(latest['Z_Score']) else 0.0,
-                'signal': MarketAnalyzer.get_signal(latest['Z_Score'], settings.THRESHOLDS)[0],
-                'target_1': float(MarketAnalyzer.get_target_price(latest['SMA_Price'], latest['STD_Price'], settings.THRESHOLDS["LEVEL_1"])),
-                'target_2': float(MarketAnalyzer.get_target_price(latest['SMA_Price'], latest['STD_Price'], settings.THRESHOLDS["LEVEL_2"])),
-                'target_3': float(MarketAnalyzer.get_target_price(latest['SMA_Price'], latest['STD_Price'], settings.THRESHOLDS["LEVEL_3"])),
-                'daily_change': float(latest['Return']) if not pd.isna(latest['Return']) else 0.0,
-            }
-            summary_list.append(ticker_summary)
-            
-            print(f"[{ticker}] {start_date_str}~{end_date_str} 분석 완료. 수익률: {roi*100:.2f}%")
-
-            if sheets:
-                clean_df = df.replace([float('inf'), float('-inf')], 0).fillna(0)
-                sheets.update_ticker_sheet(ticker, clean_df, ticker_summary, new_rows_count=new_rows_count, update_last_row=update_last_row)
-                
-        except Exception as e:
-            print(f"Error processing {ticker}: {e}")
-
-    # 3. 대시보드 업데이트
-    if sheets and summary_list:
-        sheets.update_dashboard(summary_list)
-        print("Dashboard updated successfully.")
-    
-    # 4. 텔레그램 알림 전송
+def run_worker(tickers, sheets, sinks, manifest):
+    """
+    작업 큐에서 종목을 선점해 시트 읽기 → 가격 수집 → 분석 → 출력 파이프라인으로 처리합니다.
+    RUN_CHECKPOINT_EVERY개 종목마다 출력 대상의 쓰기를 내보내고 완료로 기록합니다.
+    반환: 단계별 타이밍
+    """
+    end_date_str = datetime.now().strftime('%Y-%m-%d')
+    price_cache = PriceCache() if settings.PRICE_CACHE_ENABLED else None
+    checkpoint = CheckpointBuffer(manifest, flush=sinks.flush if sinks.sinks else None)
+    store = sinks.get("sqlite")
+
+    workers = settings.PIPELINE_WORKERS
+    pipeline = Pipeline([
+        Stage("read", lambda batch: read_sheet_state(batch, sheets, price_cache, store), workers=1),
+        Stage("fetch", lambda batch: fetch_prices(batch, price_cache), workers=workers["fetch"]),
+        Stage("analyze", lambda job: analyze_ticker(job, price_cache, end_date_str), workers=workers["analyze"]),
+        Stage("output", lambda job: write_ticker_output(job, sinks, checkpoint), workers=workers["output"]),
+    ], queue_size=settings.PIPELINE_QUEUE_SIZE, item_name=describe_item)
+    # 선점은 파이프라인이 배치를 가져갈 때마다 이뤄지므로 여러 워커 프로세스가 종목을 나눠 가집니다.
+    timings = pipeline.run(manifest.claim_batches(tickers, settings.PIPELINE_FETCH_BATCH_SIZE))
+
+    try:
+        checkpoint.commit()
+    except Exception as e:
+        print(f"Error writing results: {e}")
+    # 남은 시트 쓰기를 기다린 뒤에 미완료 종목을 정리합니다 (기한을 넘긴 쓰기는 저장되어 완료로 기록됩니다).
+    sinks.drain()
+    unfinished = manifest.finish()
+    if unfinished:
+        print(f"Failed tickers (retried on the next run today): {', '.join(unfinished)}")
+    return timings
+
+
+def merge(tickers, sheets, sinks, manifest, ticker_names: dict = None):
+    """
+    [병합] 모든 샤드/워커의 완료 결과로 대시보드와 텔레그램 요약을 만듭니다.
+    반환: (요약 목록, 시트 전송 통계)
+    """
+    status = manifest.status(tickers)
+    print(f"Run {manifest.run_date}: {status['done']}/{status['total']} done, "
+          f"{status['failed']} failed, {status['pending']} pending")
+    # 완료 순서와 무관하게 설정된 종목 순서로 결과를 정렬합니다.
+    summary_list = manifest.results(tickers)
+
+    # 텔레그램 알림은 백그라운드로 먼저 보내고, 그동안 대시보드/시트 쓰기를 일괄 전송합니다.
+    telegram = None
+    telegram_future = None
     if summary_list:
         from src.telegram_notifier import get_telegram_notifier
-        telegram = get_telegram_notifier()
+        telegram = get_telegram_notifier(ticker_names)
         if telegram:
-            message = telegram.format_summary(summary_list)
-            if telegram.send_message(message):
-                print("Telegram notification sent.")
-            else:
-                print("Failed to send Telegram notification.")
+            telegram_future = telegram.send_messages_async(telegram.format_summary_chunks(summary_list))
         else:
             print("Telegram not configured. Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID.")
-    
+
+    if summary_list:
+        sinks.write_dashboard(summary_list)
+    statuses = []
+    sinks.flush(on_done=statuses.append)
+    # 쓰기 큐가 빌 때까지(또는 기한까지) 기다립니다. 그동안 텔레그램 전송도 함께 진행됩니다.
+    if sinks.drain() == 0 and statuses == ["sent"] and sheets and summary_list:
+        print("Dashboard updated successfully.")
+    sheets_stats = sheets.batch.stats() if sheets else None
+
+    # 텔레그램 전송 완료 대기
+    if telegram_future:
+        if telegram_future.result():
+            print("Telegram notification sent.")
+        else:
+            print("Failed to send Telegram notification.")
+        telegram.close()
+
+    manifest.write_summary(tickers)
+    return summary_list, sheets_stats
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Stock Analysis Bot")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--shard", default=None, help="i/n: 종목을 n개로 나눈 i번째 샤드만 처리 (병합 생략)")
+    mode.add_argument("--worker", action="store_true", help="작업 큐에서 종목을 선점해 처리만 하고 병합 생략")
+    mode.add_argument("--merge", action="store_true", help="처리 없이 오늘 완료된 결과만 병합")
+    parser.add_argument("--date", default=None, help="실행 기록 날짜 (YYYY-MM-DD, 기본: 오늘)")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", default=None, metavar="DIR", help="Yahoo/Sheets/Telegram 호출을 DIR에 기록")
+    cassette.add_argument("--replay", default=None, metavar="DIR", help="DIR에 기록된 호출로 네트워크 없이 재생")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv or [])
+    if not (args.record or args.replay):
+        return run(args)
+
+    # 외부 입출력을 카세트에 기록하거나, 기록된 카세트로 네트워크 없이 재생합니다.
+    from src.cassette import Cassette
+    cassette = Cassette(args.record or args.replay, "record" if args.record else "replay")
+    with cassette.activate():
+        result = run(args)
+    cassette.finish(result["summaries"])
+    return result
+
+
+def run(args):
+    print("=== Stock Analysis Bot Start ===")
+    metrics.reset()
+    metrics.start_profiler()
+
+    # 1. 종목 목록과 오늘 실행 기록 로드, 인증
+    universe, ticker_names = Universe.load()
+    manifest = RunManifest(args.date)
+    manifest.prune()
+    sheets = connect_sheets(ticker_names) if "sheets" in sink_names() else None
+    if sheets and not sheets.replay_pending():
+        print("Warning: 이전 실행의 시트 쓰기를 아직 보내지 못해 이번 실행은 시트 없이 진행합니다.")
+        sheets = None
+    sinks = build_sinks(sheets)
+
+    # 2. 처리 (샤드 지정 시 해당 샤드만)
+    timings = []
+    if not args.merge:
+        tickers = Universe.shard(universe, *Universe.parse_shard(args.shard)) if args.shard else universe
+        timings = run_worker(tickers, sheets, sinks, manifest)
+
+    # 3. 병합: 대시보드 업데이트 및 텔레그램 알림
+    summary_list = []
+    sheets_stats = sheets.batch.stats() if sheets else None
+    if not (args.shard or args.worker):
+        summary_list, sheets_stats = merge(universe, sheets, sinks, manifest, ticker_names)
+    sinks.close()
+
+    print("Stage timings:")
+    for timing in timings:
+        print(f"  {timing['stage']:<8} wall {timing['wall_sec']:.2f}s, busy {timing['busy_sec']:.2f}s, "
+              f"items {timing['items']} (errors {timing['errors']}), workers {timing['workers']}")
+
+    report_path = metrics.write_report(stages=timings, sheets=sheets_stats, tickers=len(universe))
+    if report_path:
+        print(f"Metrics report: {report_path}")
+    profile_path = metrics.stop_profiler()
+    if profile_path:
+        print(f"Profile: {profile_path}")
+
     print("=== Stock Analysis Bot Done ===")
+    return {"summaries": summary_list, "stages": timings}
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -1,57 +1,243 @@
 # src/analyzer.py
 import pandas as pd
 import numpy as np
+from src.rolling_state import RollingStatsState
+from src.metrics import metrics
+
+# 시트 출력(update_ticker_sheet)에 필요한 컬럼
+OUTPUT_COLUMNS = ('Close', 'Return', 'Buy_Signal', 'Buy_Qty', 'Buy_Amount')
+# calculate_statistics가 만드는 컬럼 (Return은 항상 계산)
+STATS_COLUMNS = ('Return', 'Vol_Std', 'SMA_Price', 'STD_Price', 'Z_Score', 'Std_Level_1', 'Std_Level_2', 'Std_Level_3')
+# 일일 실행(main.analyze_ticker)이 쓰는 컬럼 (Std_Level_1~3은 전체 기간 표준편차로 덮어씁니다)
+SUMMARY_STATS_COLUMNS = ('Return', 'SMA_Price', 'STD_Price', 'Z_Score')
+# 반올림해 그대로 출력하지 않는 통계 컬럼은 float32로 충분합니다.
+FLOAT32_COLUMNS = ('Vol_Std', 'SMA_Price', 'STD_Price', 'Z_Score', 'Std_Level_1', 'Std_Level_2', 'Std_Level_3')
+
 
 class MarketAnalyzer:
     @staticmethod
-    def calculate_statistics(df: pd.DataFrame, window: int = 252) -> pd.DataFrame:
+    @metrics.timed("analyzer.calculate_statistics")
+    def calculate_statistics(df: pd.DataFrame, window: int = 252, columns=STATS_COLUMNS) -> pd.DataFrame:
         """
         일일 등락률 및 등락률 기반 표준편차를 계산합니다. (이미지 방식)
+        columns: 계산할 컬럼 (STATS_COLUMNS 중). 호출 측에서 덮어쓰거나 쓰지 않는 컬럼은 빼면 계산하지 않습니다.
+        numba가 있으면 한 번의 순회로 모두 계산하는 커널(src/moments.py)을 쓰고, 없으면 pandas rolling으로 계산합니다.
         """
-        # 일일 등락률 계산
-        df['Return'] = df['Close'].pct_change()
-        
-        # 등락률의 이동 표준편차 (Volatility %)
-        df['Vol_Std'] = df['Return'].rolling(window=window).std()
-        
+        columns = set(columns)
+        levels = [col for col in ('Std_Level_1', 'Std_Level_2', 'Std_Level_3') if col in columns]
+
+        from src import moments
+        if moments.JIT_ENABLED:
+            outputs = [
+                name for name in moments.OUTPUTS
+                if name == 'Return' or name in columns or (name == 'Vol_Std' and levels)
+            ]
+            results = moments.rolling_moments(df['Close'].to_numpy(dtype=np.float64), window, outputs)
+            for name, values in results.items():
+                df[name] = values
+        else:
+            # 일일 등락률 계산
+            df['Return'] = df['Close'].pct_change()
+
+            # 등락률의 이동 표준편차 (Volatility %)
+            if 'Vol_Std' in columns or levels:
+                df['Vol_Std'] = df['Return'].rolling(window=window).std()
+
+            # 기존 Z-Score (가격 기준)도 유지
+            if columns & {'SMA_Price', 'STD_Price', 'Z_Score'}:
+                rolling = df['Close'].rolling(window=window)
+                df['SMA_Price'] = rolling.mean()
+                df['STD_Price'] = rolling.std()
+                df['Z_Score'] = (df['Close'] - df['SMA_Price']) / df['STD_Price']
+
         # 이미지의 1, 2, 3표준편차 선 계산
+        for col in levels:
+            df[col] = -df['Vol_Std'] * int(col[-1])
+
+        return df
+
+    @staticmethod
+    @metrics.timed("analyzer.calculate_statistics_incremental")
+    def calculate_statistics_incremental(df: pd.DataFrame, state: RollingStatsState = None, window: int = 252):
+        """
+        저장된 이동 통계 상태(RollingStatsState)를 이어받아 새 봉만 O(1)로 갱신합니다.
+        상태가 없거나 이력이 달라졌으면(시작일 변경, 수정주가 재수집, 시트에서 읽은 반올림 종가 등 종가 해시가 다르면)
+        전체 재계산으로 대체합니다.
+        이동 통계 컬럼(Vol_Std, SMA_Price, STD_Price, Z_Score)은 상태의 마지막 봉과 새 봉에만 채워집니다.
+        반환: (df, state)
+        """
+        if state is None or state.window != window or not state.matches(df):
+            df = MarketAnalyzer.calculate_statistics(df, window=window)
+            return df, RollingStatsState.from_frame(df, window)
+
+        # 등락률은 시트 테이블에 전체가 필요하므로 벡터 연산으로 계산
+        df['Return'] = df['Close'].pct_change()
+
+        columns = ['Vol_Std', 'SMA_Price', 'STD_Price', 'Z_Score']
+        values = {col: np.full(len(df), np.nan) for col in columns}
+
+        position = df.index.get_loc(state.last_date)
+        current = state.current()
+        for col in columns:
+            values[col][position] = current[col]
+
+        closes = df['Close'].to_numpy()
+        for i in range(position + 1, len(df)):
+            row = state.update(df.index[i], closes[i])
+            for col in columns:
+                values[col][i] = row[col]
+
+        for col in columns:
+            df[col] = values[col]
+        state.digest = RollingStatsState.history_digest(df)
         df['Std_Level_1'] = -df['Vol_Std']
         df['Std_Level_2'] = -df['Vol_Std'] * 2
         df['Std_Level_3'] = -df['Vol_Std'] * 3
-        
-        # 기존 Z-Score (가격 기준)도 유지
-        df['SMA_Price'] = df['Close'].rolling(window=window).mean()
-        df['STD_Price'] = df['Close'].rolling(window=window).std()
-        df['Z_Score'] = (df['Close'] - df['SMA_Price']) / df['STD_Price']
-        
-        return df
+        return df, state
 
     @staticmethod
+    def backtest_arrays(close: np.ndarray, returns: np.ndarray, level: np.ndarray, buy_quantity: int = 50):
+        """
+        run_backtest의 NumPy 엔진입니다. 행 단위 순회 없이 배열 연산으로 계산합니다.
+        반환: (매수 마스크, 매수 수량, 매수 금액, 누적 수량, 누적 매수금액)
+        """
+        close = np.asarray(close, dtype=np.float64)
+        returns = np.asarray(returns, dtype=np.float64)
+        level = np.asarray(level, dtype=np.float64)
+
+        # 매수 조건: 등락률이 -1표준편차보다 낮을 때 (NaN 비교는 False, 첫 행은 제외)
+        mask = returns < level
+        if len(mask):
+            mask[0] = False
+
+        qty = np.where(mask, buy_quantity, 0)
+        amount = np.where(mask, close * buy_quantity, 0.0)
+
+        # np.cumsum은 순차 누적이므로 기존 루프의 합산 순서와 동일한 결과를 냅니다.
+        cum_qty = np.cumsum(qty)
+        cum_invest = np.cumsum(amount)
+        return mask, qty, amount, cum_qty, cum_invest
+
+    @staticmethod
+    @metrics.timed("analyzer.run_backtest")
     def run_backtest(df: pd.DataFrame, buy_quantity: int = 50):
         """
-        이미지 내 테이블처럼 과거 데이터를 순회하며 가상 매수 시뮬레이션을 수행합니다.
+        이미지 내 테이블처럼 과거 데이터 전체에 대해 가상 매수 시뮬레이션을 수행합니다.
         조건: 당일 등락률 < 1표준편차(Std_Level_1)
         """
-        balance = 0
-        total_quantity = 0
-        total_investment = 0
-        df['Buy_Signal'] = ""
-        df['Buy_Qty'] = 0
-        df['Buy_Amount'] = 0.0
-
-        for i in range(1, len(df)):
-            # 매수 조건: 등락률이 -1표준편차보다 낮을 때
-            if not pd.isna(df['Std_Level_1'].iloc[i]) and df['Return'].iloc[i] < df['Std_Level_1'].iloc[i]:
-                price = df['Close'].iloc[i]
-                df.at[df.index[i], 'Buy_Signal'] = "매수"
-                df.at[df.index[i], 'Buy_Qty'] = buy_quantity
-                df.at[df.index[i], 'Buy_Amount'] = price * buy_quantity
-                
-                total_quantity += buy_quantity
-                total_investment += (price * buy_quantity)
+        mask, qty, amount, cum_qty, cum_invest = MarketAnalyzer.backtest_arrays(
+            df['Close'].to_numpy(), df['Return'].to_numpy(), df['Std_Level_1'].to_numpy(), buy_quantity
+        )
+
+        # 문자열 대신 1바이트 코드의 범주형으로 저장합니다 (값/비교는 "매수"/""와 동일).
+        df['Buy_Signal'] = pd.Categorical.from_codes(mask.astype(np.int8), categories=["", "매수"])
+        df['Buy_Qty'] = qty
+        df['Buy_Amount'] = amount
+
+        if not mask.any():
+            return df, 0, 0
 
+        total_quantity = int(cum_qty[-1])
+        total_investment = float(cum_invest[-1])
         return df, total_quantity, total_investment
 
+    @staticmethod
+    @metrics.timed("analyzer.run_strategy")
+    def run_strategy(df: pd.DataFrame, params: dict = None):
+        """
+        σ 단계별 분할 매수 + 익절/손절 + 최대 보유 수량 + 현금 한도 전략을 시뮬레이션합니다 (src/strategy.py).
+        매수 기준 σ는 Std_Level_1(= -σ)을 그대로 씁니다. params는 settings.STRATEGY의 일부 키를 덮어씁니다.
+        반환: (df에 Trade/Position 컬럼을 추가한 프레임, 결과 dict)
+        QTY_LEVEL_1~3을 모두 같은 수량으로 두고 나머지 규칙을 끄면 run_backtest와 같은 결과입니다.
+        """
+        from src import strategy
+
+        result, actions, positions = strategy.run(
+            df['Close'].to_numpy(), df['Return'].to_numpy(), -df['Std_Level_1'].to_numpy(), params
+        )
+        df['Trade'] = pd.Categorical.from_codes(actions, categories=list(strategy.ACTION_LABELS))
+        df['Position'] = positions
+        return df, result
+
+    @staticmethod
+    def compact(df: pd.DataFrame, columns=OUTPUT_COLUMNS) -> pd.DataFrame:
+        """
+        분석이 끝난 프레임에서 요청한 컬럼만 담은 가벼운 프레임을 만듭니다.
+        - inf/NaN은 0으로 바꿉니다 (시트 출력 전 replace(...).fillna(0)과 같은 값, 전체 프레임 복사 없음)
+        - FLOAT32_COLUMNS는 float32, Buy_Qty는 int32로 줄입니다.
+        - Close/Return/Buy_Amount는 시트에 소수 둘째 자리로 반올림해 쓰므로 출력이 바뀌지 않도록 float64를 유지합니다.
+        """
+        data = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                data[col] = series
+                continue
+            values = series.to_numpy()
+            if values.dtype.kind == 'f':
+                values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+                if col in FLOAT32_COLUMNS:
+                    values = values.astype(np.float32)
+            elif col == 'Buy_Qty':
+                values = values.astype(np.int32)
+            data[col] = values
+        return pd.DataFrame(data, index=df.index)
+
+    @staticmethod
+    def max_drawdown(close: np.ndarray, cum_qty: np.ndarray, cum_invest: np.ndarray) -> np.ndarray:
+        """
+        누적 매수 포지션의 최대 낙폭(MDD).
+        평가금액 / 누적 매수금액(투자금 배수)의 고점 대비 최대 하락률을 마지막 축 기준으로 계산합니다.
+        첫 매수 이전 구간은 제외하며, 매수가 없으면 0을 반환합니다.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 첫 매수 이전은 0 / 0 = NaN이 되고, fmax 계열은 NaN을 건너뜁니다.
+            multiple = np.multiply(cum_qty, close)
+            np.divide(multiple, cum_invest, out=multiple)
+            peak = np.fmax.accumulate(multiple, axis=-1)
+            np.divide(multiple, peak, out=multiple)
+            worst = 1 - np.fmin.reduce(multiple, axis=-1)
+        return np.nan_to_num(worst, nan=0.0)
+
+    @staticmethod
+    def build_summary(ticker: str, df: pd.DataFrame, total_qty: int, total_invest: float, overall_std: float,
+                      start_date: str, end_date: str, thresholds: dict) -> dict:
+        """
+        백테스트 결과와 최신 행으로 종목 요약(대시보드/텔레그램/시트 상단 요약용)을 만듭니다.
+        """
+        latest = df.iloc[-1]
+        current_price = latest['Close']
+        total_val = total_qty * current_price
+        total_profit = total_val - total_invest
+        roi = total_profit / total_invest if total_invest > 0 else 0
+
+        return {
+            'ticker': ticker,
+            'current_price': float(current_price),
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_qty': int(total_qty),
+            'total_invest': float(total_invest),
+            'total_val': float(total_val),
+            'total_profit': float(total_profit),
+            'roi': float(roi),
+            'volatility': float(overall_std),
+            's1': float(-overall_std),
+            's2': float(-overall_std * 2),
+            's3': float(-overall_std * 3),
+            'buy_count': int((df['Buy_Signal'] == "매수").sum()),
+            'max_gain': float(df['Return'].max()),
+            'max_loss': float(df['Return'].min()),
+            'z_score': float(latest['Z_Score']) if not pd.isna(latest['Z_Score']) else 0.0,
+            'signal': MarketAnalyzer.get_signal(latest['Z_Score'], thresholds)[0],
+            'target_1': float(MarketAnalyzer.get_target_price(latest['SMA_Price'], latest['STD_Price'], thresholds["LEVEL_1"])),
+            'target_2': float(MarketAnalyzer.get_target_price(latest['SMA_Price'], latest['STD_Price'], thresholds["LEVEL_2"])),
+            'target_3': float(MarketAnalyzer.get_target_price(latest['SMA_Price'], latest['STD_Price'], thresholds["LEVEL_3"])),
+            'daily_change': float(latest['Return']) if not pd.isna(latest['Return']) else 0.0,
+        }
+
     @staticmethod
     def get_target_price(sma: float, std: float, target_z: float) -> float:
         """
@@ -0,0 +1,361 @@
+# src/cassette.py
+"""
+외부 입출력 기록/재생(카세트).
+Yahoo Finance(yfinance), Google Sheets(gspread), Telegram HTTP 호출을 디렉터리에 기록해 두었다가
+네트워크 없이 그대로 재생합니다. 실제 시세와 시트 상태로 성능 변경 전후의 결과를 비교하는 데 씁니다.
+
+- 읽기(시세, 워크시트 목록, values_batch_get)는 요청 내용을 키로 저장하고 재생 시 같은 응답을 돌려줍니다.
+- 쓰기(batch_update, values_batch_update, add_worksheet, 텔레그램 전송)는 요청 단위로 writes.jsonl에 남기고,
+  재생 시에는 전송하지 않고 replay-writes.jsonl에 남겨 기록과 비교합니다 (순서 무관, 요청/범위 단위).
+- 실행 시각은 기록 시작 시각으로 고정하고, 가격 캐시/이동 통계 상태/실행 기록은 카세트 전용 빈 디렉터리를 씁니다.
+  그래야 기록 때와 같은 요청이 같은 순서의 데이터로 재현됩니다.
+- 인증 정보와 봇 토큰은 저장하지 않습니다.
+
+실행: python main.py --record cassettes/2024-06-03   (한 번 실제로 실행하며 기록)
+      python main.py --replay cassettes/2024-06-03   (네트워크 없이 재생하고 결과 비교)
+"""
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+import requests
+from config import settings
+from src.universe import Universe
+
+# 실행 시각을 고정할 모듈 (모듈 전역 datetime을 고정 시각 클래스로 바꿉니다, python main.py로 실행하면 __main__)
+CLOCK_MODULES = ("__main__", "main", "src.sheets_manager", "src.telegram_notifier", "src.run_manifest", "src.price_cache")
+# 요청 키에서 제외할 yfinance 인자 (결과에 영향이 없는 실행 옵션)
+YAHOO_IGNORED_KWARGS = ("threads", "progress")
+
+
+class CassetteMiss(LookupError):
+    """재생 중 기록에 없는 요청"""
+
+
+def _frozen_datetime(instant: datetime):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return instant if tz is None else instant.astimezone(tz)
+
+    return FrozenDatetime
+
+
+def _key(*parts) -> str:
+    return json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+
+
+def _worksheet_props(worksheet) -> dict:
+    return {"title": worksheet.title, "id": worksheet.id,
+            "row_count": worksheet.row_count, "col_count": worksheet.col_count}
+
+
+class ReplayWorksheet:
+    """재생용 워크시트 (SheetsManager가 쓰는 속성만 가집니다)"""
+
+    def __init__(self, title: str, id: int, row_count: int, col_count: int):
+        self.title = title
+        self.id = id
+        self.row_count = int(row_count)
+        self.col_count = int(col_count)
+
+
+class CassetteSpreadsheet:
+    """
+    gspread Spreadsheet를 감싸 SheetsManager가 쓰는 호출을 기록/재생합니다.
+    기록 모드에서는 실제 spreadsheet로 전달하고, 재생 모드(spreadsheet=None)에서는 기록된 응답만 사용합니다.
+    """
+
+    def __init__(self, cassette: "Cassette", spreadsheet=None):
+        self.cassette = cassette
+        self.spreadsheet = spreadsheet
+
+    def worksheets(self, *args, **kwargs):
+        if self.spreadsheet is None:
+            return [ReplayWorksheet(**props) for props in self.cassette.lookup("sheets", _key("worksheets"))]
+        worksheets = self.spreadsheet.worksheets(*args, **kwargs)
+        self.cassette.store("sheets", _key("worksheets"), [_worksheet_props(ws) for ws in worksheets])
+        return worksheets
+
+    def values_batch_get(self, ranges, params=None):
+        key = _key("values_batch_get", list(ranges), params)
+        if self.spreadsheet is None:
+            return self.cassette.lookup("sheets", key)
+        response = self.spreadsheet.values_batch_get(ranges, params=params)
+        self.cassette.store("sheets", key, response)
+        return response
+
+    def add_worksheet(self, title: str, rows, cols, index=None):
+        self.cassette.write("add_worksheet", {"title": title, "rows": str(rows), "cols": str(cols)})
+        key = _key("add_worksheet", title)
+        if self.spreadsheet is None:
+            return ReplayWorksheet(**self.cassette.lookup("sheets", key))
+        worksheet = self.spreadsheet.add_worksheet(title=title, rows=rows, cols=cols, index=index)
+        self.cassette.store("sheets", key, _worksheet_props(worksheet))
+        return worksheet
+
+    def batch_update(self, body: dict):
+        for request in body.get("requests", []):
+            self.cassette.write("batch_update", request)
+        if self.spreadsheet is None:
+            return {"replies": []}
+        return self.spreadsheet.batch_update(body)
+
+    def values_batch_update(self, body: dict):
+        # 셀 수 기준 나눔은 실행마다 달라질 수 있으므로 범위 단위로 남깁니다.
+        for data in body.get("data", []):
+            self.cassette.write("values_batch_update", {"range": data["range"], "values": data["values"]})
+        if self.spreadsheet is None:
+            return {}
+        return self.spreadsheet.values_batch_update(body)
+
+
+class CassetteClient:
+    """gspread Client 대체. 어떤 방식으로 열어도 같은 카세트 spreadsheet를 돌려줍니다."""
+
+    def __init__(self, cassette: "Cassette", client=None):
+        self.cassette = cassette
+        self.client = client
+
+    def _wrap(self, method: str, *args):
+        if self.client is None:
+            return CassetteSpreadsheet(self.cassette)
+        return CassetteSpreadsheet(self.cassette, getattr(self.client, method)(*args))
+
+    def open_by_key(self, key):
+        return self._wrap("open_by_key", key)
+
+    def open(self, title):
+        return self._wrap("open", title)
+
+    def create(self, title):
+        return self._wrap("create", title)
+
+
+class Cassette:
+    """
+    path 디렉터리에 외부 호출을 기록(mode="record")하거나 재생(mode="replay")합니다.
+    activate() 안에서 main.run 등을 실행하고, 끝나면 finish(summary_list)로 저장/비교합니다.
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.recording = mode == "record"
+        self.interactions = {"yahoo": {}, "sheets": {}, "telegram": {}}
+        self.meta = {}
+        self.misses = []
+        self._cursor = Counter()
+        self._writes = []
+        self._lock = threading.Lock()
+
+        if self.recording:
+            os.makedirs(os.path.join(path, "yahoo"), exist_ok=True)
+            self.meta["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        else:
+            with open(os.path.join(path, "cassette.json"), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.meta = saved["meta"]
+            self.interactions = saved["interactions"]
+
+    # 저장소 ---------------------------------------------------------------
+    def store(self, kind: str, key: str, response):
+        with self._lock:
+            self.interactions[kind].setdefault(key, []).append(response)
+
+    def lookup(self, kind: str, key: str):
+        """같은 요청이 여러 번 기록됐으면 기록 순서대로, 다 쓰면 마지막 응답을 돌려줍니다."""
+        with self._lock:
+            responses = self.interactions[kind].get(key)
+            if not responses:
+                self.misses.append((kind, key))
+                raise CassetteMiss(f"cassette has no {kind} response for {key}")
+            index = min(self._cursor[(kind, key)], len(responses) - 1)
+            self._cursor[(kind, key)] += 1
+            return responses[index]
+
+    def write(self, kind: str, payload: dict):
+        with self._lock:
+            self._writes.append(_key(kind, payload))
+
+    # Yahoo Finance --------------------------------------------------------
+    def _yahoo(self, key: str, fetch):
+        if not self.recording:
+            return pd.read_pickle(os.path.join(self.path, "yahoo", self.lookup("yahoo", key)))
+        df = fetch()
+        with self._lock:
+            responses = self.interactions["yahoo"].setdefault(key, [])
+            name = f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}-{len(responses)}.pkl"
+            responses.append(name)
+        df.to_pickle(os.path.join(self.path, "yahoo", name))
+        return df
+
+    def _yahoo_ticker(self, real_ticker):
+        cassette = self
+
+        class _Ticker:
+            def __init__(self, symbol, *args, **kwargs):
+                self.ticker = symbol
+                self._args = (args, kwargs)
+
+            def history(self, *args, **kwargs):
+                key = _key("history", self.ticker, args, kwargs)
+                return cassette._yahoo(
+                    key, lambda: real_ticker(self.ticker, *self._args[0], **self._args[1]).history(*args, **kwargs)
+                )
+
+        return _Ticker
+
+    def _yahoo_download(self, real_download):
+        def download(tickers, *args, **kwargs):
+            symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+            options = {k: v for k, v in kwargs.items() if k not in YAHOO_IGNORED_KWARGS}
+            return self._yahoo(_key("download", symbols, args, options), lambda: real_download(tickers, *args, **kwargs))
+
+        return download
+
+    # Telegram -------------------------------------------------------------
+    def _telegram_request(self, real_request):
+        def request(session, method, url, **kwargs):
+            if "api.telegram.org" not in url:
+                if not self.recording:
+                    raise CassetteMiss(f"replay: unexpected request to {url}")
+                return real_request(session, method, url, **kwargs)
+            # 토큰이 들어 있는 URL 대신 API 메서드와 본문으로 기록합니다.
+            payload = kwargs.get("json") or kwargs.get("data")
+            key = _key(url.rsplit("/", 1)[-1], payload)
+            self.write("telegram", payload)
+            if self.recording:
+                response = real_request(session, method, url, **kwargs)
+                self.store("telegram", key, {"status": response.status_code, "body": response.text})
+                return response
+            try:
+                recorded = self.lookup("telegram", key)
+            except CassetteMiss:
+                recorded = {"status": 200, "body": '{"ok": true, "result": {}}'}
+            response = requests.Response()
+            response.url = url
+            response.status_code = recorded["status"]
+            response._content = recorded["body"].encode("utf-8")
+            return response
+
+        return request
+
+    # 설치 -----------------------------------------------------------------
+    @contextlib.contextmanager
+    def activate(self):
+        """외부 호출 가로채기, 시각 고정, 카세트 전용 로컬 상태 디렉터리를 설치합니다."""
+        import gspread
+        import yfinance as yf
+        from oauth2client.service_account import ServiceAccountCredentials
+        from config import secrets_loader
+
+        state_dir = os.path.join(self.path, "state")
+        shutil.rmtree(state_dir, ignore_errors=True)
+        universe_file = os.path.join(self.path, "universe.txt")
+        if self.recording:
+            tickers, names = Universe.load()
+            with open(universe_file, "w", encoding="utf-8") as f:
+                f.writelines(f"{ticker},{names.get(ticker, ticker)}\n" for ticker in tickers)
+            self.meta["sheets"] = secrets_loader.get_gcp_credentials() is not None
+            chat_ids = os.getenv("TELEGRAM_CHAT_ID") if os.getenv("TELEGRAM_BOT_TOKEN") else None
+            self.meta["telegram_chat_ids"] = chat_ids
+
+        instant = datetime.fromisoformat(self.meta["recorded_at"])
+        clock = _frozen_datetime(instant)
+        patches = [
+            (yf, "Ticker", self._yahoo_ticker(yf.Ticker)),
+            (yf, "download", self._yahoo_download(yf.download)),
+            (requests.sessions.Session, "request", self._telegram_request(requests.sessions.Session.request)),
+            (settings, "UNIVERSE_FILE", universe_file),
+            (settings, "PRICE_CACHE_DIR", os.path.join(state_dir, "prices")),
+            (settings, "STATS_STATE_DIR", os.path.join(state_dir, "stats")),
+            (settings, "RUN_DIR", os.path.join(state_dir, "runs")),
+            (settings, "SHEETS_PENDING_DIR", os.path.join(state_dir, "sheets-pending")),
+            (settings, "RESULT_DB_PATH", os.path.join(state_dir, "results.sqlite")),
+            (settings, "SHEETS_FINGERPRINT_DIR", os.path.join(state_dir, "sheets-fingerprints")),
+        ]
+        patches += [
+            (sys.modules[name], "datetime", clock) for name in CLOCK_MODULES
+            if getattr(sys.modules.get(name), "datetime", None) is datetime
+        ]
+
+        real_authorize = gspread.authorize
+        if self.recording:
+            patches.append((gspread, "authorize", lambda creds: CassetteClient(self, real_authorize(creds))))
+        else:
+            patches.append((gspread, "authorize", lambda creds: CassetteClient(self)))
+            patches.append((ServiceAccountCredentials, "from_json_keyfile_dict",
+                            classmethod(lambda cls, info, scope: None)))
+            credentials = {"type": "service_account"} if self.meta.get("sheets") else None
+            patches.append((secrets_loader, "get_gcp_credentials", lambda: credentials))
+            # 재생에는 API 할당량이 없으므로 시트 요청 속도 제한을 풉니다.
+            patches.append((settings, "SHEETS_READ_QUOTA_PER_MIN", 1e9))
+            patches.append((settings, "SHEETS_WRITE_QUOTA_PER_MIN", 1e9))
+
+        originals = [(obj, name, obj.__dict__.get(name, getattr(obj, name))) for obj, name, _ in patches]
+        env_backup = {key: os.environ.get(key) for key in ("TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID")}
+        try:
+            for obj, name, value in patches:
+                setattr(obj, name, value)
+            if not self.recording:
+                os.environ.pop("TELEGRAM_BOT_TOKEN", None)
+                os.environ.pop("TELEGRAM_CHAT_ID", None)
+                if self.meta.get("telegram_chat_ids"):
+                    os.environ["TELEGRAM_BOT_TOKEN"] = "replay"
+                    os.environ["TELEGRAM_CHAT_ID"] = self.meta["telegram_chat_ids"]
+            yield self
+        finally:
+            for obj, name, value in originals:
+                setattr(obj, name, value)
+            shutil.rmtree(state_dir, ignore_errors=True)
+            for key, value in env_backup.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    # 저장/비교 ------------------------------------------------------------
+    def _write_lines(self, name: str):
+        with open(os.path.join(self.path, name), "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in sorted(self._writes))
+
+    def finish(self, summary_list: list) -> bool:
+        """
+        기록 모드: 카세트(cassette.json)와 쓰기 기록(writes.jsonl)을 저장합니다.
+        재생 모드: 요약 목록과 쓰기 요청을 기록과 비교해 출력합니다. 모두 같으면 True
+        """
+        # NaN이 섞여도 비교할 수 있도록 JSON 문자열로 비교합니다.
+        summaries = json.loads(json.dumps(summary_list, default=str))
+        if self.recording:
+            self.meta["summaries"] = summaries
+            with open(os.path.join(self.path, "cassette.json"), "w", encoding="utf-8") as f:
+                json.dump({"meta": self.meta, "interactions": self.interactions}, f, ensure_ascii=False, default=str)
+            self._write_lines("writes.jsonl")
+            print(f"Cassette recorded: {self.path} ({len(self._writes)} writes, "
+                  f"{sum(len(v) for v in self.interactions['yahoo'].values())} price responses)")
+            return True
+
+        self._write_lines("replay-writes.jsonl")
+        with open(os.path.join(self.path, "writes.jsonl"), "r", encoding="utf-8") as f:
+            recorded = Counter(line.rstrip("\n") for line in f)
+        replayed = Counter(self._writes)
+        missing = sum((recorded - replayed).values())
+        unexpected = sum((replayed - recorded).values())
+        summaries_match = json.dumps(summaries, sort_keys=True) == json.dumps(self.meta.get("summaries"), sort_keys=True)
+
+        print(f"Replay summaries: {'match' if summaries_match else 'DIFFER'} ({len(summaries)} tickers)")
+        print(f"Replay writes: {'match' if not (missing or unexpected) else 'DIFFER'} "
+              f"({sum(replayed.values())} writes, {missing} missing, {unexpected} unexpected)")
+        if self.misses:
+            print(f"Replay misses: {len(self.misses)} requests not in the cassette")
+        return summaries_match and not (missing or unexpected or self.misses)
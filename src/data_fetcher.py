@@ -1,7 +1,10 @@
 # src/data_fetcher.py
-import yfinance as yf
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from config import settings
+from src.metrics import metrics
 
 class DataFetcher:
     @staticmethod
@@ -10,15 +13,20 @@ class DataFetcher:
         주식의 과거 데이터를 가져옵니다. 
         start와 end가 제공되면 해당 기간의 데이터를, 아니면 period 기준 데이터를 가져옵니다.
         """
-        stock = yf.Ticker(ticker)
-        
-        if start and end:
-            df = stock.history(start=start, end=end)
-        elif start:
-            # start가 있고 end가 없으면 start부터 현재까지
-            df = stock.history(start=start)
-        else:
-            df = stock.history(period=period)
+        import yfinance as yf  # 가져오는 데 시간이 걸려 실제로 수집할 때만 불러옵니다.
+
+        with metrics.timer("yahoo.history", ticker=ticker) as record:
+            stock = yf.Ticker(ticker)
+
+            if start and end:
+                df = stock.history(start=start, end=end)
+            elif start:
+                # start가 있고 end가 없으면 start부터 현재까지
+                df = stock.history(start=start)
+            else:
+                df = stock.history(period=period)
+            record.rows = len(df)
+            record.bytes = int(df.memory_usage().sum())
         
         if df.empty:
             print(f"Warning: {ticker} 데이터를 가져오지 못했습니다.")
@@ -26,11 +34,178 @@ class DataFetcher:
             
         return df
 
+    @staticmethod
+    def normalize_index(df: pd.DataFrame) -> pd.DataFrame:
+        """타임존을 제거하고 날짜 단위(00:00)로 인덱스를 정규화합니다."""
+        if df.empty:
+            return df
+        if df.index.tz is not None:
+            df.index = df.index.tz_localize(None)
+        df.index = df.index.normalize()
+        return df
+
+    @staticmethod
+    def get_many(tickers: list, start_by_ticker: dict = None, period: str = "5y", max_workers: int = None) -> dict:
+        """
+        여러 종목을 한 번에 가져옵니다.
+        시작 날짜가 같은 종목끼리는 하나의 배치 다운로드로 묶고, 나머지는 제한된 워커 풀에서 병렬로 실행합니다.
+        start_by_ticker에 없는(None) 종목은 period 기준으로 가져옵니다.
+        반환: {ticker: 정규화된 DataFrame} (실패한 종목은 빈 DataFrame)
+        """
+        start_by_ticker = start_by_ticker or {}
+        max_workers = max_workers or settings.FETCH_MAX_WORKERS
+
+        # 시작 날짜별 그룹핑 (입력 순서 유지)
+        groups = {}
+        for ticker in tickers:
+            groups.setdefault(start_by_ticker.get(ticker), []).append(ticker)
+
+        results = {ticker: pd.DataFrame() for ticker in tickers}
+        if not tickers:
+            return results
+
+        def fetch_group(start, group):
+            if len(group) == 1:
+                ticker = group[0]
+                try:
+                    df = DataFetcher.get_historical_data(ticker, start=start, period=period)
+                except Exception as e:
+                    print(f"Error fetching {ticker}: {e}")
+                    df = pd.DataFrame()
+                return {ticker: DataFetcher.normalize_index(df)}
+            return DataFetcher._download_batch(group, start, period, threads=min(len(group), max_workers))
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+            futures = [executor.submit(fetch_group, start, group) for start, group in groups.items()]
+            for future in futures:
+                results.update(future.result())
+
+        return results
+
+    @staticmethod
+    def _download_batch(tickers: list, start: str, period: str, threads: int = 1) -> dict:
+        """yf.download 한 번으로 여러 종목을 받아 종목별 DataFrame으로 분리합니다."""
+        import yfinance as yf
+
+        kwargs = {"start": start} if start else {"period": period}
+        try:
+            with metrics.timer("yahoo.download") as record:
+                data = yf.download(
+                    tickers, group_by="ticker", auto_adjust=True, actions=True,
+                    threads=threads, progress=False, **kwargs
+                )
+                record.rows = len(data) if data is not None else 0
+                record.bytes = int(data.memory_usage().sum()) if data is not None else 0
+        except Exception as e:
+            print(f"Error fetching batch {tickers}: {e}")
+            data = None
+
+        results = {}
+        for ticker in tickers:
+            df = pd.DataFrame()
+            if data is not None and not data.empty and ticker in data.columns.get_level_values(0):
+                df = data[ticker].dropna(how="all")
+                metrics.count("yahoo.download.tickers")
+            if df.empty:
+                print(f"Warning: {ticker} 데이터를 가져오지 못했습니다.")
+                df = pd.DataFrame()
+            results[ticker] = DataFetcher.normalize_index(df)
+        return results
+
+    @staticmethod
+    def get_many_cached(tickers: list, cache, period: str = "5y", max_workers: int = None,
+                        history_start: dict = None) -> dict:
+        """
+        로컬 가격 캐시(PriceCache)를 먼저 조회하고, 마지막 캐시 날짜 이후(겹침 구간 포함)만 받아 추가합니다.
+        캐시가 없거나 오래됐거나 수정주가 조정이 감지된 종목은 전체 이력을 다시 받습니다.
+        history_start: {ticker: YYYY-MM-DD} 호출자가 필요한 가장 이른 날짜 (분석 시작일)
+        - 전체 재수집은 이 날짜와 캐시 첫 날짜 중 이른 날부터 받아, 이미 캐시한 이력이 period로 잘리지 않게 합니다.
+          (둘 다 없으면 period 기준)
+        - 캐시가 이 날짜 이후부터 시작하면(그 날짜부터 받은 적이 없으면) 전체 재수집합니다.
+        반환: {ticker: 캐시에 병합된 전체 이력 DataFrame}
+        """
+        history_start = history_start or {}
+        overlap = timedelta(days=settings.PRICE_CACHE_OVERLAP_DAYS)
+
+        def refresh_start(ticker):
+            """전체 재수집 시작일: 필요한 시작일과 캐시 첫 날짜 중 이른 날 (없으면 None → period)"""
+            first_date = cache.first_date(ticker)
+            starts = [history_start.get(ticker), first_date.strftime('%Y-%m-%d') if first_date is not None else None]
+            starts = [start for start in starts if start]
+            return min(starts) if starts else None
+
+        start_by_ticker = {}
+        full_refresh = {}
+        for ticker in tickers:
+            last_date = cache.last_date(ticker)
+            wanted = history_start.get(ticker)
+            if last_date is None or cache.is_stale(ticker) or (wanted and not cache.covers(ticker, wanted)):
+                full_refresh[ticker] = refresh_start(ticker)
+                if full_refresh[ticker]:
+                    start_by_ticker[ticker] = full_refresh[ticker]
+            else:
+                start_by_ticker[ticker] = (last_date - overlap).strftime('%Y-%m-%d')
+
+        fetched = DataFetcher.get_many(tickers, start_by_ticker, period=period, max_workers=max_workers)
+
+        # 겹치는 구간의 종가가 달라졌으면(분할/배당 조정) 캐시를 비우고 전체 재수집
+        adjusted = [t for t in tickers if t not in full_refresh and cache.is_adjusted(t, fetched[t])]
+        if adjusted:
+            print(f"Price adjustment detected, refreshing cache: {adjusted}")
+            for ticker in adjusted:
+                full_refresh[ticker] = refresh_start(ticker)
+                cache.invalidate(ticker)
+            refetch_start = {ticker: full_refresh[ticker] for ticker in adjusted if full_refresh[ticker]}
+            fetched.update(DataFetcher.get_many(adjusted, refetch_start, period=period, max_workers=max_workers))
+
+        results = {}
+        for ticker in tickers:
+            df = fetched[ticker]
+            if ticker in full_refresh and df.empty:
+                # 재수집에 실패하면 남아있는 캐시라도 사용
+                results[ticker] = cache.load(ticker)
+                continue
+            results[ticker] = cache.append(
+                ticker, df, full_refresh=ticker in full_refresh, history_from=full_refresh.get(ticker)
+            )
+        return results
+
+    @staticmethod
+    def get_quotes(tickers: list, chunk_size: int = None) -> np.ndarray:
+        """
+        여러 종목의 최신 가격을 yf.download(1분봉) 몇 번으로 한꺼번에 가져옵니다.
+        반환: tickers 순서와 같은 float64 배열 (가져오지 못한 종목은 NaN)
+        """
+        import yfinance as yf
+
+        chunk_size = chunk_size or settings.WATCH_QUOTE_CHUNK_SIZE
+        prices = np.full(len(tickers), np.nan)
+        for start in range(0, len(tickers), chunk_size):
+            chunk = list(tickers[start:start + chunk_size])
+            try:
+                with metrics.timer("yahoo.quotes") as record:
+                    data = yf.download(
+                        chunk, period="1d", interval="1m", group_by="ticker",
+                        threads=min(len(chunk), settings.FETCH_MAX_WORKERS), progress=False
+                    )
+                    record.rows = len(data) if data is not None else 0
+            except Exception as e:
+                print(f"Error fetching quotes {chunk[0]}..{chunk[-1]}: {e}")
+                continue
+            if data is None or data.empty or "Close" not in data.columns.get_level_values(-1):
+                continue
+            close = data.xs("Close", axis=1, level=-1).ffill()
+            prices[start:start + len(chunk)] = close.iloc[-1].reindex(chunk).to_numpy(dtype=np.float64)
+        return prices
+
     @staticmethod
     def get_current_price(ticker: str) -> float:
         """최신 종가를 가져옵니다."""
-        stock = yf.Ticker(ticker)
-        data = stock.history(period="1d")
+        import yfinance as yf
+
+        with metrics.timer("yahoo.history", ticker=ticker):
+            stock = yf.Ticker(ticker)
+            data = stock.history(period="1d")
         if not data.empty:
             return data['Close'].iloc[-1]
         return 0.0
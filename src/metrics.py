@@ -0,0 +1,216 @@
+# src/metrics.py
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from config import settings
+
+_context = contextvars.ContextVar("metrics_context", default={})
+
+
+class _Record:
+    """timer() 블록 안에서 행 수/바이트/재시도 횟수를 기록하기 위한 객체"""
+    __slots__ = ("rows", "bytes", "retries")
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.retries = 0
+
+
+class _NullRecord:
+    """비활성화 상태에서 쓰는 기록 객체 (모든 값을 버림)"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+
+
+class Metrics:
+    """
+    실행 계측: 작업별 지연시간, 행 수, 바이트, 재시도 횟수를 (작업, 종목) 단위로 집계합니다.
+    이벤트를 하나씩 저장하지 않고 바로 합산하므로 종목 수가 늘어도 메모리가 거의 늘지 않습니다.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._operations = {}
+        self._counters = {}
+        self._profiler = None
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now()
+            self._started = time.perf_counter()
+            self._operations = {}
+            self._counters = {}
+
+    @contextlib.contextmanager
+    def context(self, **tags):
+        """블록 안에서 기록되는 모든 지표에 태그(예: ticker)를 붙입니다."""
+        token = _context.set({**_context.get(), **tags})
+        try:
+            yield
+        finally:
+            _context.reset(token)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **tags):
+        """
+        블록의 실행 시간을 기록합니다.
+        with metrics.timer("yahoo.history", ticker="SOXL") as record:
+            ...
+            record.rows = len(df)
+        """
+        if not self.enabled:
+            yield _NULL_RECORD
+            return
+        record = _Record()
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield record
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._add(name, {**_context.get(), **tags}, time.perf_counter() - started, record, failed)
+
+    def timed(self, name: str = None):
+        """함수 실행 시간을 기록하는 데코레이터"""
+        def decorator(fn):
+            op_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.timer(op_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: int = 1):
+        """단순 카운터를 증가시킵니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def _add(self, name: str, tags: dict, elapsed: float, record: _Record, failed: bool):
+        key = (name, tags.get("ticker"))
+        with self._lock:
+            stats = self._operations.get(key)
+            if stats is None:
+                stats = self._operations[key] = {
+                    "calls": 0, "errors": 0, "total_sec": 0.0, "max_sec": 0.0, "rows": 0, "bytes": 0, "retries": 0
+                }
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["total_sec"] += elapsed
+            stats["max_sec"] = max(stats["max_sec"], elapsed)
+            stats["rows"] += record.rows
+            stats["bytes"] += record.bytes
+            stats["retries"] += record.retries
+
+    def report(self, **extra) -> dict:
+        """작업별 합계와 종목별 상세를 담은 보고서 dict"""
+        operations = {}
+        by_ticker = {}
+        with self._lock:
+            items = [(key, dict(stats)) for key, stats in self._operations.items()]
+            counters = dict(self._counters)
+        for (name, ticker), stats in sorted(items, key=lambda item: (item[0][0], item[0][1] or "")):
+            total = operations.setdefault(name, {
+                "calls": 0, "errors": 0, "total_sec": 0.0, "max_sec": 0.0, "rows": 0, "bytes": 0, "retries": 0
+            })
+            for field in ("calls", "errors", "total_sec", "rows", "bytes", "retries"):
+                total[field] += stats[field]
+            total["max_sec"] = max(total["max_sec"], stats["max_sec"])
+            if ticker:
+                by_ticker.setdefault(ticker, {})[name] = stats
+
+        for stats in list(operations.values()) + [s for ops in by_ticker.values() for s in ops.values()]:
+            stats["total_sec"] = round(stats["total_sec"], 6)
+            stats["max_sec"] = round(stats["max_sec"], 6)
+
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration_sec": round(time.perf_counter() - self._started, 4),
+            "operations": operations,
+            "counters": counters,
+            "by_ticker": by_ticker,
+            **extra,
+        }
+
+    def write_report(self, path: str = None, **extra) -> str:
+        """보고서를 JSON 파일로 저장하고 경로를 반환합니다."""
+        if not self.enabled:
+            return None
+        path = path or os.path.join(settings.METRICS_DIR, f"run-{self.started_at:%Y%m%d-%H%M%S}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(**extra), f, indent=2, ensure_ascii=False, default=str)
+        return path
+
+    def start_profiler(self, mode: str = None):
+        """
+        STOCKBOT_PROFILE 환경변수(cprofile | pyinstrument)가 설정되어 있으면 프로파일러를 시작합니다.
+        설정되지 않았으면 아무것도 하지 않습니다.
+        - cprofile: Python 3.12부터 cProfile은 sys.monitoring 기반이라 인터프리터 전체에 적용되므로,
+          파이프라인 단계 스레드와 시트/텔레그램 전송 스레드의 호출도 한 파일에 함께 기록됩니다.
+        - pyinstrument: 시작한(메인) 스레드만 샘플링하므로 단계 스레드의 작업은 join 대기로만 보입니다.
+          단계별 시간은 실행 보고서의 stages와 operations 타이머로 보고, 호출 단위 분석은 cprofile을 쓰세요.
+        """
+        mode = (mode or settings.PROFILE_MODE or "").lower()
+        if not mode:
+            return
+        if mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("pyinstrument가 설치되어 있지 않아 cProfile을 사용합니다.")
+                mode = "cprofile"
+            else:
+                print("pyinstrument는 메인 스레드만 샘플링합니다 (단계 스레드 포함: STOCKBOT_PROFILE=cprofile).")
+                self._profiler = ("pyinstrument", Profiler())
+                self._profiler[1].start()
+                return
+        if mode == "cprofile":
+            import cProfile
+
+            self._profiler = ("cprofile", cProfile.Profile())
+            self._profiler[1].enable()
+
+    def stop_profiler(self) -> str:
+        """프로파일러를 멈추고 결과 파일 경로를 반환합니다."""
+        if not self._profiler:
+            return None
+        mode, profiler = self._profiler
+        self._profiler = None
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        stem = os.path.join(settings.METRICS_DIR, f"profile-{self.started_at:%Y%m%d-%H%M%S}")
+        if mode == "pyinstrument":
+            profiler.stop()
+            path = f"{stem}.html"
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            path = f"{stem}.prof"
+            profiler.dump_stats(path)
+        return path
+
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
@@ -0,0 +1,158 @@
+# src/moments.py
+"""
+등락률, 등락률 이동 표준편차, 가격 이동 평균/표준편차, Z-Score를 종가 배열 한 번의 순회로 계산하는 커널.
+pandas rolling을 컬럼마다 따로 돌리는 대신 연속된 배열을 앞에서부터 한 번 읽으며 모두 채우고,
+요청하지 않은 출력은 계산하지 않습니다. 한 종목(1차원) 또는 봉 × 종목 패널(2차원)을 받습니다.
+
+윈도우 평균/분산은 합/제곱합 대신 추가/제거형 Welford로 갱신하고, window개 봉마다 윈도우를 두 번 순회해
+다시 계산합니다. 가격 수준이 크게 변하는 긴 레버리지 ETF 이력에서도 오차가 한 윈도우 안에서만 쌓입니다.
+numba가 설치되어 있으면 JIT 컴파일해 실행합니다 (없으면 같은 코드를 파이썬으로 실행하므로 느립니다).
+"""
+import numpy as np
+from config import settings
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# rolling_moments 출력 이름 (calculate_statistics 컬럼명과 같음)
+OUTPUTS = ('Return', 'Vol_Std', 'SMA_Price', 'STD_Price', 'Z_Score')
+
+JIT_ENABLED = njit is not None and settings.STATS_JIT
+
+
+def _jit(fn):
+    # error_model="numpy": 0으로 나누면 예외 대신 inf/NaN (pandas와 같음)
+    return njit(cache=True, nogil=True, error_model="numpy")(fn) if JIT_ENABLED else fn
+
+
+@_jit
+def _value(close, j, returns):
+    """j번째 봉의 종가 또는 등락률 (첫 봉의 등락률은 NaN)"""
+    if not returns:
+        return close[j]
+    if j == 0:
+        return np.nan
+    return close[j] / close[j - 1] - 1.0
+
+
+@_jit
+def _exact(close, lo, hi, returns):
+    """[lo, hi) 구간 유효 값의 (개수, 평균, 편차 제곱합)을 두 번 순회로 계산합니다."""
+    count = 0
+    total = 0.0
+    for j in range(lo, hi):
+        x = _value(close, j, returns)
+        if x == x:
+            count += 1
+            total += x
+    if count == 0:
+        return 0, 0.0, 0.0
+    mean = total / count
+    m2 = 0.0
+    for j in range(lo, hi):
+        x = _value(close, j, returns)
+        if x == x:
+            m2 += (x - mean) * (x - mean)
+    return count, mean, m2
+
+
+@_jit
+def _moments(close, window, ret, vol, sma, std, z):
+    """
+    한 종목의 종가 배열을 한 번 순회하며 출력 배열을 채웁니다 (길이가 0인 출력은 건너뜁니다).
+    pandas rolling(window)과 같이 윈도우에 NaN이 있거나 값이 모자라면 NaN입니다 (표준편차는 ddof=1).
+    """
+    n = close.shape[0]
+    want_ret = ret.shape[0] == n
+    want_vol = vol.shape[0] == n
+    want_sma = sma.shape[0] == n
+    want_std = std.shape[0] == n
+    want_z = z.shape[0] == n
+    want_price = want_sma or want_std or want_z
+
+    # 가격/등락률 윈도우의 유효 값 개수, 평균, 편차 제곱합
+    pc, pmean, pm2 = 0, 0.0, 0.0
+    rc, rmean, rm2 = 0, 0.0, 0.0
+    for i in range(n):
+        x = close[i]
+        r = _value(close, i, True)
+        if want_ret:
+            ret[i] = r
+
+        if want_price:
+            if x == x:
+                pc += 1
+                d = x - pmean
+                pmean += d / pc
+                pm2 += d * (x - pmean)
+            if i >= window:
+                y = close[i - window]
+                if y == y:
+                    pc -= 1
+                    if pc == 0:
+                        pmean, pm2 = 0.0, 0.0
+                    else:
+                        d = y - pmean
+                        pmean -= d / pc
+                        pm2 -= d * (y - pmean)
+            if (i + 1) % window == 0:
+                pc, pmean, pm2 = _exact(close, max(0, i + 1 - window), i + 1, False)
+            mean = pmean if pc == window else np.nan
+            sd = np.sqrt(max(pm2, 0.0) / (window - 1)) if pc == window and window > 1 else np.nan
+            if want_sma:
+                sma[i] = mean
+            if want_std:
+                std[i] = sd
+            if want_z:
+                z[i] = (x - mean) / sd
+
+        if want_vol:
+            if r == r:
+                rc += 1
+                d = r - rmean
+                rmean += d / rc
+                rm2 += d * (r - rmean)
+            if i >= window:
+                y = _value(close, i - window, True)
+                if y == y:
+                    rc -= 1
+                    if rc == 0:
+                        rmean, rm2 = 0.0, 0.0
+                    else:
+                        d = y - rmean
+                        rmean -= d / rc
+                        rm2 -= d * (y - rmean)
+            if (i + 1) % window == 0:
+                rc, rmean, rm2 = _exact(close, max(0, i + 1 - window), i + 1, True)
+            vol[i] = np.sqrt(max(rm2, 0.0) / (window - 1)) if rc == window and window > 1 else np.nan
+
+
+@_jit
+def _moments_panel(close, window, ret, vol, sma, std, z):
+    """close: (종목 수, 봉 수) C 연속 배열. 종목 행마다 _moments를 실행합니다."""
+    for j in range(close.shape[0]):
+        _moments(close[j], window, ret[j], vol[j], sma[j], std[j], z[j])
+
+
+def rolling_moments(close: np.ndarray, window: int, outputs=OUTPUTS) -> dict:
+    """
+    close: 1차원 (봉) 또는 2차원 (봉 × 종목, PanelAnalyzer.build_panel과 같은 모양) 종가
+    outputs: 계산할 OUTPUTS 이름
+    반환: {이름: close와 같은 모양의 float64 배열}
+    """
+    unknown = set(outputs) - set(OUTPUTS)
+    if unknown:
+        raise ValueError(f"unknown outputs: {sorted(unknown)}")
+    if window < 1:
+        raise ValueError("window must be >= 1")
+
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim not in (1, 2):
+        raise ValueError("close must be 1-D or 2-D")
+    # 종목별 종가가 메모리에 연속되도록 (종목 수, 봉 수)로 놓고 계산합니다.
+    rows = np.ascontiguousarray(close[None, :] if close.ndim == 1 else close.T)
+    arrays = {name: np.empty((rows.shape[0], rows.shape[1] if name in outputs else 0)) for name in OUTPUTS}
+    _moments_panel(rows, int(window), *arrays.values())
+    return {name: (arrays[name][0] if close.ndim == 1 else arrays[name].T) for name in OUTPUTS if name in outputs}
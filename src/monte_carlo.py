@@ -0,0 +1,191 @@
+# src/monte_carlo.py
+import argparse
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from src.analyzer import MarketAnalyzer
+from src.universe import Universe
+
+# 한 번에 만들 (경로, bar) 2차원 배열의 최대 원소 수 (메모리 상한, 배열 하나 2MB로 캐시에 머무는 크기)
+CHUNK_ELEMENTS = 250_000
+# 보고할 분포 백분위
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class MonteCarlo:
+    """
+    σ 하락 매수 규칙(run_backtest와 같음: 당일 등락률 < -(sigma × 기간 전체 등락률 표준편차))의 견고성 점검.
+    실제 등락률을 블록 부트스트랩(또는 로그 수익률 정규분포 GBM)으로 다시 뽑은 경로 수천 개를
+    (경로, bar) 2차원 배열로 만들고, 모든 경로에 규칙을 한 번에 적용해 ROI/매수 횟수/MDD 분포를 구합니다.
+    경로는 CHUNK_ELEMENTS 단위로 나눠 계산하므로 메모리는 경로 수와 무관하게 일정합니다.
+    """
+
+    @staticmethod
+    def block_bootstrap(returns: np.ndarray, n_paths: int, n_bars: int, block: int, rng) -> np.ndarray:
+        """
+        길이 block의 연속 구간을 무작위로 이어 붙여 (n_paths, n_bars) 등락률 경로를 만듭니다 (moving block bootstrap).
+        변동성 군집 등 짧은 구간의 자기상관은 블록 안에서 유지됩니다.
+        """
+        block = max(1, min(block, len(returns)))
+        n_blocks = -(-n_bars // block)
+        starts = rng.integers(0, len(returns) - block + 1, size=(n_paths, n_blocks))
+        index = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :n_bars]
+        return returns[index]
+
+    @staticmethod
+    def gbm(returns: np.ndarray, n_paths: int, n_bars: int, rng) -> np.ndarray:
+        """실제 등락률의 로그 수익률 평균/표준편차를 갖는 기하 브라운 운동 경로의 등락률"""
+        log_returns = np.log1p(returns)
+        draws = rng.normal(log_returns.mean(), log_returns.std(ddof=1), size=(n_paths, n_bars))
+        return np.expm1(draws)
+
+    @staticmethod
+    def evaluate(path_returns: np.ndarray, sigma: float = 1.0) -> dict:
+        """
+        (경로, bar) 등락률에 σ 하락 매수 규칙을 적용합니다. 종가는 1에서 시작하고 첫 bar(시작가)에는 매수하지 않습니다.
+        ROI와 MDD는 매수 수량과 무관하므로 1주 단위로 계산합니다.
+        반환: 경로별 roi, buy_count, max_drawdown, hold_roi(같은 경로를 처음부터 보유한 수익률) 배열
+        """
+        n_paths, n_bars = path_returns.shape
+        close = np.empty((n_paths, n_bars + 1))
+        close[:, 0] = 1.0
+        np.add(path_returns, 1.0, out=close[:, 1:])
+        np.cumprod(close, axis=1, out=close)
+
+        # main.py와 같이 기간 전체 등락률 표준편차를 경로마다 기준으로 씁니다.
+        level = -sigma * path_returns.std(axis=1, ddof=1)
+        bought = np.zeros(close.shape)
+        np.less(path_returns, level[:, None], out=bought[:, 1:])
+
+        # 임시 배열을 줄이도록 누적합은 제자리에서 계산합니다.
+        cum_invest = np.multiply(bought, close)
+        np.cumsum(cum_invest, axis=1, out=cum_invest)
+        cum_qty = np.cumsum(bought, axis=1, out=bought)
+        buy_count = cum_qty[:, -1]
+        invested = cum_invest[:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi = np.where(invested > 0, buy_count * close[:, -1] / invested - 1, 0.0)
+        return {
+            'roi': roi,
+            'buy_count': buy_count.astype(np.int64),
+            'max_drawdown': MarketAnalyzer.max_drawdown(close, cum_qty, cum_invest),
+            'hold_roi': close[:, -1] - 1,
+        }
+
+    @staticmethod
+    def simulate(returns: np.ndarray, n_paths: int, n_bars: int = None, method: str = "bootstrap",
+                 block: int = 20, sigma: float = 1.0, seed=None) -> dict:
+        """
+        실제 등락률(NaN 제외)로 n_paths개 경로를 만들어 evaluate합니다 (경로는 청크 단위로 생성/폐기).
+        n_bars: 경로 길이 (기본: 실제 등락률 개수)
+        반환: evaluate와 같은 키의 경로별 배열
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns)]
+        n_bars = n_bars or len(returns)
+        rng = np.random.default_rng(seed)
+
+        step = max(1, CHUNK_ELEMENTS // max(1, n_bars))
+        parts = []
+        for start in range(0, n_paths, step):
+            size = min(step, n_paths - start)
+            if method == "gbm":
+                paths = MonteCarlo.gbm(returns, size, n_bars, rng)
+            else:
+                paths = MonteCarlo.block_bootstrap(returns, size, n_bars, block, rng)
+            parts.append(MonteCarlo.evaluate(paths, sigma))
+        return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+    @staticmethod
+    def summarize(ticker: str, close: np.ndarray, n_paths: int, method: str = "bootstrap", block: int = 20,
+                  sigma: float = 1.0, seed: int = 0) -> dict:
+        """
+        한 종목의 실제 경로 결과와 모의 경로 분포(백분위)를 한 행으로 요약합니다.
+        - hist_percentile: 실제 ROI보다 낮은 모의 경로 비율 (높을수록 실제 결과가 운 좋은 쪽)
+        - loss_prob: ROI < 0 인 모의 경로 비율, beat_hold: 같은 경로 보유 수익률보다 ROI가 높은 비율
+        """
+        close = np.asarray(close, dtype=np.float64)
+        returns = close[1:] / close[:-1] - 1
+        historical = MonteCarlo.evaluate(returns[None, :], sigma)
+        # 종목 순서와 무관하게 같은 경로가 나오도록 종목 이름으로 시드를 나눕니다.
+        result = MonteCarlo.simulate(
+            returns, n_paths, method=method, block=block, sigma=sigma, seed=[seed, zlib.crc32(ticker.encode("utf-8"))]
+        )
+
+        row = {
+            'ticker': ticker,
+            'method': method,
+            'paths': n_paths,
+            'bars': len(returns),
+            'hist_roi': float(historical['roi'][0]),
+            'hist_buys': int(historical['buy_count'][0]),
+            'hist_mdd': float(historical['max_drawdown'][0]),
+            'hist_percentile': float((result['roi'] < historical['roi'][0]).mean()),
+            'loss_prob': float((result['roi'] < 0).mean()),
+            'beat_hold': float((result['roi'] > result['hold_roi']).mean()),
+        }
+        for key, name in (('roi', 'roi'), ('buy_count', 'buys'), ('max_drawdown', 'mdd')):
+            for q, value in zip(PERCENTILES, np.percentile(result[key], PERCENTILES)):
+                row[f'{name}_p{q}'] = float(value)
+        return row
+
+    @staticmethod
+    def run(prices: dict, n_paths: int, methods=("bootstrap",), block: int = 20, sigma: float = 1.0,
+            seed: int = 0) -> pd.DataFrame:
+        """여러 종목 × 생성 방식의 요약 표"""
+        rows = [
+            MonteCarlo.summarize(ticker, close, n_paths, method=method, block=block, sigma=sigma, seed=seed)
+            for ticker, close in prices.items() if len(close) > 2
+            for method in methods
+        ]
+        return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="σ 하락 매수 전략 몬테카를로/부트스트랩 견고성 점검")
+    parser.add_argument("--tickers", default=None, help="쉼표 구분 (기본: 종목 목록 파일 또는 settings.TICKERS)")
+    parser.add_argument("--years", type=float, default=5, help="실제 이력과 모의 경로의 기간 (최근 N년)")
+    parser.add_argument("--start", default=None, help="실제 이력 시작일 (YYYY-MM-DD, 주면 --years 대신 사용)")
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--method", choices=("bootstrap", "gbm", "both"), default="bootstrap")
+    parser.add_argument("--block", type=int, default=20, help="부트스트랩 블록 길이 (bar)")
+    parser.add_argument("--sigma", type=float, default=1.0, help="매수 기준 σ 배수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="요약 CSV 저장 경로")
+    args = parser.parse_args(argv)
+
+    from src.data_fetcher import DataFetcher
+    from src.price_cache import PriceCache
+
+    tickers = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()] if args.tickers else Universe.load()[0]
+    history = DataFetcher.get_many_cached(tickers, PriceCache(), period="max")
+    prices = {}
+    for ticker, df in history.items():
+        if df.empty:
+            continue
+        close = df['Close'].dropna()
+        start = args.start or (close.index[-1] - pd.DateOffset(years=args.years))
+        prices[ticker] = close.loc[start:].to_numpy()
+
+    methods = ("bootstrap", "gbm") if args.method == "both" else (args.method,)
+    started = time.perf_counter()
+    table = MonteCarlo.run(prices, args.paths, methods=methods, block=args.block, sigma=args.sigma, seed=args.seed)
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.paths} paths x {len(methods)} method(s) x {len(prices)} tickers simulated in {elapsed:.2f}s")
+    if table.empty:
+        return table
+    columns = ['ticker', 'method', 'hist_roi', 'hist_percentile', 'roi_p5', 'roi_p50', 'roi_p95',
+               'loss_prob', 'beat_hold', 'buys_p50', 'mdd_p50', 'mdd_p95']
+    with pd.option_context('display.width', 200, 'display.max_columns', 20, 'display.float_format', '{:.3f}'.format):
+        print(table[columns].to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Saved: {args.output}")
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# src/panel.py
+"""
+공유 메모리 패널 분석.
+모든 종목의 종가를 날짜 기준으로 정렬한 2차원 배열(날짜 × 종목)로 multiprocessing.shared_memory에 올리고,
+프로세스 풀이 종목 열 구간을 나눠 이동 통계/Z-Score/백테스트를 계산합니다.
+워커에는 공유 메모리 이름과 열 구간만 전달하므로 DataFrame을 피클링해 주고받지 않습니다.
+결과는 main.py의 ticker_summary(MarketAnalyzer.build_summary)와 같은 형태의 dict 목록입니다.
+
+실행: python -m src.panel [--tickers SOXL,TQQQ] [--processes 4] [--start 2023-01-01]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from config import settings
+from src.analyzer import MarketAnalyzer
+from src.universe import Universe
+
+# 워커 프로세스에서 attach한 패널 (initializer에서 설정)
+_worker_panel = {}
+
+
+class SharedPanel:
+    """날짜 × 종목 float64 종가 배열을 담은 공유 메모리 블록"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple, owner: bool):
+        self.shm = shm
+        self.shape = shape
+        self.owner = owner
+        self.close = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    @staticmethod
+    def create(close: np.ndarray) -> "SharedPanel":
+        shm = shared_memory.SharedMemory(create=True, size=max(1, close.nbytes))
+        panel = SharedPanel(shm, close.shape, owner=True)
+        panel.close[:] = close
+        return panel
+
+    @staticmethod
+    def attach(name: str, shape: tuple) -> "SharedPanel":
+        return SharedPanel(shared_memory.SharedMemory(name=name), shape, owner=False)
+
+    def release(self):
+        """배열 참조를 끊고 블록을 닫습니다. 만든 쪽(owner)은 블록을 삭제합니다."""
+        self.close = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class PanelAnalyzer:
+    @staticmethod
+    def build_panel(frames: dict) -> tuple:
+        """
+        종목별 DataFrame(Close 컬럼)을 날짜 합집합 기준으로 정렬한 2차원 배열로 만듭니다.
+        반환: (날짜 배열 datetime64[D], 종목 목록, 종가 배열 (날짜 수, 종목 수), 없는 값은 NaN)
+        """
+        tickers = [ticker for ticker, df in frames.items() if df is not None and not df.empty]
+        if not tickers:
+            return np.array([], dtype="datetime64[D]"), [], np.empty((0, 0))
+        dates = np.unique(np.concatenate([
+            frames[ticker].index.to_numpy().astype("datetime64[D]") for ticker in tickers
+        ]))
+        close = np.full((len(dates), len(tickers)), np.nan)
+        for col, ticker in enumerate(tickers):
+            df = frames[ticker]
+            rows = np.searchsorted(dates, df.index.to_numpy().astype("datetime64[D]"))
+            close[rows, col] = df['Close'].to_numpy(dtype=np.float64)
+        return dates, tickers, close
+
+    @staticmethod
+    def summarize(ticker: str, dates: np.ndarray, close: np.ndarray, start_date: str, end_date: str,
+                  window: int, thresholds: dict, buy_quantity: int = 100) -> dict:
+        """
+        한 종목 열로 main.analyze_ticker와 같은 계산을 합니다.
+        기간: [start_date, end_date], σ 매수 기준: 기간 전체 등락률 표준편차, 백테스트: run_backtest와 같은 엔진
+        반환: build_summary와 같은 키의 dict (기간 내 데이터가 없으면 None)
+        """
+        lo = np.searchsorted(dates, np.datetime64(start_date, "D"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(end_date, "D"), side="right")
+        values = close[lo:hi]
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return None
+        # 날짜 합집합 정렬로 생긴 빈칸은 제외합니다 (종목 단독 DataFrame과 같은 행)
+        values = values[valid]
+
+        returns = np.empty(len(values))
+        returns[0] = np.nan
+        returns[1:] = values[1:] / values[:-1] - 1
+        overall_std = np.nanstd(returns, ddof=1) if len(values) > 2 else np.nan
+
+        _, _, _, cum_qty, cum_invest = MarketAnalyzer.backtest_arrays(
+            values, returns, np.full(len(values), -overall_std), buy_quantity
+        )
+        total_qty = int(cum_qty[-1]) if len(cum_qty) else 0
+        total_invest = float(cum_invest[-1]) if total_qty else 0
+
+        # 최신 행의 가격 기준 이동 통계 (calculate_statistics의 SMA_Price/STD_Price/Z_Score 마지막 값)
+        sma = std = z_score = np.nan
+        if len(values) >= window:
+            recent = values[-window:]
+            sma = recent.mean()
+            std = recent.std(ddof=1)
+            z_score = (values[-1] - sma) / std
+
+        current_price = float(values[-1])
+        total_val = total_qty * current_price
+        total_profit = total_val - total_invest
+        roi = total_profit / total_invest if total_invest > 0 else 0
+        daily_change = returns[-1]
+
+        return {
+            'ticker': ticker,
+            'current_price': current_price,
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_qty': total_qty,
+            'total_invest': float(total_invest),
+            'total_val': float(total_val),
+            'total_profit': float(total_profit),
+            'roi': float(roi),
+            'volatility': float(overall_std),
+            's1': float(-overall_std),
+            's2': float(-overall_std * 2),
+            's3': float(-overall_std * 3),
+            'buy_count': total_qty // buy_quantity if buy_quantity else 0,
+            'max_gain': float(np.nanmax(returns)) if len(values) > 1 else float('nan'),
+            'max_loss': float(np.nanmin(returns)) if len(values) > 1 else float('nan'),
+            'z_score': float(z_score) if not np.isnan(z_score) else 0.0,
+            'signal': MarketAnalyzer.get_signal(z_score, thresholds)[0],
+            'target_1': float(MarketAnalyzer.get_target_price(sma, std, thresholds["LEVEL_1"])),
+            'target_2': float(MarketAnalyzer.get_target_price(sma, std, thresholds["LEVEL_2"])),
+            'target_3': float(MarketAnalyzer.get_target_price(sma, std, thresholds["LEVEL_3"])),
+            'daily_change': float(daily_change) if not np.isnan(daily_change) else 0.0,
+        }
+
+    @staticmethod
+    def run(frames: dict, start_dates: dict = None, end_date: str = None, processes: int = None,
+            window: int = None, buy_quantity: int = 100, default_start: str = None) -> list:
+        """
+        패널을 공유 메모리에 올리고 열 구간별로 요약을 계산합니다.
+        start_dates: {ticker: 'YYYY-MM-DD'} (없으면 default_start, 기본: 3년 전)
+        반환: frames 순서의 요약 목록 (데이터가 없는 종목 제외)
+        """
+        window = window or settings.LOOKBACK_PERIOD
+        end_date = end_date or pd.Timestamp.now().strftime('%Y-%m-%d')
+        default_start = default_start or (pd.Timestamp(end_date) - pd.DateOffset(years=3)).strftime('%Y-%m-%d')
+        start_dates = start_dates or {}
+        processes = processes or settings.PANEL_PROCESSES or os.cpu_count() or 1
+
+        dates, tickers, close = PanelAnalyzer.build_panel(frames)
+        if not tickers:
+            return []
+        starts = [start_dates.get(ticker) or default_start for ticker in tickers]
+        args = (window, settings.THRESHOLDS, buy_quantity, end_date)
+
+        if processes <= 1 or len(tickers) < 2:
+            return PanelAnalyzer._summarize_range(dates, close, tickers, starts, 0, *args)
+
+        panel = SharedPanel.create(close)
+        del close
+        try:
+            # 워커마다 여러 구간을 받도록 잘게 나눠 부하를 고르게 합니다.
+            step = max(1, -(-len(tickers) // (processes * 4)))
+            ranges = [(lo, min(lo + step, len(tickers))) for lo in range(0, len(tickers), step)]
+            with ProcessPoolExecutor(
+                max_workers=processes, initializer=_attach_worker, initargs=(panel.shm.name, panel.shape, dates)
+            ) as executor:
+                futures = [
+                    executor.submit(_summarize_worker, tickers[lo:hi], starts[lo:hi], lo, *args)
+                    for lo, hi in ranges
+                ]
+                summaries = [summary for future in futures for summary in future.result()]
+        finally:
+            panel.release()
+        return summaries
+
+    @staticmethod
+    def _summarize_range(dates, close, tickers, starts, lo, window, thresholds, buy_quantity, end_date) -> list:
+        """열 lo부터 len(tickers)개 종목을 요약합니다 (tickers/starts는 해당 구간의 목록)."""
+        summaries = []
+        for offset, ticker in enumerate(tickers):
+            summary = PanelAnalyzer.summarize(
+                ticker, dates, close[:, lo + offset], starts[offset], end_date, window, thresholds, buy_quantity
+            )
+            if summary:
+                summaries.append(summary)
+        return summaries
+
+
+def _attach_worker(name: str, shape: tuple, dates: np.ndarray):
+    """프로세스 풀 initializer: 공유 메모리 패널을 한 번만 attach합니다."""
+    _worker_panel['panel'] = SharedPanel.attach(name, shape)
+    _worker_panel['dates'] = dates
+
+
+def _summarize_worker(tickers, starts, lo, window, thresholds, buy_quantity, end_date) -> list:
+    panel = _worker_panel['panel']
+    return PanelAnalyzer._summarize_range(
+        _worker_panel['dates'], panel.close, tickers, starts, lo, window, thresholds, buy_quantity, end_date
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="공유 메모리 패널 분석 (종목 전체를 한 번에 요약)")
+    parser.add_argument("--tickers", default=None, help="쉼표 구분 (기본: 종목 목록 파일 또는 settings.TICKERS)")
+    parser.add_argument("--start", default=None, help="분석 시작일 (기본: 3년 전)")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from src.data_fetcher import DataFetcher
+    from src.price_cache import PriceCache
+
+    tickers = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()] if args.tickers else Universe.load()[0]
+    history = DataFetcher.get_many_cached(tickers, PriceCache(), period="5y")
+
+    started = time.perf_counter()
+    summaries = PanelAnalyzer.run(history, processes=args.processes, default_start=args.start)
+    elapsed = time.perf_counter() - started
+
+    for item in summaries:
+        print(f"{item['ticker']:<6} ${item['current_price']:.2f} ROI {item['roi']*100:7.2f}% "
+              f"buys {item['buy_count']:>4} Z {item['z_score']:+.2f} {item['signal']}")
+    print(f"Panel: {len(summaries)} tickers analyzed in {elapsed:.2f}s")
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# src/pipeline.py
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class Stage:
+    """
+    파이프라인의 한 단계.
+    fn(item)은 다음 단계로 넘길 항목들의 리스트(또는 None)를 반환합니다.
+    """
+
+    def __init__(self, name: str, fn, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.items = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def _record(self, elapsed: float, failed: bool):
+        with self._lock:
+            self.items += 1
+            self.busy_time += elapsed
+            if failed:
+                self.errors += 1
+
+    def timing(self) -> dict:
+        wall = (self.finished_at - self.started_at) if self.started_at and self.finished_at else 0.0
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_sec": round(self.busy_time, 4),
+            "wall_sec": round(wall, 4),
+        }
+
+
+class Pipeline:
+    """
+    단계들을 크기 제한 큐로 연결해 동시에 실행합니다.
+    한 항목에서 발생한 예외는 해당 항목만 버리고 나머지 처리는 계속합니다 (종목별 오류 격리).
+    """
+
+    def __init__(self, stages: list, queue_size: int = 16, item_name=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        # 오류 메시지에 표시할 항목 이름 (예: 종목 코드)
+        self.item_name = item_name or (lambda item: str(item))
+
+    def _worker(self, stage: Stage, inbox: queue.Queue, outbox: queue.Queue, remaining: list, lock: threading.Lock):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            with stage._lock:
+                if stage.started_at is None:
+                    stage.started_at = start
+            failed = False
+            try:
+                outputs = stage.fn(item) or []
+            except Exception as e:
+                print(f"Error processing {self.item_name(item)} ({stage.name}): {e}")
+                outputs = []
+                failed = True
+            stage._record(time.perf_counter() - start, failed)
+            if outbox is not None:
+                for output in outputs:
+                    outbox.put(output)
+
+        # 마지막 워커가 끝나면 다음 단계 워커 수만큼 종료 신호를 보냅니다.
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            stage.finished_at = time.perf_counter()
+            if outbox is not None:
+                next_stage = self.stages[self.stages.index(stage) + 1]
+                for _ in range(next_stage.workers):
+                    outbox.put(_DONE)
+
+    def run(self, items: list) -> list:
+        """items를 첫 단계에 넣고 모든 단계가 끝날 때까지 기다립니다. 단계별 타이밍을 반환합니다."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(self.stages) else None
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(stage, queues[i], outbox, remaining, lock),
+                    name=f"{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        return [stage.timing() for stage in self.stages]
@@ -0,0 +1,174 @@
+# src/price_cache.py
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+RECORD_DTYPE = np.dtype([("Date", "datetime64[D]")] + [(field, "f8") for field in FIELDS])
+
+
+class PriceCache:
+    """
+    종목별 OHLCV 로컬 캐시.
+    종목마다 날짜 기준 오름차순 구조화 배열(.npy, memory-map 로드)과 메타데이터(.json) 파일을 하나씩 둡니다.
+    """
+
+    def __init__(self, cache_dir: str = None, max_age_days: int = None):
+        self.cache_dir = cache_dir or settings.PRICE_CACHE_DIR
+        self.max_age_days = settings.PRICE_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _data_path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker}.npy")
+
+    def _meta_path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker}.json")
+
+    def _read_meta(self, ticker: str) -> dict:
+        try:
+            with open(self._meta_path(ticker), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _atomic_write(self, path: str, write_fn):
+        """같은 디렉토리의 임시 파일에 쓴 뒤 os.replace로 교체합니다 (중간 실패 시 기존 파일 보존)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write_fn(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _load_records(self, ticker: str) -> np.ndarray:
+        path = self._data_path(ticker)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def load(self, ticker: str, tail_rows: int = None) -> pd.DataFrame:
+        """
+        캐시된 이력을 DataFrame으로 반환합니다. 없으면 빈 DataFrame
+        tail_rows를 주면 memory-map에서 마지막 tail_rows개 행만 읽습니다.
+        """
+        records = self._load_records(ticker)
+        if tail_rows is not None:
+            records = records[-tail_rows:]
+        if len(records) == 0:
+            return pd.DataFrame()
+        index = pd.DatetimeIndex(records["Date"].astype("datetime64[ns]"), name="Date")
+        return pd.DataFrame({field: np.array(records[field]) for field in FIELDS}, index=index)
+
+    def last_date(self, ticker: str):
+        """마지막으로 캐시된 날짜 (없으면 None)"""
+        records = self._load_records(ticker)
+        if len(records) == 0:
+            return None
+        return pd.Timestamp(records["Date"][-1])
+
+    def first_date(self, ticker: str):
+        """처음 캐시된 날짜 (없으면 None)"""
+        records = self._load_records(ticker)
+        if len(records) == 0:
+            return None
+        return pd.Timestamp(records["Date"][0])
+
+    def covers(self, ticker: str, start: str) -> bool:
+        """
+        캐시가 start(YYYY-MM-DD)부터의 이력을 담고 있으면 True.
+        상장일 등으로 첫 날짜가 더 늦더라도 start 이전부터 전체 수집한 적이 있으면(메타의 history_from) True
+        """
+        first_date = self.first_date(ticker)
+        if first_date is None:
+            return False
+        if first_date <= pd.Timestamp(start):
+            return True
+        history_from = self._read_meta(ticker).get("history_from")
+        return history_from is not None and history_from <= start
+
+    def is_stale(self, ticker: str) -> bool:
+        """
+        마지막 전체 수집 후 max_age_days가 지났으면 True.
+        수정주가(배당/분할) 반영을 위해 주기적으로 전체 이력을 다시 받도록 합니다.
+        """
+        refreshed_at = self._read_meta(ticker).get("refreshed_at")
+        if not refreshed_at:
+            return True
+        age = datetime.now() - datetime.fromisoformat(refreshed_at)
+        return age.days >= self.max_age_days
+
+    def is_adjusted(self, ticker: str, new_df: pd.DataFrame, tolerance: float = None) -> bool:
+        """
+        새로 받은 데이터와 캐시가 겹치는 날짜의 종가를 비교합니다.
+        차이가 허용 오차를 넘으면 수정주가 조정(분할/배당)이 있었던 것으로 판단합니다.
+        """
+        tolerance = settings.PRICE_CACHE_ADJUST_TOLERANCE if tolerance is None else tolerance
+        cached = self.load(ticker)
+        if cached.empty or new_df.empty or "Close" not in new_df.columns:
+            return False
+        overlap = cached.index.intersection(new_df.index)
+        # 캐시의 마지막 행은 장중 잠정치였을 수 있으므로 그 이전 행들만 비교합니다.
+        reference = overlap[overlap < cached.index[-1]]
+        if reference.empty:
+            return False
+        old_close = cached.loc[reference, "Close"].to_numpy()
+        new_close = new_df.loc[reference, "Close"].to_numpy()
+        return bool(np.any(np.abs(new_close - old_close) > tolerance * np.abs(old_close)))
+
+    def append(self, ticker: str, new_df: pd.DataFrame, full_refresh: bool = False,
+               history_from: str = None) -> pd.DataFrame:
+        """
+        새 데이터를 캐시에 병합합니다. 겹치는 날짜는 새 값으로 덮어씁니다.
+        full_refresh=True면 기존 캐시를 버리고 new_df로 교체합니다 (메타의 refreshed_at 갱신).
+        history_from: 전체 수집을 요청한 시작일 (period 기준 수집이면 None, covers에서 사용)
+        반환: 병합된 전체 이력
+        """
+        cached = pd.DataFrame() if full_refresh else self.load(ticker)
+        if new_df.empty:
+            return cached
+
+        new_df = new_df.reindex(columns=list(FIELDS))
+        if cached.empty:
+            merged = new_df
+        else:
+            merged = pd.concat([cached, new_df])
+            merged = merged[~merged.index.duplicated(keep="last")]
+        merged = merged.sort_index()
+
+        records = np.empty(len(merged), dtype=RECORD_DTYPE)
+        records["Date"] = merged.index.to_numpy().astype("datetime64[D]")
+        for field in FIELDS:
+            records[field] = merged[field].to_numpy(dtype=np.float64)
+        self._atomic_write(self._data_path(ticker), lambda f: np.save(f, records))
+
+        meta = self._read_meta(ticker)
+        if full_refresh or not meta.get("refreshed_at"):
+            meta["refreshed_at"] = datetime.now().isoformat(timespec="seconds")
+        if full_refresh:
+            meta.pop("history_from", None)
+            if history_from:
+                meta["history_from"] = history_from
+        meta["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        meta["rows"] = len(records)
+        self._atomic_write(self._meta_path(ticker), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+        merged.index.name = "Date"
+        return merged
+
+    def invalidate(self, ticker: str = None):
+        """종목(또는 전체) 캐시를 삭제합니다. 수정주가 조정 후 전체 재수집이 필요할 때 사용합니다."""
+        tickers = [ticker] if ticker else [
+            name[:-len(".npy")] for name in os.listdir(self.cache_dir) if name.endswith(".npy")
+        ]
+        for name in tickers:
+            for path in (self._data_path(name), self._meta_path(name)):
+                if os.path.exists(path):
+                    os.remove(path)
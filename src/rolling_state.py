@@ -0,0 +1,286 @@
+# src/rolling_state.py
+import hashlib
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+
+class _SlidingMoments:
+    """고정 길이 윈도우의 평균/분산을 O(1)로 갱신합니다 (추가/제거형 Welford)."""
+
+    def __init__(self, window: int, values=()):
+        self.window = window
+        self.buffer = deque(values, maxlen=window)
+        self.updates = 0
+        self.refresh()
+
+    def refresh(self):
+        """누적 오차를 없애기 위해 버퍼에서 평균/M2를 다시 계산합니다 (두 번 순회, window번 갱신마다 1회)."""
+        values = np.fromiter(self.buffer, dtype=np.float64, count=len(self.buffer))
+        self.mean = float(values.mean()) if len(values) else 0.0
+        self.m2 = float(((values - self.mean) ** 2).sum()) if len(values) else 0.0
+        self.updates = 0
+
+    def push(self, x: float):
+        n = len(self.buffer)
+        if n < self.window:
+            self.buffer.append(x)
+            delta = x - self.mean
+            self.mean += delta / (n + 1)
+            self.m2 += delta * (x - self.mean)
+        else:
+            y = self.buffer[0]
+            self.buffer.append(x)
+            old_mean = self.mean
+            self.mean += (x - y) / n
+            self.m2 += (x - y) * (x - self.mean + y - old_mean)
+        self.m2 = max(self.m2, 0.0)
+
+        self.updates += 1
+        if self.updates >= self.window:
+            self.refresh()
+
+    def full(self) -> bool:
+        return len(self.buffer) == self.window
+
+    def std(self) -> float:
+        """표본 표준편차 (pandas rolling().std()와 같은 ddof=1)"""
+        n = len(self.buffer)
+        if n < 2:
+            return float("nan")
+        return math.sqrt(self.m2 / (n - 1))
+
+
+class RollingStatsState:
+    """
+    종목별 이동 통계 상태.
+    최근 window개의 종가/등락률 버퍼와 누적 통계를 저장해, 새 봉 하나마다 O(1)로
+    Vol_Std, SMA_Price, STD_Price, Z_Score와 전체 기간 등락률 표준편차를 갱신합니다.
+    상태를 만든 종가 전체의 해시(digest)를 함께 저장해, 같은 종가 이력에서만 이어받습니다.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.start_date = None
+        self.last_date = None
+        self.last_close = None
+        self.bars = 0
+        self.closes = _SlidingMoments(window)
+        self.returns = _SlidingMoments(window)
+        # 전체 기간 등락률 누적 통계 (Welford)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_return = float("nan")
+        self.min_return = float("nan")
+        # 상태를 만든 종가(첫 봉 ~ last_date)의 해시
+        self.digest = None
+
+    @staticmethod
+    def history_digest(df: pd.DataFrame, bars: int = None) -> str:
+        """
+        앞에서부터 bars개 종가의 해시 (기본: 전체).
+        시트에서 읽은 소수 둘째 자리 종가와 Yahoo 원본 종가처럼 값이 조금만 달라도 다른 해시가 됩니다.
+        """
+        close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64)[:bars])
+        return hashlib.blake2b(close.tobytes(), digest_size=16).hexdigest()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, window: int) -> "RollingStatsState":
+        """전체 재계산: 프레임의 마지막 window개 구간으로 상태를 만듭니다."""
+        state = cls(window)
+        if df.empty:
+            return state
+        close = df['Close'].to_numpy(dtype=np.float64)
+        returns = close[1:] / close[:-1] - 1
+
+        state.start_date = df.index[0]
+        state.last_date = df.index[-1]
+        state.last_close = float(close[-1])
+        state.bars = len(close)
+        state.closes = _SlidingMoments(window, close[-window:].tolist())
+        state.returns = _SlidingMoments(window, returns[-window:].tolist())
+
+        valid = returns[~np.isnan(returns)]
+        state.count = len(valid)
+        if state.count:
+            state.mean = float(valid.mean())
+            state.m2 = float(((valid - state.mean) ** 2).sum())
+            state.max_return = float(valid.max())
+            state.min_return = float(valid.min())
+        state.digest = cls.history_digest(df)
+        return state
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """저장된 상태가 이 프레임의 앞부분과 같은 종가 이력에서 나왔는지 확인합니다 (종가 해시 비교)."""
+        if self.last_date is None or df.empty or df.index[0] != self.start_date:
+            return False
+        if self.last_date not in df.index:
+            return False
+        position = df.index.get_loc(self.last_date)
+        if position + 1 != self.bars:
+            return False
+        close = float(df['Close'].iloc[position])
+        if not math.isclose(close, self.last_close, rel_tol=1e-12, abs_tol=0.0):
+            return False
+        return self.digest is not None and self.history_digest(df, self.bars) == self.digest
+
+    def current(self) -> dict:
+        """마지막 봉 기준 이동 통계"""
+        sma = self.closes.mean if self.closes.full() else float("nan")
+        std = self.closes.std() if self.closes.full() else float("nan")
+        vol = self.returns.std() if self.returns.full() else float("nan")
+        if math.isnan(std) or self.last_close is None:
+            z_score = float("nan")
+        elif std == 0:
+            z_score = float("nan") if self.last_close == sma else math.copysign(float("inf"), self.last_close - sma)
+        else:
+            z_score = (self.last_close - sma) / std
+        return {'Vol_Std': vol, 'SMA_Price': sma, 'STD_Price': std, 'Z_Score': z_score}
+
+    def update(self, date, close: float) -> dict:
+        """새 봉 하나를 반영하고 그 봉의 통계를 반환합니다 (O(1))."""
+        close = float(close)
+        ret = float("nan")
+        if self.last_close is not None:
+            ret = close / self.last_close - 1
+            self.returns.push(ret)
+            self.count += 1
+            delta = ret - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (ret - self.mean)
+            self.max_return = ret if math.isnan(self.max_return) else max(self.max_return, ret)
+            self.min_return = ret if math.isnan(self.min_return) else min(self.min_return, ret)
+        else:
+            self.start_date = date
+
+        self.closes.push(close)
+        self.last_close = close
+        self.last_date = date
+        self.bars += 1
+
+        row = self.current()
+        row['Return'] = ret
+        return row
+
+    def overall_std(self) -> float:
+        """전체 기간 등락률 표준편차 (df['Return'].std()와 같은 ddof=1)"""
+        if self.count < 2:
+            return float("nan")
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def check_consistency(self, df: pd.DataFrame, tolerance: float = None, full: bool = False) -> float:
+        """
+        마지막 봉의 통계를 다시 계산한 값과 비교해 최대 상대 오차를 반환합니다.
+        허용 오차를 넘으면 ValueError를 발생시킵니다.
+        - 기본: 마지막 window+1개 종가만으로 이동 통계를 NumPy로 다시 계산합니다 (O(window), 매 실행 검증용).
+          전체 기간 등락률 표준편차는 matches()의 종가 해시로 같은 이력임을 보장합니다.
+        - full=True: pandas 전체 재계산과 비교하고 전체 기간 등락률 표준편차도 다시 계산합니다.
+        """
+        tolerance = settings.STATS_CONSISTENCY_TOLERANCE if tolerance is None else tolerance
+        actual = self.current()
+        columns = ('Vol_Std', 'SMA_Price', 'STD_Price', 'Z_Score')
+        if full:
+            from src.analyzer import MarketAnalyzer
+
+            expected_df = MarketAnalyzer.calculate_statistics(df[['Close']].copy(), window=self.window)
+            expected = expected_df.iloc[-1]
+            pairs = [(actual[col], expected[col]) for col in columns]
+            pairs.append((self.overall_std(), expected_df['Return'].std()))
+        else:
+            expected = self.trailing_statistics(df['Close'].to_numpy(dtype=np.float64), self.window)
+            pairs = [(actual[col], expected[col]) for col in columns]
+
+        max_error = 0.0
+        for got, want in pairs:
+            if pd.isna(got) and pd.isna(want):
+                continue
+            if pd.isna(got) or pd.isna(want):
+                raise ValueError(f"incremental statistics mismatch: {got} != {want}")
+            error = abs(got - want) / max(abs(want), 1e-300)
+            max_error = max(max_error, error)
+        if max_error > tolerance:
+            raise ValueError(f"incremental statistics drifted: relative error {max_error:.3e} > {tolerance:.1e}")
+        return max_error
+
+    @staticmethod
+    def trailing_statistics(close: np.ndarray, window: int) -> dict:
+        """마지막 봉의 이동 통계를 최근 window+1개 종가만으로 계산합니다 (calculate_statistics의 마지막 행과 같은 정의)."""
+        tail = close[-(window + 1):]
+        nan = float("nan")
+        if len(tail) < window:
+            return {'Vol_Std': nan, 'SMA_Price': nan, 'STD_Price': nan, 'Z_Score': nan}
+        closes = tail[-window:]
+        sma = float(closes.mean())
+        std = float(closes.std(ddof=1)) if window > 1 else nan
+        # 첫 봉의 등락률은 NaN이므로 window개 등락률이 모두 있으려면 window+1개 종가가 필요합니다.
+        vol = float((tail[1:] / tail[:-1] - 1).std(ddof=1)) if len(tail) > window and window > 1 else nan
+        if math.isnan(std):
+            z_score = nan
+        elif std == 0:
+            z_score = nan if close[-1] == sma else math.copysign(float("inf"), close[-1] - sma)
+        else:
+            z_score = float((close[-1] - sma) / std)
+        return {'Vol_Std': vol, 'SMA_Price': sma, 'STD_Price': std, 'Z_Score': z_score}
+
+    @staticmethod
+    def _path(ticker: str) -> str:
+        return os.path.join(settings.STATS_STATE_DIR, f"{ticker}.json")
+
+    def to_dict(self) -> dict:
+        return {
+            'window': self.window,
+            'start_date': self.start_date.strftime('%Y-%m-%d') if self.start_date is not None else None,
+            'last_date': self.last_date.strftime('%Y-%m-%d') if self.last_date is not None else None,
+            'last_close': self.last_close,
+            'bars': self.bars,
+            'closes': list(self.closes.buffer),
+            'returns': list(self.returns.buffer),
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'max_return': self.max_return,
+            'min_return': self.min_return,
+            'digest': self.digest,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollingStatsState":
+        state = cls(data['window'])
+        state.start_date = pd.Timestamp(data['start_date']) if data['start_date'] else None
+        state.last_date = pd.Timestamp(data['last_date']) if data['last_date'] else None
+        state.last_close = data['last_close']
+        state.bars = data['bars']
+        state.closes = _SlidingMoments(state.window, data['closes'])
+        state.returns = _SlidingMoments(state.window, data['returns'])
+        state.count = data['count']
+        state.mean = data['mean']
+        state.m2 = data['m2']
+        state.max_return = data['max_return']
+        state.min_return = data['min_return']
+        # 해시가 없는 이전 형식의 상태는 이어받지 않고 전체 재계산합니다.
+        state.digest = data.get('digest')
+        return state
+
+    def save(self, ticker: str):
+        """상태를 JSON으로 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+        path = self._path(ticker)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, ticker: str):
+        """저장된 상태를 읽습니다. 없거나 읽을 수 없으면 None"""
+        try:
+            with open(cls._path(ticker), "r") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
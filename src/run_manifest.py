@@ -0,0 +1,222 @@
+# src/run_manifest.py
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import settings
+
+
+class RunManifest:
+    """
+    하루 단위 실행 기록(로컬 작업 큐 겸 체크포인트).
+    RUN_DIR/<날짜>/ 아래에 종목별 파일을 둡니다.
+    - claims/<티커>: 처리 중인 워커 (O_EXCL 생성으로 원자적 선점)
+    - done/<티커>.json: 완료된 종목의 요약 (병합 단계 입력)
+    - failed/<티커>.json: 실패 사유 (같은 날 재실행 시 다시 처리)
+    같은 날 다시 실행하면 완료된 종목은 건너뛰고 실패/미완료 종목만 처리합니다.
+    """
+
+    def __init__(self, run_date: str = None, root: str = None):
+        self.run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+        self.base_dir = root or settings.RUN_DIR
+        self.root = os.path.join(self.base_dir, self.run_date)
+        for sub in ("claims", "done", "failed"):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+        self.owner = {"host": socket.gethostname(), "pid": os.getpid()}
+        self.claimed = []
+        self._lock = threading.Lock()
+
+    def _path(self, kind: str, ticker: str) -> str:
+        suffix = "" if kind == "claims" else ".json"
+        return os.path.join(self.root, kind, f"{ticker}{suffix}")
+
+    def _atomic_write(self, path: str, data: dict):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def is_done(self, ticker: str) -> bool:
+        return os.path.exists(self._path("done", ticker))
+
+    def _is_stale(self, path: str) -> bool:
+        """선점한 프로세스가 (같은 호스트에서) 종료됐거나 RUN_CLAIM_TIMEOUT_SEC가 지난 선점이면 True"""
+        try:
+            with open(path, "r") as f:
+                claim = json.load(f)
+        except (OSError, ValueError):
+            # 선점 직후 내용을 쓰기 전일 수 있으므로 파일 시각으로만 판단
+            claim = {}
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return False
+        if age > settings.RUN_CLAIM_TIMEOUT_SEC:
+            return True
+        if claim.get("host") == self.owner["host"] and claim.get("pid"):
+            try:
+                os.kill(claim["pid"], 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                return False
+        return False
+
+    def claim(self, ticker: str) -> bool:
+        """종목을 선점합니다. 이미 완료됐거나 다른 워커가 처리 중이면 False"""
+        if self.is_done(ticker):
+            return False
+        path = self._path("claims", ticker)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._is_stale(path):
+                    return False
+                # 오래된 선점은 이름을 바꿔 치웁니다. rename은 원자적이므로 한 워커만 성공합니다.
+                tombstone = f"{path}.stale-{self.owner['pid']}-{time.time_ns()}"
+                try:
+                    os.rename(path, tombstone)
+                    os.remove(tombstone)
+                except FileNotFoundError:
+                    return False
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({**self.owner, "claimed_at": datetime.now().isoformat(timespec="seconds")}, f)
+            with self._lock:
+                self.claimed.append(ticker)
+            return True
+        return False
+
+    def claim_batches(self, tickers: list, size: int):
+        """선점에 성공한 종목을 size개씩 묶어 차례로 내보냅니다 (소비되는 만큼만 선점)."""
+        batch = []
+        for ticker in tickers:
+            if self.claim(ticker):
+                batch.append(ticker)
+                if len(batch) == size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def release(self, ticker: str):
+        path = self._path("claims", ticker)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def mark_done(self, ticker: str, summary: dict):
+        self._atomic_write(self._path("done", ticker), summary)
+        failed_path = self._path("failed", ticker)
+        if os.path.exists(failed_path):
+            os.remove(failed_path)
+        self.release(ticker)
+
+    def mark_failed(self, ticker: str, error: str):
+        self._atomic_write(self._path("failed", ticker), {
+            "ticker": ticker, "error": error, "failed_at": datetime.now().isoformat(timespec="seconds"), **self.owner
+        })
+        self.release(ticker)
+
+    def finish(self) -> list:
+        """이 워커가 선점했지만 완료하지 못한 종목을 실패로 기록하고 목록을 반환합니다."""
+        with self._lock:
+            claimed, self.claimed = self.claimed, []
+        unfinished = [ticker for ticker in claimed if not self.is_done(ticker)]
+        for ticker in unfinished:
+            self.mark_failed(ticker, "not completed")
+        return unfinished
+
+    def results(self, tickers: list) -> list:
+        """완료된 종목의 요약을 tickers 순서로 반환합니다 (모든 샤드의 결과 병합)."""
+        summaries = []
+        for ticker in tickers:
+            try:
+                with open(self._path("done", ticker), "r") as f:
+                    summaries.append(json.load(f))
+            except FileNotFoundError:
+                continue
+        return summaries
+
+    def status(self, tickers: list) -> dict:
+        done = {name[:-len(".json")] for name in os.listdir(os.path.join(self.root, "done"))}
+        failed = {name[:-len(".json")] for name in os.listdir(os.path.join(self.root, "failed"))}
+        return {
+            "total": len(tickers),
+            "done": sum(ticker in done for ticker in tickers),
+            "failed": sum(ticker in failed and ticker not in done for ticker in tickers),
+            "pending": sum(ticker not in done and ticker not in failed for ticker in tickers),
+            "failed_tickers": [ticker for ticker in tickers if ticker in failed and ticker not in done],
+        }
+
+    def write_summary(self, tickers: list, **extra) -> str:
+        """실행 요약(manifest.json)을 기록하고 경로를 반환합니다."""
+        path = os.path.join(self.root, "manifest.json")
+        self._atomic_write(path, {
+            "run_date": self.run_date,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            **self.status(tickers),
+            **extra,
+        })
+        return path
+
+    def prune(self, keep_days: int = None):
+        """keep_days보다 오래된 날짜의 실행 기록을 삭제합니다."""
+        keep_days = settings.RUN_KEEP_DAYS if keep_days is None else keep_days
+        cutoff = (datetime.strptime(self.run_date, '%Y-%m-%d') - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+        for name in os.listdir(self.base_dir):
+            if name < cutoff and os.path.isdir(os.path.join(self.base_dir, name)):
+                shutil.rmtree(os.path.join(self.base_dir, name), ignore_errors=True)
+
+
+class CheckpointBuffer:
+    """
+    분석이 끝난 종목을 모아 두었다가, 시트 쓰기를 전송(flush)한 뒤 한꺼번에 완료로 기록합니다.
+    시트에 반영되기 전에 완료로 기록되는 일이 없도록 하면서 일괄 전송의 이점을 유지합니다.
+    flush(on_done)가 쓰기 큐에 넣고 바로 반환하면, 전송이 끝났을 때 콜백으로 기록합니다.
+    - sent/persisted(다음 실행에서 다시 보낼 요청으로 저장됨): 완료
+    - failed: 실패 (같은 날 재실행 시 다시 처리)
+    """
+
+    def __init__(self, manifest: RunManifest, flush=None, every: int = None):
+        self.manifest = manifest
+        self.flush = flush
+        self.every = every or settings.RUN_CHECKPOINT_EVERY
+        self.items = []
+        self._lock = threading.Lock()
+
+    def add(self, ticker: str, summary: dict):
+        with self._lock:
+            self.items.append((ticker, summary))
+            if len(self.items) >= self.every:
+                self._commit()
+
+    def commit(self):
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        if not self.items:
+            return
+        items, self.items = self.items, []
+        if self.flush:
+            self.flush(on_done=lambda status: self._record(items, status))
+        else:
+            self._record(items, "sent")
+
+    def _record(self, items: list, status: str):
+        for ticker, summary in items:
+            if status == "failed":
+                self.manifest.mark_failed(ticker, "sheet write failed")
+            else:
+                self.manifest.mark_done(ticker, summary)
@@ -0,0 +1,93 @@
+# src/sheet_fingerprints.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from config import settings
+
+
+class SheetFingerprints:
+    """
+    워크시트 범위별로 마지막으로 쓴 값의 행 해시를 로컬 파일(워크시트당 JSON 하나)에 저장합니다.
+    - stage(): 쓰기 요청을 쌓을 때 새 해시를 임시로 기록합니다.
+    - take_pending()/commit(): 쓰기가 전송(또는 다음 실행용으로 저장)된 뒤에만 파일에 반영합니다.
+    워크시트 id가 바뀌면(삭제 후 다시 생성 등) 저장된 해시를 쓰지 않습니다.
+    시트를 손으로 고친 내용은 알 수 없으므로, 그럴 때는 디렉터리를 지우거나 SHEETS_FINGERPRINTS=0으로 실행합니다.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or settings.SHEETS_FINGERPRINT_DIR
+        self._saved = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def row_hash(row: list) -> str:
+        payload = json.dumps(row, ensure_ascii=False, default=str, separators=(",", ":"))
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _path(self, title: str) -> str:
+        name = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in title)
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _load(self, title: str) -> dict:
+        if title not in self._saved:
+            try:
+                with open(self._path(title), "r", encoding="utf-8") as f:
+                    self._saved[title] = json.load(f)
+            except (OSError, ValueError):
+                self._saved[title] = {"id": None, "ranges": {}}
+        return self._saved[title]
+
+    def get(self, title: str, sheet_id, key: str):
+        """key 범위에 마지막으로 쓴 해시 (없거나 워크시트가 바뀌었으면 None)"""
+        with self._lock:
+            entry = self._pending.get(title)
+            if entry is not None and entry["id"] == sheet_id:
+                if key in entry["ranges"] or entry["reset"]:
+                    return entry["ranges"].get(key)
+            saved = self._load(title)
+            if saved["id"] != sheet_id:
+                return None
+            return saved["ranges"].get(key)
+
+    def stage(self, title: str, sheet_id, key: str, value):
+        with self._lock:
+            entry = self._pending.get(title)
+            if entry is None or entry["id"] != sheet_id:
+                entry = self._pending[title] = {"id": sheet_id, "ranges": {}, "reset": False}
+            entry["ranges"][key] = value
+
+    def reset(self, title: str, sheet_id):
+        """새로 만든 워크시트: 이전 해시를 버립니다."""
+        with self._lock:
+            self._pending[title] = {"id": sheet_id, "ranges": {}, "reset": True}
+
+    def take_pending(self) -> dict:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return pending
+
+    def commit(self, pending: dict):
+        """전송이 끝난 쓰기의 해시를 파일에 반영합니다."""
+        if not pending:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for title, entry in pending.items():
+                # 이번에 쓴 범위만 갱신합니다 (같은 워크시트의 다른 범위 해시는 유지).
+                saved = self._load(title)
+                if entry["reset"] or saved["id"] != entry["id"]:
+                    saved = self._saved[title] = {"id": entry["id"], "ranges": {}}
+                saved["ranges"].update(entry["ranges"])
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(saved, f, ensure_ascii=False)
+                    os.replace(tmp_path, self._path(title))
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
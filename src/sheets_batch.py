@@ -0,0 +1,164 @@
+# src/sheets_batch.py
+import threading
+
+from gspread.utils import a1_range_to_grid_range, absolute_range_name
+from config import settings
+from src.write_queue import send_request
+
+
+class SheetsBatch:
+    """
+    시트 쓰기 요청을 모아 두었다가 flush() 시 한꺼번에 전송합니다.
+    - 구조/서식/메모 요청(행 삽입, 값 지우기, format, note): spreadsheet.batch_update
+    - 값 쓰기: spreadsheet.values_batch_update
+    구조 요청을 먼저 보낸 뒤 값을 쓰므로, 행 삽입 후 해당 위치에 값을 쓰는 순서가 유지됩니다.
+    writer(WriteBehindQueue)가 있으면 요청 본문을 쓰기 큐에 넣고 바로 반환합니다 (큐는 넣은 순서대로 전송).
+    """
+
+    def __init__(self, spreadsheet, max_requests: int = None, max_cells: int = None, writer=None):
+        self.spreadsheet = spreadsheet
+        self.writer = writer
+        self.max_requests = max_requests or settings.SHEETS_BATCH_MAX_REQUESTS
+        self.max_cells = max_cells or settings.SHEETS_BATCH_MAX_CELLS
+        self.requests = []
+        self.value_ranges = {}
+        # 개별 gspread 호출로 보냈다면 발생했을 HTTP 요청 수
+        self.logical_calls = 0
+        self.http_calls = 0
+        # 여러 스레드(파이프라인 출력 단계)에서 동시에 요청을 쌓을 수 있습니다.
+        self._lock = threading.RLock()
+
+    def update_values(self, title: str, range_name: str, values: list):
+        """worksheet.update(values, range_name)에 해당. 같은 범위에 다시 쓰면 마지막 값만 보냅니다."""
+        with self._lock:
+            self.value_ranges[absolute_range_name(title, range_name)] = values
+            self.logical_calls += 1
+
+    def insert_rows(self, sheet_id: int, title: str, values: list, row: int):
+        """worksheet.insert_rows(values, row)에 해당 (insertDimension + 값 쓰기)"""
+        with self._lock:
+            self.requests.append({
+                "insertDimension": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "dimension": "ROWS",
+                        "startIndex": row - 1,
+                        "endIndex": row - 1 + len(values),
+                    },
+                    "inheritFromBefore": False,
+                }
+            })
+            self.value_ranges[absolute_range_name(title, f"A{row}")] = values
+            self.logical_calls += 2
+
+    def update_note(self, sheet_id: int, cell: str, content: str):
+        """worksheet.update_note(cell, content)에 해당"""
+        with self._lock:
+            self.requests.append({
+                "updateCells": {
+                    "range": a1_range_to_grid_range(cell, sheet_id),
+                    "fields": "note",
+                    "rows": [{"values": [{"note": content}]}],
+                }
+            })
+            self.logical_calls += 1
+
+    def format(self, sheet_id: int, range_name: str, cell_format: dict):
+        """worksheet.format(range_name, cell_format)에 해당"""
+        with self._lock:
+            self.requests.append({
+                "repeatCell": {
+                    "range": a1_range_to_grid_range(range_name, sheet_id),
+                    "cell": {"userEnteredFormat": cell_format},
+                    "fields": "userEnteredFormat(%s)" % ",".join(cell_format.keys()),
+                }
+            })
+            self.logical_calls += 1
+
+    def clear(self, sheet_id: int):
+        """worksheet.clear()에 해당 (값만 지우고 서식은 유지)"""
+        with self._lock:
+            self.requests.append({
+                "updateCells": {
+                    "range": {"sheetId": sheet_id},
+                    "fields": "userEnteredValue",
+                }
+            })
+            self.logical_calls += 1
+
+    def resize(self, sheet_id: int, rows: int):
+        """worksheet.resize(rows=rows)에 해당"""
+        with self._lock:
+            self.requests.append({
+                "updateSheetProperties": {
+                    "properties": {"sheetId": sheet_id, "gridProperties": {"rowCount": rows}},
+                    "fields": "gridProperties.rowCount",
+                }
+            })
+            self.logical_calls += 1
+
+    def record_call(self, logical: int = 0, http: int = 0):
+        """배치 밖에서 즉시 실행되었거나(http) 캐시로 대체된(logical) 호출을 집계합니다."""
+        with self._lock:
+            self.logical_calls += logical
+            self.http_calls += http
+
+    def pending(self) -> bool:
+        return bool(self.requests or self.value_ranges)
+
+    def _value_chunks(self):
+        """값 쓰기를 셀 수 기준으로 나눕니다 (요청 크기 제한 대응)"""
+        chunk, cells = [], 0
+        for range_name, values in self.value_ranges.items():
+            size = sum(len(row) for row in values)
+            if chunk and cells + size > self.max_cells:
+                yield chunk
+                chunk, cells = [], 0
+            chunk.append({"range": range_name, "majorDimension": "ROWS", "values": values})
+            cells += size
+        if chunk:
+            yield chunk
+
+    def _bodies(self):
+        for i in range(0, len(self.requests), self.max_requests):
+            yield "batch_update", {"requests": self.requests[i:i + self.max_requests]}
+        for chunk in self._value_chunks():
+            yield "values_batch_update", {"valueInputOption": "RAW", "data": chunk}
+
+    def flush(self, on_done=None) -> dict:
+        """
+        모아둔 요청을 전송하고 통계를 반환합니다.
+        on_done(status)는 이번에 보낸 요청이 모두 끝난 뒤 한 번 호출됩니다.
+        status: "sent" | "persisted"(기한 내 못 보내 저장됨) | "failed"
+        """
+        with self._lock:
+            bodies = list(self._bodies())
+            self.requests = []
+            self.value_ranges = {}
+            self.http_calls += len(bodies)
+
+            if self.writer is None or not bodies:
+                for method, body in bodies:
+                    send_request(self.spreadsheet, method, body)
+                if on_done:
+                    on_done("sent")
+                return self.stats()
+
+            # 큐는 넣은 순서대로 보내므로 마지막 요청의 콜백이 이번 전송분 전체의 결과를 알립니다.
+            statuses = []
+
+            def collect(status):
+                statuses.append(status)
+                if len(statuses) == len(bodies) and on_done:
+                    on_done(next((s for s in ("failed", "persisted") if s in statuses), "sent"))
+
+            for method, body in bodies:
+                self.writer.submit(method, body, on_done=collect)
+            return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "logical_calls": self.logical_calls,
+            "http_calls": self.http_calls,
+            "saved_calls": self.logical_calls - self.http_calls,
+        }
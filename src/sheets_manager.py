@@ -1,12 +1,18 @@
 # src/sheets_manager.py
+import threading
 import gspread
+from gspread.utils import absolute_range_name, rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 from datetime import datetime
 from config import settings
+from src.sheets_batch import SheetsBatch
+from src.sheet_fingerprints import SheetFingerprints
+from src.write_queue import TokenBucket, WriteBehindQueue, call_with_backoff
+from src.metrics import metrics
 
 class SheetsManager:
-    def __init__(self, credentials_info, spreadsheet_name):
+    def __init__(self, credentials_info, spreadsheet_name, ticker_names: dict = None):
         self.scope = [
             "https://spreadsheets.google.com/feeds",
             "https://www.googleapis.com/auth/drive"
@@ -14,7 +20,18 @@ class SheetsManager:
         self.creds = ServiceAccountCredentials.from_json_keyfile_dict(credentials_info, self.scope)
         self.client = gspread.authorize(self.creds)
         self.spreadsheet_name = spreadsheet_name
+        # 시트에 표시할 종목명 (Universe.load가 돌려준 표, 기본: settings.TICKER_NAMES)
+        self.ticker_names = settings.TICKER_NAMES if ticker_names is None else ticker_names
         self.spreadsheet = self._get_or_create_spreadsheet()
+        # 읽기는 분당 할당량에 맞춰 기다렸다 보내고, 쓰기는 백그라운드 쓰기 큐가 할당량에 맞춰 보냅니다.
+        self.read_limiter = TokenBucket(settings.SHEETS_READ_QUOTA_PER_MIN)
+        self.writer = WriteBehindQueue(self.spreadsheet) if settings.SHEETS_WRITE_BEHIND else None
+        # 쓰기 요청은 모아두었다가 flush()에서 한 번에 전송합니다.
+        self.batch = SheetsBatch(self.spreadsheet, writer=self.writer)
+        # 범위별로 마지막으로 쓴 값의 해시와 비교해 바뀐 행만 씁니다.
+        self.fingerprints = SheetFingerprints() if settings.SHEETS_FINGERPRINTS else None
+        self._worksheets = None
+        self._lock = threading.Lock()
 
     def _get_or_create_spreadsheet(self):
         # 1. ID가 설정되어 있다면 ID로 먼저 시도
@@ -32,12 +49,47 @@ class SheetsManager:
             print(f"Spreadsheet '{self.spreadsheet_name}' not found. Creating new one...")
             return self.client.create(self.spreadsheet_name)
 
+    def _worksheet(self, title: str):
+        """워크시트 목록을 한 번만 조회해 캐시하고, 제목으로 워크시트를 찾습니다."""
+        with self._lock:
+            if self._worksheets is None:
+                self.read_limiter.acquire()
+                with metrics.timer("sheets.worksheets"):
+                    worksheets = call_with_backoff(self.spreadsheet.worksheets, "worksheets")
+                    self._worksheets = {ws.title: ws for ws in worksheets}
+                self.batch.record_call(http=1)
+        self.batch.record_call(logical=1)
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def _has_worksheet(self, title: str) -> bool:
+        try:
+            self._worksheet(title)
+            return True
+        except gspread.WorksheetNotFound:
+            return False
+
+    def _add_worksheet(self, title: str, rows: str, cols: str):
+        with self._lock:
+            # 시트 ID가 바로 필요하므로 큐를 거치지 않고 보내되, 쓰기 할당량은 함께 씁니다.
+            if self.writer:
+                self.writer.limiter.acquire()
+            with metrics.timer("sheets.add_worksheet", ticker=title):
+                worksheet = call_with_backoff(
+                    lambda: self.spreadsheet.add_worksheet(title=title, rows=rows, cols=cols), "add_worksheet"
+                )
+            self.batch.record_call(logical=1, http=1)
+            self._worksheets[title] = worksheet
+            return worksheet
+
     def get_date_range(self, ticker: str):
         """시트에서 시작날짜와 종료날짜를 읽어옵니다. 없으면 기본값(3년전~오늘) 반환"""
         try:
-            worksheet = self.spreadsheet.worksheet(ticker)
-            start_date = worksheet.acell('B2').value
-            end_date = worksheet.acell('B3').value
+            worksheet = self._worksheet(ticker)
+            with metrics.timer("sheets.acell", ticker=ticker):
+                start_date = worksheet.acell('B2').value
+                end_date = worksheet.acell('B3').value
             return start_date, end_date
         except:
             return None, None
@@ -45,37 +97,101 @@ class SheetsManager:
     def get_history(self, ticker: str) -> pd.DataFrame:
         """기존 시트의 과거 종가를 DataFrame으로 반환합니다"""
         try:
-            worksheet = self.spreadsheet.worksheet(ticker)
-            records = worksheet.get_all_values()
+            worksheet = self._worksheet(ticker)
+            with metrics.timer("sheets.get_all_values", ticker=ticker) as record:
+                records = worksheet.get_all_values()
+                record.rows = len(records)
             if len(records) > 12:
-                headers = records[11]
-                data = records[12:]
-                
-                # 최신순 정렬이므로, 오름차순(오래된 순)으로 변경
-                data.reverse()
-                df = pd.DataFrame(data, columns=headers)
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-                df = df.dropna(subset=['Date']).set_index('Date')
-                
-                # Close 컬럼만 숫자로 파싱
-                if 'Close' in df.columns:
-                    df['Close'] = pd.to_numeric(df['Close'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-                    return df[['Close']]
+                return self._parse_history(records[11], records[12:])
         except Exception:
             pass
         return pd.DataFrame()
 
-    def update_ticker_sheet(self, ticker: str, df: pd.DataFrame, summary: dict, new_rows_count: int = 0, update_last_row: bool = False):
-        """종목 시트 업데이트 - 증분 업데이트 지원으로 기존 데이터 보존"""
+    @staticmethod
+    def _parse_history(headers: list, data: list) -> pd.DataFrame:
+        """최신순으로 저장된 테이블 행들을 오름차순 Close DataFrame으로 변환합니다"""
+        # 빈 셀은 응답에서 생략되므로 헤더 길이에 맞춰 채웁니다.
+        data = [row + [""] * (len(headers) - len(row)) for row in data]
+
+        # 최신순 정렬이므로, 오름차순(오래된 순)으로 변경
+        data.reverse()
+        df = pd.DataFrame(data, columns=headers)
+        if 'Date' not in df.columns or 'Close' not in df.columns:
+            return pd.DataFrame()
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df = df.dropna(subset=['Date']).set_index('Date')
+
+        # Close 컬럼만 숫자로 파싱
+        df['Close'] = pd.to_numeric(df['Close'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+        return df[['Close']]
+
+    def read_all(self, tickers: list, tail_rows: int = None) -> dict:
+        """
+        모든 종목 시트의 시작/종료 날짜(B2:B3)와 Date/Close 컬럼을 values_batch_get 한 번으로 읽습니다.
+        tail_rows가 주어지면 최신 N개 행(13행부터, 최신순 저장)만 읽습니다.
+        반환: {ticker: (start_date, end_date, history_df)} (시트가 없으면 (None, None, 빈 DataFrame))
+        """
+        results = {ticker: (None, None, pd.DataFrame()) for ticker in tickers}
+        try:
+            existing = [ticker for ticker in tickers if self._has_worksheet(ticker)]
+        except Exception as e:
+            print(f"Error listing worksheets: {e}")
+            return results
+        if not existing:
+            return results
+
+        table_end = f"B{12 + tail_rows}" if tail_rows else "B"
+        ranges = []
+        for ticker in existing:
+            ranges.append(absolute_range_name(ticker, "B2:B3"))
+            ranges.append(absolute_range_name(ticker, f"A12:{table_end}"))
+
+        try:
+            self.read_limiter.acquire()
+            with metrics.timer("sheets.values_batch_get") as record:
+                response = call_with_backoff(lambda: self.spreadsheet.values_batch_get(ranges), "values_batch_get")
+                record.rows = sum(len(vr.get("values", [])) for vr in response.get("valueRanges", []))
+            self.batch.record_call(http=1)
+            # 종목별 get_date_range(acell 2회) + get_history(전체 값 1회)를 대체
+            self.batch.record_call(logical=3 * len(existing))
+        except Exception as e:
+            print(f"Error reading sheets: {e}")
+            return results
+
+        value_ranges = response.get("valueRanges", [])
+        for i, ticker in enumerate(existing):
+            dates = value_ranges[2 * i].get("values", [])
+            table = value_ranges[2 * i + 1].get("values", [])
+
+            start_date = dates[0][0] if len(dates) > 0 and dates[0] else None
+            end_date = dates[1][0] if len(dates) > 1 and dates[1] else None
+
+            history = pd.DataFrame()
+            if len(table) > 1:
+                try:
+                    history = self._parse_history(table[0], table[1:])
+                except Exception as e:
+                    print(f"Error parsing {ticker} history: {e}")
+            results[ticker] = (start_date or None, end_date or None, history)
+        return results
+
+    def update_ticker_sheet(self, ticker: str, df: pd.DataFrame, summary: dict, new_rows_count: int = 0,
+                            update_last_row: bool = False, history_rows: int = 0):
+        """
+        종목 시트 업데이트 - 증분 업데이트 지원으로 기존 데이터 보존
+        history_rows > 0이면 상세 내역은 최근 history_rows개 행만 남깁니다 (새 행을 넣은 뒤 시트 행 수를 줄임).
+        """
         is_new_sheet = False
+        shown = min(len(df), history_rows) if history_rows else len(df)
         try:
-            worksheet = self.spreadsheet.worksheet(ticker)
+            worksheet = self._worksheet(ticker)
         except gspread.WorksheetNotFound:
-            worksheet = self.spreadsheet.add_worksheet(title=ticker, rows="2000", cols="20")
+            # 이력(요약 11행 + 헤더 1행 + 본문)이 들어가도록 행 수를 정합니다.
+            worksheet = self._add_worksheet(ticker, rows=str(max(2000, 12 + shown)), cols="20")
             is_new_sheet = True
 
         # 1. 상단 요약 정보
-        ticker_name = settings.TICKER_NAMES.get(ticker, ticker)
+        ticker_name = self.ticker_names.get(ticker, ticker)
         ticker_display = f"{ticker} / {ticker_name}"
         
         # 매수가 계산: 현재가 × (1 + 시그마%)
@@ -98,70 +214,136 @@ class SheetsManager:
             ["", "", "", "", "", "", "", ""],  # 빈 줄
         ]
         
-        # 요약 정보 업데이트
-        worksheet.update("A1", summary_data)
+        # 요약 정보 업데이트 (종료날짜는 실행 날짜라 해시에서 빼고, 나머지가 같아도 날짜가 바뀌면 그 칸만 씁니다)
+        if is_new_sheet and self.fingerprints:
+            self.fingerprints.reset(ticker, worksheet.id)
+        self._write_rows(worksheet, ticker, 1, summary_data, volatile={(2, 1): summary['end_date']})
 
         # 2. 상세 내역 (전체 기간, 최신순 정렬)
         table_header = ["Date", "Close", "등락률", "매수 여부", "매수 수량", "매수금액"]
         df_sorted = df.sort_index(ascending=False)
         
         if is_new_sheet:
-            rows = []
-            for index, row in df_sorted.iterrows():
-                rows.append([
-                    index.strftime('%Y-%m-%d'),
-                    round(row['Close'], 2),
-                    f"{round(row['Return']*100, 2)}%" if not pd.isna(row['Return']) else "0.00%",
-                    row['Buy_Signal'] if 'Buy_Signal' in row else "",
-                    row['Buy_Qty'] if 'Buy_Qty' in row and row['Buy_Qty'] > 0 else "",
-                    round(row['Buy_Amount'], 2) if 'Buy_Amount' in row and row['Buy_Amount'] > 0 else ""
-                ])
-            worksheet.update("A12", [table_header] + rows)
-            worksheet.update_note("B2", "YYYY-MM-DD 형식으로 입력 후 봇을 실행하세요.")
-            worksheet.format("A1:H11", {"textFormat": {"bold": True}, "horizontalAlignment": "CENTER"})
-            worksheet.format("A12:F12", {"textFormat": {"bold": True}, "backgroundColor": {"red": 0.8, "green": 0.8, "blue": 0.8}})
+            rows = self._render_rows(df_sorted.head(shown))
+            self.batch.update_values(ticker, "A12", [table_header])
+            self._upload_rows(ticker, 13, rows)
+            if rows:
+                self._stage(worksheet, ticker, "A13", SheetFingerprints.row_hash(rows[0]))
+            self.batch.update_note(worksheet.id, "B2", "YYYY-MM-DD 형식으로 입력 후 봇을 실행하세요.")
+            self.batch.format(worksheet.id, "A1:H11", {"textFormat": {"bold": True}, "horizontalAlignment": "CENTER"})
+            self.batch.format(worksheet.id, "A12:F12", {"textFormat": {"bold": True}, "backgroundColor": {"red": 0.8, "green": 0.8, "blue": 0.8}})
         else:
             # 기존 시트의 경우 증분 업데이트 수행
             if new_rows_count > 0:
-                # 새로운 데이터만 추출하여 상단에 삽입
-                df_new = df_sorted.head(new_rows_count)
-                new_data = []
-                for index, row in df_new.iterrows():
-                    new_data.append([
-                        index.strftime('%Y-%m-%d'),
-                        round(row['Close'], 2),
-                        f"{round(row['Return']*100, 2)}%" if not pd.isna(row['Return']) else "0.00%",
-                        row['Buy_Signal'] if 'Buy_Signal' in row else "",
-                        row['Buy_Qty'] if 'Buy_Qty' in row and row['Buy_Qty'] > 0 else "",
-                        round(row['Buy_Amount'], 2) if 'Buy_Amount' in row and row['Buy_Amount'] > 0 else ""
-                    ])
-                # 13번째 행에 새 데이터 삽입
-                worksheet.insert_rows(new_data, row=13)
-                
+                # 새로운 데이터만 추출하여 13번째 행에 삽입
+                new_data = self._render_rows(df_sorted.head(new_rows_count))
+                self.batch.insert_rows(worksheet.id, ticker, new_data, row=13)
+                self._stage(worksheet, ticker, "A13", SheetFingerprints.row_hash(new_data[0]))
+                if history_rows:
+                    # 밀려난 오래된 행은 잘라냅니다 (전체 이력은 로컬 결과 저장소에 있습니다).
+                    self.batch.resize(worksheet.id, 12 + history_rows)
+
             # 마지막 행(오늘) 업데이트
             if update_last_row:
-                # 만약 new_rows_count가 삽입되었다면 기존 최상단 행은 13 + new_rows_count 임
-                # 하지만 update_last_row가 True라면 최신 행 하나를 덮어씁니다 (혹은 insert 후라면 해당 row)
-                last_row_index = 13
-                latest_date_in_df = df_sorted.index[0]
-                latest_row = df_sorted.iloc[0]
-                updated_data = [[
-                    latest_date_in_df.strftime('%Y-%m-%d'),
-                    round(latest_row['Close'], 2),
-                    f"{round(latest_row['Return']*100, 2)}%" if not pd.isna(latest_row['Return']) else "0.00%",
-                    latest_row['Buy_Signal'] if 'Buy_Signal' in latest_row else "",
-                    latest_row['Buy_Qty'] if 'Buy_Qty' in latest_row and latest_row['Buy_Qty'] > 0 else "",
-                    round(latest_row['Buy_Amount'], 2) if 'Buy_Amount' in latest_row and latest_row['Buy_Amount'] > 0 else ""
-                ]]
-                # insert_rows를 했는지와 무관하게 13행에 현재 df의 가장 최신 데이터를 업데이트
-                worksheet.update("A13:F13", updated_data)
+                # insert_rows를 했는지와 무관하게 13행에 현재 df의 가장 최신 데이터를 업데이트 (값이 같으면 생략)
+                updated_data = self._render_rows(df_sorted.head(1))
+                latest = SheetFingerprints.row_hash(updated_data[0])
+                if not self.fingerprints or self.fingerprints.get(ticker, worksheet.id, "A13") != latest:
+                    self.batch.update_values(ticker, "A13:F13", updated_data)
+                    self._stage(worksheet, ticker, "A13", latest)
+
+    def _stage(self, worksheet, title: str, key: str, value):
+        if self.fingerprints:
+            self.fingerprints.stage(title, worksheet.id, key, value)
+
+    def _write_rows(self, worksheet, title: str, start_row: int, rows: list, volatile=None):
+        """
+        start_row부터 rows를 쓰되, 마지막으로 쓴 값과 행 해시가 같은 행은 건너뜁니다 (바뀐 연속 행끼리 한 범위).
+        volatile은 {(행, 열): 비교값}으로, 그 칸(분석일, 업데이트 시각 등)은 행 해시에서 빼고 비교값을 따로 기록합니다.
+        건너뛴 행에서도 비교값이 마지막으로 쓴 값과 다르면 그 칸만 씁니다 (같은 날 재실행은 쓰지 않고, 날짜가 바뀌면 씀).
+        이전보다 행이 줄면 남는 행은 빈 값으로 덮습니다.
+        """
+        volatile = volatile or {}
+        key = f"A{start_row}"
+        hashes = [
+            SheetFingerprints.row_hash([value for col, value in enumerate(row) if (i, col) not in volatile])
+            for i, row in enumerate(rows)
+        ]
+        stamps = {f"{i},{col}": str(value) for (i, col), value in volatile.items()}
+        previous = (self.fingerprints.get(title, worksheet.id, key) if self.fingerprints else None) or []
+        previous_stamps = (self.fingerprints.get(title, worksheet.id, f"{key}:volatile") if self.fingerprints else None) or {}
+
+        skipped = set()
+        i = 0
+        while i < len(rows):
+            if i < len(previous) and previous[i] == hashes[i]:
+                skipped.add(i)
+                i += 1
+                continue
+            j = i
+            while j < len(rows) and not (j < len(previous) and previous[j] == hashes[j]):
+                j += 1
+            self.batch.update_values(title, f"A{start_row + i}", rows[i:j])
+            i = j
+        # 건너뛴 행의 volatile 칸 중 값이 바뀐 칸만 열마다 연속 구간으로 묶어 씁니다.
+        for col in sorted({col for _, col in volatile}):
+            targets = sorted(
+                i for i in skipped
+                if (i, col) in volatile and previous_stamps.get(f"{i},{col}") != stamps[f"{i},{col}"]
+            )
+            while targets:
+                run = [targets.pop(0)]
+                while targets and targets[0] == run[-1] + 1:
+                    run.append(targets.pop(0))
+                self.batch.update_values(
+                    title, rowcol_to_a1(start_row + run[0], col + 1), [[rows[i][col]] for i in run]
+                )
+        if len(previous) > len(rows):
+            width = max((len(row) for row in rows), default=1)
+            self.batch.update_values(title, f"A{start_row + len(rows)}", [[""] * width] * (len(previous) - len(rows)))
+        if hashes != previous:
+            self._stage(worksheet, title, key, hashes)
+        if stamps != previous_stamps:
+            self._stage(worksheet, title, f"{key}:volatile", stamps)
+
+    @staticmethod
+    def _render_rows(df: pd.DataFrame) -> list:
+        """
+        상세 내역 행(Date, Close, 등락률, 매수 여부, 매수 수량, 매수금액)을 컬럼 단위로 만듭니다.
+        숫자는 tolist()로 파이썬 float/int로 바꾼 뒤 파이썬 round를 적용해
+        행 단위(iterrows) 포맷팅과 같은 값(같은 JSON 표현)을 냅니다.
+        """
+        n = len(df)
+        dates = df.index.strftime('%Y-%m-%d').tolist()
+        closes = [round(value, 2) for value in df['Close'].tolist()]
+        returns = [
+            "0.00%" if value != value else f"{round(value, 2)}%"
+            for value in (df['Return'] * 100).tolist()
+        ]
+        signals = df['Buy_Signal'].tolist() if 'Buy_Signal' in df.columns else [""] * n
+        quantities = (
+            [qty if qty > 0 else "" for qty in df['Buy_Qty'].tolist()] if 'Buy_Qty' in df.columns else [""] * n
+        )
+        amounts = (
+            [round(amount, 2) if amount > 0 else "" for amount in df['Buy_Amount'].tolist()]
+            if 'Buy_Amount' in df.columns else [""] * n
+        )
+        return [list(row) for row in zip(dates, closes, returns, signals, quantities, amounts)]
+
+    def _upload_rows(self, title: str, start_row: int, rows: list):
+        """큰 표를 SHEETS_UPLOAD_CHUNK_ROWS행 단위 범위로 나눠 쓰기 요청에 넣습니다."""
+        size = settings.SHEETS_UPLOAD_CHUNK_ROWS
+        for offset in range(0, len(rows), size):
+            self.batch.update_values(title, f"A{start_row + offset}", rows[offset:offset + size])
 
     def update_dashboard(self, summary_list):
         """메인 대시보드 요약 정보 업데이트"""
+        is_new_sheet = False
         try:
-            worksheet = self.spreadsheet.worksheet("Dashboard")
+            worksheet = self._worksheet("Dashboard")
         except gspread.WorksheetNotFound:
-            worksheet = self.spreadsheet.add_worksheet(title="Dashboard", rows="50", cols="15")
+            worksheet = self._add_worksheet("Dashboard", rows=str(max(50, len(summary_list) + 1)), cols="15")
+            is_new_sheet = True
 
         header = [
             "분석일", "종목", "현재가", "1σ 매수가", "2σ 매수가", "3σ 매수가", 
@@ -173,7 +355,7 @@ class SheetsManager:
         rows = []
         for item in summary_list:
             ticker = item['ticker']
-            ticker_name = settings.TICKER_NAMES.get(ticker, ticker)
+            ticker_name = self.ticker_names.get(ticker, ticker)
             ticker_display = f"{ticker} / {ticker_name}"
             
             # 매수가 계산: 현재가 × (1 + 시그마%)
@@ -196,6 +378,57 @@ class SheetsManager:
                 now
             ])
         
-        worksheet.clear()
-        worksheet.update([header] + rows)
-        worksheet.format("A1:H1", {"textFormat": {"bold": True}, "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9}})
+        # 종목 수가 시트 행 수보다 많으면 먼저 늘립니다.
+        if getattr(worksheet, "row_count", len(rows) + 1) < len(rows) + 1:
+            self.batch.resize(worksheet.id, len(rows) + 1)
+        if is_new_sheet and self.fingerprints:
+            self.fingerprints.reset("Dashboard", worksheet.id)
+        # 내용이 같은 행은 날짜가 바뀔 때(휴장일 실행)만 분석일/최종 업데이트 두 칸을 쓰고, 같은 날 재실행은 쓰지 않습니다.
+        volatile = {(i, col): today for i in range(1, len(rows) + 1) for col in (0, 7)}
+        if not is_new_sheet and not self.fingerprints:
+            self.batch.clear(worksheet.id)
+        elif not is_new_sheet and self.fingerprints.get("Dashboard", worksheet.id, "A1") is None:
+            # 이전에 쓴 행 수를 모르므로 한 번은 비우고 전체를 씁니다.
+            self.batch.clear(worksheet.id)
+            self.fingerprints.reset("Dashboard", worksheet.id)
+        self._write_rows(worksheet, "Dashboard", 1, [header] + rows, volatile=volatile)
+        if is_new_sheet:
+            self.batch.format(worksheet.id, "A1:H1", {"textFormat": {"bold": True}, "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9}})
+
+    def flush(self, on_done=None) -> dict:
+        """
+        모아둔 쓰기 요청을 batch_update / values_batch_update로 한 번에 전송합니다.
+        쓰기 큐를 쓰면 큐에 넣고 바로 반환하며, 전송 결과는 on_done(status)로 받습니다.
+        """
+        pending = self.fingerprints.take_pending() if self.fingerprints else None
+
+        def done(status):
+            # 보냈거나 다음 실행에서 보낼 요청으로 저장된 쓰기만 해시에 반영합니다.
+            if pending and status != "failed":
+                self.fingerprints.commit(pending)
+            if on_done:
+                on_done(status)
+
+        self.batch.flush(done)
+        stats = self.batch.stats()
+        print(f"Sheets: {stats['http_calls']} API requests ({stats['saved_calls']} saved by batching)")
+        return stats
+
+    def drain(self, timeout: float = None) -> int:
+        """쓰기 큐가 빌 때까지 기다립니다. 기한 안에 못 보낸 요청은 저장하고 그 개수를 반환합니다."""
+        if self.writer is None:
+            return 0
+        return self.writer.drain(timeout)
+
+    def replay_pending(self, timeout: float = None) -> bool:
+        """
+        이전 실행에서 저장된 쓰기 요청을 먼저 보냅니다.
+        기한 안에 모두 보내지 못하면(다시 저장됨) False: 시트 상태가 밀려 있으므로 이번 실행의 시트 쓰기를 건너뛰어야 합니다.
+        """
+        if self.writer is None:
+            return True
+        count = self.writer.load_pending()
+        if not count:
+            return True
+        print(f"Sheets: replaying {count} write requests saved by a previous run")
+        return self.writer.drain(timeout) == 0
@@ -0,0 +1,215 @@
+# src/signals.py
+"""
+시그널 전용 빠른 실행 모드 (장중 알림용).
+시트를 읽지 않고 최근 LOOKBACK_PERIOD개 봉만으로 최신 Z-Score를 계산해 텔레그램으로 보냅니다.
+σ 매수가(s1~s3)는 일일 실행과 같은 전체 기간 등락률 표준편차를 씁니다 (overall_stds).
+구글 클라이언트(gspread, oauth2client)는 --dashboard로 시트에 쓸 때만 불러오고 인증합니다.
+
+실행: python -m src.signals [--tickers SOXL,TQQQ] [--alerts-only] [--dashboard] [--no-telegram]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from config import settings
+from src.analyzer import MarketAnalyzer
+from src.metrics import metrics
+from src.rolling_state import RollingStatsState
+from src.universe import Universe
+
+
+class SignalScanner:
+    @staticmethod
+    def load_closes(tickers: list, window: int, price_cache=None) -> dict:
+        """
+        종목별 최근 window+1개 종가(pd.Series)를 가져옵니다.
+        캐시에 충분한 이력이 있으면 마지막 window+1개 행만 읽고, 캐시의 마지막 날짜 이후만 새로 받습니다.
+        캐시가 없거나 짧으면 SIGNALS_FALLBACK_PERIOD 기간을 받습니다. (캐시는 일일 실행에서만 갱신)
+        """
+        from src.data_fetcher import DataFetcher
+
+        need = window + 1
+        cached = {}
+        start_by_ticker = {}
+        for ticker in tickers:
+            df = price_cache.load(ticker, tail_rows=need) if price_cache else pd.DataFrame()
+            if len(df) >= need:
+                cached[ticker] = df['Close']
+                start_by_ticker[ticker] = df.index[-1].strftime('%Y-%m-%d')
+
+        fetched = DataFetcher.get_many(tickers, start_by_ticker, period=settings.SIGNALS_FALLBACK_PERIOD)
+
+        closes = {}
+        for ticker in tickers:
+            parts = [series for series in (cached.get(ticker), fetched[ticker].get('Close')) if series is not None]
+            if not parts:
+                continue
+            close = pd.concat(parts)
+            close = close[~close.index.duplicated(keep="last")].sort_index().dropna()
+            closes[ticker] = close.iloc[-need:]
+        return closes
+
+    @staticmethod
+    def overall_stds(tickers: list, price_cache=None, before: str = None) -> dict:
+        """
+        일일 실행(main.analyze_ticker)이 σ 매수가(s1~s3)에 쓰는 전체 기간 등락률 표준편차를 종목별로 구합니다.
+        - 일일 실행이 저장한 RollingStatsState가 있으면 그 값(시트/텔레그램에 나간 값)을 그대로 씁니다.
+        - 없으면 분석 시작일(로컬 결과 저장소의 start_date, 없으면 일일 실행 기본값인 3년 전)부터의
+          종가(가격 캐시, 없으면 새로 받음)로 df['Return'].std()를 계산합니다.
+        before(YYYY-MM-DD)를 주면 그 날짜 이전 봉까지만 씁니다 (상태가 그 날짜 이후까지 반영됐으면 다시 계산).
+        반환: {ticker: std} (이력이 없는 종목은 NaN)
+        """
+        stds = {}
+        missing = []
+        for ticker in tickers:
+            state = RollingStatsState.load(ticker) if settings.STATS_INCREMENTAL else None
+            if state is not None and state.count >= 2 and (
+                    before is None or state.last_date.strftime('%Y-%m-%d') < before):
+                stds[ticker] = state.overall_std()
+            else:
+                missing.append(ticker)
+        if not missing:
+            return stds
+
+        from src.sinks import SQLiteSink, sink_names
+
+        start_by_ticker = SQLiteSink().start_dates(missing) if "sqlite" in sink_names() else {}
+        default_start = (datetime.now() - timedelta(days=365 * 3)).strftime('%Y-%m-%d')
+        start_by_ticker = {ticker: start_by_ticker.get(ticker, default_start) for ticker in missing}
+
+        history = {ticker: price_cache.load(ticker) for ticker in missing} if price_cache else {}
+        fetch = [ticker for ticker in missing if history.get(ticker) is None or history[ticker].empty]
+        if fetch:
+            from src.data_fetcher import DataFetcher
+            history.update(DataFetcher.get_many(fetch, {ticker: start_by_ticker[ticker] for ticker in fetch}))
+
+        for ticker in missing:
+            df = history.get(ticker)
+            if df is None or df.empty:
+                stds[ticker] = float("nan")
+                continue
+            close = df['Close'].loc[start_by_ticker[ticker]:]
+            if before:
+                close = close[close.index.strftime('%Y-%m-%d') < before]
+            stds[ticker] = float(close.pct_change(fill_method=None).std())
+        return stds
+
+    @staticmethod
+    def compute(ticker: str, close: pd.Series, window: int, thresholds: dict, overall_std: float) -> dict:
+        """
+        최근 window+1개 종가로 calculate_statistics의 마지막 행과 같은 값을 계산합니다.
+        σ 매수가(s1~s3)는 일일 실행(build_summary)과 같이 전체 기간 등락률 표준편차(overall_std)로 정합니다.
+        이력이 부족하면 None
+        """
+        values = close.to_numpy(dtype=np.float64)
+        if len(values) < window + 1:
+            print(f"Warning: {ticker} 이력이 {window + 1}개 봉보다 짧아 건너뜁니다.")
+            return None
+
+        returns = values[1:] / values[:-1] - 1
+        prices = values[-window:]
+        sma = prices.mean()
+        std = prices.std(ddof=1)
+        z_score = (values[-1] - sma) / std if std > 0 else np.nan
+
+        return {
+            'ticker': ticker,
+            'date': close.index[-1].strftime('%Y-%m-%d'),
+            'current_price': float(values[-1]),
+            'daily_change': float(returns[-1]),
+            'volatility': float(overall_std),
+            's1': float(-overall_std),
+            's2': float(-overall_std * 2),
+            's3': float(-overall_std * 3),
+            'z_score': float(z_score) if not np.isnan(z_score) else 0.0,
+            'signal': MarketAnalyzer.get_signal(z_score, thresholds)[0],
+            'target_1': float(MarketAnalyzer.get_target_price(sma, std, thresholds["LEVEL_1"])),
+            'target_2': float(MarketAnalyzer.get_target_price(sma, std, thresholds["LEVEL_2"])),
+            'target_3': float(MarketAnalyzer.get_target_price(sma, std, thresholds["LEVEL_3"])),
+        }
+
+    @staticmethod
+    def scan(tickers: list, window: int = None, price_cache=None) -> list:
+        """종목별 최신 시그널 목록 (설정된 종목 순서)"""
+        window = window or settings.LOOKBACK_PERIOD
+        closes = SignalScanner.load_closes(tickers, window, price_cache)
+        stds = SignalScanner.overall_stds(list(closes), price_cache)
+        summaries = []
+        for ticker in tickers:
+            if ticker not in closes:
+                continue
+            summary = SignalScanner.compute(ticker, closes[ticker], window, settings.THRESHOLDS, stds[ticker])
+            if summary:
+                summaries.append(summary)
+        return summaries
+
+    @staticmethod
+    def is_alert(summary: dict) -> bool:
+        """σ 하락 매수 조건(당일 등락률 < -1σ) 또는 Z-Score 매수 신호"""
+        return summary['daily_change'] < summary['s1'] or summary['signal'] != "WAIT"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="최신 Z-Score/σ 시그널만 계산해 알림을 보냅니다.")
+    parser.add_argument("--tickers", default=None, help="쉼표 구분 (기본: 종목 목록 파일 또는 settings.TICKERS)")
+    parser.add_argument("--alerts-only", action="store_true", help="매수 조건에 해당하는 종목만 전송")
+    parser.add_argument("--dashboard", action="store_true", help="Dashboard 시트도 갱신 (구글 인증 필요)")
+    parser.add_argument("--no-telegram", action="store_true")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    metrics.reset()
+    if args.tickers:
+        tickers, ticker_names = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()], settings.TICKER_NAMES
+    else:
+        tickers, ticker_names = Universe.load()
+
+    price_cache = None
+    if settings.PRICE_CACHE_ENABLED:
+        from src.price_cache import PriceCache
+        price_cache = PriceCache()
+
+    summaries = SignalScanner.scan(tickers, settings.LOOKBACK_PERIOD, price_cache)
+    for item in summaries:
+        print(f"{item['ticker']:<6} {item['date']} ${item['current_price']:.2f} ({item['daily_change']*100:+.2f}%) "
+              f"Z {item['z_score']:+.2f} {item['signal']} | 1σ {item['s1']*100:.2f}%")
+
+    if args.dashboard and summaries:
+        from config import secrets_loader
+        from src.sheets_manager import SheetsManager
+
+        creds_info = secrets_loader.get_gcp_credentials()
+        if creds_info:
+            sheets = SheetsManager(creds_info, settings.SPREADSHEET_NAME, ticker_names)
+            # main.run과 같이 이전 실행이 저장해 둔 쓰기를 먼저 보내, 나중에 재전송되어 이번 대시보드를 덮지 않게 합니다.
+            if sheets.replay_pending():
+                sheets.update_dashboard(summaries)
+                sheets.flush()
+                sheets.drain()
+            else:
+                print("Warning: 이전 실행의 시트 쓰기를 아직 보내지 못해 Dashboard 갱신을 건너뜁니다.")
+        else:
+            print("GCP credentials not found. Skipping dashboard update.")
+
+    alerts = [item for item in summaries if SignalScanner.is_alert(item)] if args.alerts_only else summaries
+    if alerts and not args.no_telegram:
+        from src.telegram_notifier import get_telegram_notifier
+
+        telegram = get_telegram_notifier(ticker_names)
+        if telegram:
+            if telegram.send_messages(telegram.format_summary_chunks(alerts)):
+                print("Telegram notification sent.")
+            else:
+                print("Failed to send Telegram notification.")
+            telegram.close()
+        else:
+            print("Telegram not configured. Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID.")
+
+    print(f"Signals: {len(summaries)} tickers, {len(alerts)} alerts in {time.perf_counter() - started:.2f}s")
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# src/sinks.py
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+# 실패가 가장 나쁜 결과, 그다음이 저장(다음 실행에서 다시 보냄)
+STATUS_ORDER = ("failed", "persisted", "sent")
+
+
+class ResultSink:
+    """
+    분석 결과(종목별 봉 단위 프레임과 요약, 대시보드)를 받는 출력 대상의 공통 인터페이스.
+    write_*로 쌓은 쓰기는 flush(on_done)에서 내보내고, 결과를 on_done(status)로 알립니다.
+    status: "sent" | "persisted" | "failed" (CheckpointBuffer가 완료/실패 기록에 사용)
+    """
+    name = "sink"
+
+    def write_ticker(self, ticker: str, df: pd.DataFrame, summary: dict, new_rows_count: int = 0,
+                     update_last_row: bool = False):
+        pass
+
+    def write_dashboard(self, summary_list: list):
+        pass
+
+    def flush(self, on_done=None):
+        if on_done:
+            on_done("sent")
+
+    def drain(self) -> int:
+        """비동기 쓰기가 끝날 때까지 기다리고, 보내지 못하고 저장한 요청 수를 반환합니다."""
+        return 0
+
+    def close(self):
+        pass
+
+
+class SheetsSink(ResultSink):
+    """
+    구글 시트 출력. 종목 시트에는 최근 history_rows개 행(0이면 전체)만 남기고 대시보드를 갱신합니다.
+    전체 이력은 로컬 저장소(SQLiteSink)나 가격 캐시에 둡니다.
+    """
+    name = "sheets"
+
+    def __init__(self, sheets, history_rows: int = None):
+        self.sheets = sheets
+        self.history_rows = settings.SHEETS_HISTORY_ROWS if history_rows is None else history_rows
+
+    def write_ticker(self, ticker, df, summary, new_rows_count=0, update_last_row=False):
+        self.sheets.update_ticker_sheet(
+            ticker, df, summary, new_rows_count=new_rows_count, update_last_row=update_last_row,
+            history_rows=self.history_rows
+        )
+
+    def write_dashboard(self, summary_list):
+        self.sheets.update_dashboard(summary_list)
+
+    def flush(self, on_done=None):
+        return self.sheets.flush(on_done)
+
+    def drain(self) -> int:
+        return self.sheets.drain()
+
+
+class SQLiteSink(ResultSink):
+    """
+    로컬 SQLite 결과 저장소 (표준 라이브러리만 사용).
+    - bars: 종목/날짜별 종가, 등락률, 매수 신호. 이미 있는 날짜는 마지막 날짜(장중 갱신)만 덮어쓰므로
+      매수 신호는 그 봉을 처음 기록한 실행 시점의 값입니다.
+    - summaries: 실행마다 종목 요약을 한 행씩 추가합니다 (summary 컬럼은 build_summary dict의 JSON).
+    여러 워커 프로세스가 같은 파일에 쓸 수 있도록 WAL 모드와 잠금 대기 시간을 씁니다.
+    """
+    name = "sqlite"
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS bars (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            close REAL,
+            daily_return REAL,
+            buy_signal TEXT,
+            buy_qty INTEGER,
+            buy_amount REAL,
+            PRIMARY KEY (ticker, date)
+        )""",
+        """CREATE TABLE IF NOT EXISTS summaries (
+            run_date TEXT NOT NULL,
+            run_at TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            start_date TEXT,
+            end_date TEXT,
+            current_price REAL,
+            roi REAL,
+            z_score REAL,
+            signal TEXT,
+            summary TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS summaries_ticker ON summaries (ticker, run_at)",
+    )
+
+    def __init__(self, path: str = None, run_at: datetime = None):
+        self.path = path or settings.RESULT_DB_PATH
+        run_at = run_at or datetime.now()
+        self.run_at = run_at.isoformat(sep=' ', timespec='milliseconds')
+        self.run_date = run_at.strftime('%Y-%m-%d')
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def write_ticker(self, ticker, df, summary, new_rows_count=0, update_last_row=False):
+        with self._lock:
+            conn = self._connect()
+            last = conn.execute("SELECT MAX(date) FROM bars WHERE ticker = ?", (ticker,)).fetchone()[0]
+            if last is not None:
+                df = df[df.index >= pd.Timestamp(last)]
+            n = len(df)
+            signals = df['Buy_Signal'].astype(str).tolist() if 'Buy_Signal' in df.columns else [""] * n
+            quantities = df['Buy_Qty'].tolist() if 'Buy_Qty' in df.columns else [0] * n
+            amounts = df['Buy_Amount'].tolist() if 'Buy_Amount' in df.columns else [0.0] * n
+            rows = zip(
+                [ticker] * n, df.index.strftime('%Y-%m-%d').tolist(), df['Close'].tolist(),
+                df['Return'].tolist(), signals, quantities, amounts
+            )
+            conn.executemany(
+                "INSERT INTO bars VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (ticker, date) DO UPDATE SET "
+                "close = excluded.close, daily_return = excluded.daily_return, buy_signal = excluded.buy_signal, "
+                "buy_qty = excluded.buy_qty, buy_amount = excluded.buy_amount",
+                rows
+            )
+            conn.execute(
+                "INSERT INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_date, self.run_at, ticker, summary.get('start_date'), summary.get('end_date'),
+                 summary.get('current_price'), summary.get('roi'), summary.get('z_score'), summary.get('signal'),
+                 json.dumps(summary, ensure_ascii=False, default=_json_default))
+            )
+
+    def flush(self, on_done=None):
+        status = "sent"
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"Error writing to result store {self.path}: {e}")
+                    self._conn.rollback()
+                    status = "failed"
+        if on_done:
+            on_done(status)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def start_dates(self, tickers: list) -> dict:
+        """종목별 가장 최근 요약의 분석 시작일 (시트 B2 대신 사용). 기록이 없는 종목은 빠집니다."""
+        if not os.path.exists(self.path):
+            return {}
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT ticker, start_date FROM summaries s WHERE run_at = "
+                "(SELECT MAX(run_at) FROM summaries WHERE ticker = s.ticker)"
+            ).fetchall()
+        wanted = set(tickers)
+        return {ticker: start for ticker, start in rows if ticker in wanted and start}
+
+    def history(self, ticker: str, start: str = None, end: str = None) -> pd.DataFrame:
+        """저장된 봉 단위 이력 (Date 인덱스, 오름차순)"""
+        query = "SELECT date, close, daily_return, buy_signal, buy_qty, buy_amount FROM bars WHERE ticker = ?"
+        params = [ticker]
+        if start:
+            query += " AND date >= ?"
+            params.append(start)
+        if end:
+            query += " AND date <= ?"
+            params.append(end)
+        with self._lock:
+            df = pd.read_sql_query(query + " ORDER BY date", self._connect(), params=params)
+        df.columns = ['Date', 'Close', 'Return', 'Buy_Signal', 'Buy_Qty', 'Buy_Amount']
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df.set_index('Date')
+
+    def summaries(self, ticker: str = None) -> pd.DataFrame:
+        """실행별 요약 기록 (summary JSON을 펼친 표, 오래된 순)"""
+        query = "SELECT run_at, summary FROM summaries"
+        params = []
+        if ticker:
+            query += " WHERE ticker = ?"
+            params.append(ticker)
+        with self._lock:
+            rows = self._connect().execute(query + " ORDER BY run_at", params).fetchall()
+        return pd.DataFrame([{'run_at': run_at, **json.loads(summary)} for run_at, summary in rows])
+
+
+class SinkSet(ResultSink):
+    """여러 출력 대상에 같은 쓰기를 나눠 보냅니다. flush 결과는 가장 나쁜 status로 한 번 알립니다."""
+    name = "sinks"
+
+    def __init__(self, sinks: list):
+        self.sinks = list(sinks)
+
+    def get(self, name: str):
+        return next((sink for sink in self.sinks if sink.name == name), None)
+
+    def write_ticker(self, ticker, df, summary, new_rows_count=0, update_last_row=False):
+        for sink in self.sinks:
+            sink.write_ticker(ticker, df, summary, new_rows_count=new_rows_count, update_last_row=update_last_row)
+
+    def write_dashboard(self, summary_list):
+        for sink in self.sinks:
+            sink.write_dashboard(summary_list)
+
+    def flush(self, on_done=None):
+        if not self.sinks:
+            return super().flush(on_done)
+        statuses = []
+        lock = threading.Lock()
+
+        def collect(status):
+            with lock:
+                statuses.append(status)
+                done = len(statuses) == len(self.sinks)
+            if done and on_done:
+                on_done(next(s for s in STATUS_ORDER if s in statuses))
+
+        for sink in self.sinks:
+            try:
+                sink.flush(on_done=collect)
+            except Exception as e:
+                print(f"Error flushing {sink.name} results: {e}")
+                collect("failed")
+
+    def drain(self) -> int:
+        return sum(sink.drain() for sink in self.sinks)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def _json_default(value):
+    """요약 dict의 NumPy 스칼라를 JSON 값으로 바꿉니다."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def sink_names(names: str = None) -> list:
+    """RESULT_SINKS(쉼표 구분: sheets, sqlite)의 출력 대상 이름 목록"""
+    names = [name.strip() for name in (settings.RESULT_SINKS if names is None else names).split(",") if name.strip()]
+    unknown = set(names) - {"sheets", "sqlite"}
+    if unknown:
+        raise ValueError(f"unknown RESULT_SINKS: {', '.join(sorted(unknown))}")
+    return names
+
+
+def build_sinks(sheets=None, names: str = None) -> SinkSet:
+    """
+    RESULT_SINKS에 따라 출력 대상을 만듭니다.
+    sheets가 None이면(인증 정보 없음 등) 시트 출력은 빠집니다.
+    """
+    sinks = []
+    for name in sink_names(names):
+        if name == "sheets" and sheets is not None:
+            history_rows = settings.SHEETS_HISTORY_ROWS
+            if history_rows and not settings.PRICE_CACHE_ENABLED:
+                # 가격 캐시가 없으면 시트의 상세 내역이 이력 원본이므로 잘라내지 않습니다.
+                print("Warning: SHEETS_HISTORY_ROWS requires PRICE_CACHE_ENABLED; keeping the full history in Sheets.")
+                history_rows = 0
+            sinks.append(SheetsSink(sheets, history_rows))
+        elif name == "sqlite":
+            sinks.append(SQLiteSink())
+    return SinkSet(sinks)
@@ -0,0 +1,164 @@
+# src/strategy.py
+"""
+경로 의존 전략(σ 단계별 분할 매수, 익절/손절, 최대 보유 수량, 현금 한도)의 봉 단위 상태 머신.
+보유 수량/평균 단가/현금이 이전 봉의 결과에 따라 달라지므로 마스크 연산으로는 표현할 수 없어
+순차 루프로 계산하고, numba가 설치되어 있으면 JIT 컴파일해 실행합니다 (없으면 같은 코드를 파이썬으로 실행).
+루프 안에서는 NumPy 배열과 숫자만 다룹니다.
+"""
+import numpy as np
+from config import settings
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# 봉별 거래 코드 (simulate의 actions 배열)
+ACTION_NONE, ACTION_BUY, ACTION_TAKE_PROFIT, ACTION_STOP_LOSS = 0, 1, 2, 3
+ACTION_LABELS = ("", "매수", "익절", "손절")
+# simulate 반환 값 순서
+RESULT_FIELDS = ("buy_count", "sell_count", "bought", "sold", "position", "avg_cost", "peak_outlay")
+
+JIT_ENABLED = njit is not None and settings.STRATEGY_JIT
+
+
+def _jit(fn):
+    return njit(cache=True, nogil=True)(fn) if JIT_ENABLED else fn
+
+
+@_jit
+def simulate(close, returns, std, sigma, qty1, qty2, qty3, take_profit, stop_loss, max_position, cash,
+             actions, positions):
+    """
+    한 경로를 봉 순서대로 시뮬레이션합니다.
+    - 청산: 보유 중이면 종가 기준 평균 단가 대비 수익률이 take_profit 이상(익절) 또는 -stop_loss 이하(손절)일 때 전량 매도
+    - 매수: 청산하지 않은 봉에서 등락률 < -k × sigma × std[i] 이면 k단계(3 > 2 > 1) 수량만큼 매수 (첫 봉 제외)
+    - 한도: max_position(최대 보유 수량), cash(초기 현금, 매수 시 차감·매도 시 환입)으로 수량을 줄입니다.
+    take_profit/stop_loss/max_position/cash가 0이면 해당 규칙을 쓰지 않습니다.
+    actions/positions 배열이 비어 있지 않으면 봉별 거래 코드와 보유 수량을 기록합니다.
+    반환: RESULT_FIELDS 순서의 tuple
+    """
+    n = close.shape[0]
+    trace = actions.shape[0] == n
+    position = 0
+    avg_cost = 0.0
+    bought = 0.0
+    sold = 0.0
+    buy_count = 0
+    sell_count = 0
+    available = cash
+    outlay = 0.0
+    peak_outlay = 0.0
+
+    for i in range(n):
+        price = close[i]
+        action = ACTION_NONE
+        if position > 0:
+            gain = price / avg_cost - 1.0
+            if take_profit > 0 and gain >= take_profit:
+                action = ACTION_TAKE_PROFIT
+            elif stop_loss > 0 and gain <= -stop_loss:
+                action = ACTION_STOP_LOSS
+            if action != ACTION_NONE:
+                proceeds = position * price
+                sold += proceeds
+                available += proceeds
+                outlay -= proceeds
+                sell_count += 1
+                position = 0
+                avg_cost = 0.0
+
+        if action == ACTION_NONE and i > 0:
+            # NaN 등락률/표준편차는 비교가 모두 False라 매수하지 않습니다.
+            level = sigma * std[i]
+            ret = returns[i]
+            qty = 0
+            if ret < -3.0 * level:
+                qty = qty3
+            elif ret < -2.0 * level:
+                qty = qty2
+            elif ret < -level:
+                qty = qty1
+            if max_position > 0 and position + qty > max_position:
+                qty = max_position - position
+            if cash > 0 and qty * price > available:
+                qty = int(available // price)
+            if qty > 0:
+                amount = qty * price
+                avg_cost = (avg_cost * position + amount) / (position + qty)
+                position += qty
+                bought += amount
+                available -= amount
+                outlay += amount
+                if outlay > peak_outlay:
+                    peak_outlay = outlay
+                buy_count += 1
+                action = ACTION_BUY
+
+        if trace:
+            actions[i] = action
+            positions[i] = position
+
+    return buy_count, sell_count, bought, sold, position, avg_cost, peak_outlay
+
+
+@_jit
+def simulate_grid(close, returns, std_rows, sigmas, take_profits, stop_losses, qty1, qty2, qty3,
+                  max_position, cash, out):
+    """
+    (std 행, sigma, take_profit, stop_loss) 조합 전체를 시뮬레이션해 out[l, s, t, k, :]에 RESULT_FIELDS를 씁니다.
+    std_rows: (L, 봉 수) 등락률 표준편차 (ParameterSweep.rolling_std_matrix)
+    """
+    empty_actions = np.empty(0, dtype=np.int8)
+    empty_positions = np.empty(0, dtype=np.int64)
+    for l in range(std_rows.shape[0]):
+        for s in range(sigmas.shape[0]):
+            for t in range(take_profits.shape[0]):
+                for k in range(stop_losses.shape[0]):
+                    buy_count, sell_count, bought, sold, position, avg_cost, peak_outlay = simulate(
+                        close, returns, std_rows[l], sigmas[s], qty1, qty2, qty3,
+                        take_profits[t], stop_losses[k], max_position, cash, empty_actions, empty_positions
+                    )
+                    row = out[l, s, t, k]
+                    row[0] = buy_count
+                    row[1] = sell_count
+                    row[2] = bought
+                    row[3] = sold
+                    row[4] = position
+                    row[5] = avg_cost
+                    row[6] = peak_outlay
+    return out
+
+
+def strategy_params(params: dict = None) -> dict:
+    """settings.STRATEGY 기본값에 params를 덮어쓴 전략 설정"""
+    merged = dict(settings.STRATEGY)
+    merged.update(params or {})
+    return merged
+
+
+def run(close: np.ndarray, returns: np.ndarray, std: np.ndarray, params: dict = None, sigma: float = 1.0,
+        trace: bool = True) -> tuple:
+    """
+    simulate를 설정 dict로 호출하는 진입점.
+    반환: (결과 dict, 봉별 거래 코드 배열, 봉별 보유 수량 배열) - trace=False면 배열은 None
+    """
+    p = strategy_params(params)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    std = np.ascontiguousarray(np.broadcast_to(np.asarray(std, dtype=np.float64), close.shape))
+    n = len(close) if trace else 0
+    actions = np.zeros(n, dtype=np.int8)
+    positions = np.zeros(n, dtype=np.int64)
+    values = simulate(
+        close, returns, std, float(sigma), int(p["QTY_LEVEL_1"]), int(p["QTY_LEVEL_2"]), int(p["QTY_LEVEL_3"]),
+        float(p["TAKE_PROFIT"]), float(p["STOP_LOSS"]), int(p["MAX_POSITION"]), float(p["CASH"]), actions, positions
+    )
+    # 파이썬으로 실행하면 NumPy 스칼라가 섞이므로 파이썬 숫자로 맞춥니다.
+    result = {field: (int(value) if field in ("buy_count", "sell_count", "position") else float(value))
+              for field, value in zip(RESULT_FIELDS, values)}
+    last_close = float(close[-1]) if len(close) else 0.0
+    result["final_value"] = result["position"] * last_close
+    result["profit"] = result["sold"] + result["final_value"] - result["bought"]
+    result["roi"] = result["profit"] / result["bought"] if result["bought"] > 0 else 0.0
+    return result, (actions if trace else None), (positions if trace else None)
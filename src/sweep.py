@@ -0,0 +1,264 @@
+# src/sweep.py
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from config import settings
+from src.analyzer import MarketAnalyzer
+from src.universe import Universe
+
+# 한 번에 만들 (lookback, sigma, bar) 3차원 배열의 최대 원소 수 (메모리 상한)
+CHUNK_ELEMENTS = 4_000_000
+
+
+class ParameterSweep:
+    """
+    lookback × sigma 배수 × 매수 수량 조합 전체에 대해 σ 하락 매수 백테스트를 한 번에 평가합니다.
+    매수 조건은 run_backtest와 같습니다: 당일 등락률 < -(sigma × 등락률 표준편차)
+    - lookback > 0: 최근 lookback개 등락률의 이동 표준편차 (calculate_statistics의 Vol_Std)
+    - lookback == 0: 전체 기간 표준편차 (main.py의 현재 방식)
+    """
+
+    @staticmethod
+    def rolling_std_matrix(returns: np.ndarray, lookbacks: np.ndarray) -> np.ndarray:
+        """
+        누적합 기반 이동 표준편차를 (lookback 수, bar 수) 2차원 배열로 계산합니다.
+        정밀도 손실을 줄이기 위해 전체 평균을 뺀 값으로 누적합을 구합니다.
+        윈도우에 NaN이 있으면 (pandas rolling과 같이) NaN입니다.
+        """
+        valid = ~np.isnan(returns)
+        centered = np.where(valid, returns - np.nanmean(returns), 0.0)
+
+        zero = np.zeros(1)
+        s1 = np.concatenate([zero, np.cumsum(centered)])
+        s2 = np.concatenate([zero, np.cumsum(centered * centered)])
+        cnt = np.concatenate([zero, np.cumsum(valid)])
+
+        n_bars = len(returns)
+        result = np.full((len(lookbacks), n_bars), np.nan)
+        overall = np.nanstd(returns, ddof=1) if valid.sum() > 1 else np.nan
+        for row, lookback in enumerate(lookbacks):
+            if lookback == 0:
+                result[row] = overall
+                continue
+            if lookback < 2 or lookback > n_bars:
+                continue
+            end = np.arange(lookback, n_bars + 1)
+            total = s1[end] - s1[end - lookback]
+            total_sq = s2[end] - s2[end - lookback]
+            count = cnt[end] - cnt[end - lookback]
+            var = (total_sq - total * total / lookback) / (lookback - 1)
+            std = np.sqrt(np.maximum(var, 0.0))
+            result[row, lookback - 1:] = np.where(count == lookback, std, np.nan)
+        return result
+
+    @staticmethod
+    def evaluate(ticker: str, close: np.ndarray, lookbacks, sigmas, quantities) -> pd.DataFrame:
+        """한 종목의 전체 조합을 평가합니다. 반환: 조합별 결과 DataFrame"""
+        close = np.asarray(close, dtype=np.float64)
+        lookbacks = np.asarray(lookbacks, dtype=np.int64)
+        sigmas = np.asarray(sigmas, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.int64)
+        n_bars = len(close)
+        if n_bars < 2:
+            return pd.DataFrame()
+
+        returns = np.empty(n_bars)
+        returns[0] = np.nan
+        returns[1:] = close[1:] / close[:-1] - 1
+        std = ParameterSweep.rolling_std_matrix(returns, lookbacks)
+
+        buy_count = np.zeros((len(lookbacks), len(sigmas)), dtype=np.int64)
+        unit_invest = np.zeros((len(lookbacks), len(sigmas)))
+        drawdown = np.zeros((len(lookbacks), len(sigmas)))
+
+        # lookback 축을 메모리 상한에 맞춰 나눠 (L, S, T) 배열로 한 번에 계산
+        step = max(1, CHUNK_ELEMENTS // max(1, len(sigmas) * n_bars))
+        for start in range(0, len(lookbacks), step):
+            rows = slice(start, start + step)
+            threshold = -sigmas[None, :, None] * std[rows, None, :]
+            mask = returns[None, None, :] < threshold
+            mask[..., 0] = False
+
+            cum_qty = np.cumsum(mask, axis=-1)
+            cum_invest = np.cumsum(mask * close, axis=-1)
+            buy_count[rows] = cum_qty[..., -1]
+            unit_invest[rows] = cum_invest[..., -1]
+            drawdown[rows] = MarketAnalyzer.max_drawdown(close, cum_qty, cum_invest)
+
+        # 수량은 선형으로만 영향을 주므로 브로드캐스팅으로 확장합니다 (ROI/MDD는 수량과 무관)
+        last_close = close[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi = np.where(unit_invest > 0, buy_count * last_close / unit_invest - 1, 0.0)
+
+        grid_l, grid_s, grid_q = np.meshgrid(np.arange(len(lookbacks)), np.arange(len(sigmas)), quantities, indexing='ij')
+        grid_l, grid_s, grid_q = grid_l.ravel(), grid_s.ravel(), grid_q.ravel()
+        invested = unit_invest[grid_l, grid_s] * grid_q
+        shares = buy_count[grid_l, grid_s] * grid_q
+        return pd.DataFrame({
+            'ticker': ticker,
+            'lookback': lookbacks[grid_l],
+            'sigma': sigmas[grid_s],
+            'quantity': grid_q,
+            'roi': roi[grid_l, grid_s],
+            'buy_count': buy_count[grid_l, grid_s],
+            'invested': invested,
+            'final_value': shares * last_close,
+            'max_drawdown': drawdown[grid_l, grid_s],
+        })
+
+    @staticmethod
+    def evaluate_strategy(ticker: str, close: np.ndarray, lookbacks, sigmas, take_profits, stop_losses,
+                          params: dict = None) -> pd.DataFrame:
+        """
+        lookback × sigma × 익절 × 손절 조합을 경로 의존 전략 커널(src/strategy.simulate_grid)로 평가합니다.
+        단계별 수량, 최대 보유 수량, 현금 한도는 params(기본: settings.STRATEGY)를 따릅니다.
+        """
+        from src import strategy
+
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        lookbacks = np.asarray(lookbacks, dtype=np.int64)
+        sigmas = np.asarray(sigmas, dtype=np.float64)
+        take_profits = np.asarray(take_profits, dtype=np.float64)
+        stop_losses = np.asarray(stop_losses, dtype=np.float64)
+        if len(close) < 2:
+            return pd.DataFrame()
+
+        returns = np.empty(len(close))
+        returns[0] = np.nan
+        returns[1:] = close[1:] / close[:-1] - 1
+        std = np.ascontiguousarray(ParameterSweep.rolling_std_matrix(returns, lookbacks))
+
+        p = strategy.strategy_params(params)
+        shape = (len(lookbacks), len(sigmas), len(take_profits), len(stop_losses))
+        out = np.zeros(shape + (len(strategy.RESULT_FIELDS),))
+        strategy.simulate_grid(
+            close, returns, std, sigmas, take_profits, stop_losses,
+            int(p["QTY_LEVEL_1"]), int(p["QTY_LEVEL_2"]), int(p["QTY_LEVEL_3"]),
+            int(p["MAX_POSITION"]), float(p["CASH"]), out
+        )
+
+        fields = {field: out[..., i].ravel() for i, field in enumerate(strategy.RESULT_FIELDS)}
+        final_value = fields["position"] * close[-1]
+        profit = fields["sold"] + final_value - fields["bought"]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi = np.where(fields["bought"] > 0, profit / fields["bought"], 0.0)
+        grid = np.meshgrid(lookbacks, sigmas, take_profits, stop_losses, indexing='ij')
+        return pd.DataFrame({
+            'ticker': ticker,
+            'lookback': grid[0].ravel(),
+            'sigma': grid[1].ravel(),
+            'take_profit': grid[2].ravel(),
+            'stop_loss': grid[3].ravel(),
+            'roi': roi,
+            'profit': profit,
+            'buy_count': fields["buy_count"].astype(np.int64),
+            'sell_count': fields["sell_count"].astype(np.int64),
+            'invested': fields["bought"],
+            'peak_outlay': fields["peak_outlay"],
+            'final_value': final_value,
+        })
+
+    @staticmethod
+    def run(prices: dict, lookbacks, sigmas, quantities=(100,), processes: int = 1,
+            take_profits=None, stop_losses=None) -> pd.DataFrame:
+        """
+        여러 종목의 그리드를 평가하고 ROI 순으로 정렬한 표를 반환합니다.
+        take_profits/stop_losses가 주어지면 경로 의존 전략 커널로 평가합니다 (quantities 대신 settings.STRATEGY 수량).
+        processes > 1이면 종목 단위로 프로세스 풀에 나눠 실행합니다.
+        """
+        use_strategy = take_profits is not None or stop_losses is not None
+        if use_strategy:
+            fn = ParameterSweep.evaluate_strategy
+            extra = (take_profits if take_profits is not None else [0.0], stop_losses if stop_losses is not None else [0.0])
+        else:
+            fn = ParameterSweep.evaluate
+            extra = (quantities,)
+        tasks = [
+            (ticker, close.to_numpy() if isinstance(close, pd.Series) else close, lookbacks, sigmas, *extra)
+            for ticker, close in prices.items()
+        ]
+        if processes > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                frames = list(executor.map(fn, *zip(*tasks)))
+        else:
+            frames = [fn(*task) for task in tasks]
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        table = pd.concat(frames, ignore_index=True)
+        if use_strategy:
+            return table.sort_values(['roi', 'peak_outlay'], ascending=[False, True], ignore_index=True)
+        return table.sort_values(['roi', 'max_drawdown'], ascending=[False, True], ignore_index=True)
+
+
+def _parse_values(text: str, cast) -> np.ndarray:
+    """'1,2,3' 또는 'start:stop:step'(stop 포함) 항목을 쉼표로 이어 붙인 형식을 배열로 변환합니다."""
+    values = []
+    for part in text.split(","):
+        if ":" in part:
+            start, stop, step = (cast(item) for item in part.split(":"))
+            values.extend(cast(value) for value in np.arange(start, stop + step / 2, step))
+        else:
+            values.append(cast(part))
+    return np.array(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="σ 하락 매수 전략 파라미터 스윕")
+    parser.add_argument("--tickers", default=None, help="쉼표 구분 (기본: 종목 목록 파일 또는 settings.TICKERS)")
+    parser.add_argument("--start", default=None, help="분석 시작일 (YYYY-MM-DD, 기본: 캐시 전체)")
+    parser.add_argument("--lookbacks", default="0,20:504:4", help="0은 전체 기간 표준편차")
+    parser.add_argument("--sigmas", default="0.5:3.0:0.1")
+    parser.add_argument("--quantities", default="100")
+    parser.add_argument("--take-profits", default=None, help="익절 수익률 목록 (예: 0,0.1:0.5:0.1). 주면 전략 커널로 평가")
+    parser.add_argument("--stop-losses", default=None, help="손절 손실률 목록 (예: 0,0.2,0.3). 주면 전략 커널로 평가")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None, help="전체 결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    from src.data_fetcher import DataFetcher
+    from src.price_cache import PriceCache
+
+    tickers = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()] if args.tickers else Universe.load()[0]
+    lookbacks = _parse_values(args.lookbacks, int)
+    sigmas = np.round(_parse_values(args.sigmas, float), 6)
+    quantities = _parse_values(args.quantities, int)
+    take_profits = np.round(_parse_values(args.take_profits, float), 6) if args.take_profits else None
+    stop_losses = np.round(_parse_values(args.stop_losses, float), 6) if args.stop_losses else None
+
+    history = DataFetcher.get_many_cached(tickers, PriceCache(), period="max")
+    prices = {}
+    for ticker, df in history.items():
+        if df.empty:
+            continue
+        close = df['Close'].loc[args.start:] if args.start else df['Close']
+        prices[ticker] = close.dropna()
+
+    started = time.perf_counter()
+    table = ParameterSweep.run(
+        prices, lookbacks, sigmas, quantities, processes=args.processes,
+        take_profits=take_profits, stop_losses=stop_losses
+    )
+    elapsed = time.perf_counter() - started
+
+    if take_profits is not None or stop_losses is not None:
+        combos = len(table)
+    else:
+        combos = len(lookbacks) * len(sigmas) * len(quantities) * len(prices)
+    print(f"{combos} combinations ({len(prices)} tickers) evaluated in {elapsed:.2f}s")
+    if table.empty:
+        return
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(table.head(args.top).to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
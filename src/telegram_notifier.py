@@ -1,83 +1,197 @@
 # src/telegram_notifier.py
 import os
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from src.metrics import metrics
+
+# 텔레그램 메시지 최대 길이 (문자 수)
+MAX_MESSAGE_LENGTH = 4096
+
 
 class TelegramNotifier:
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id, ticker_names: dict = None):
+        from config import settings
+
         self.bot_token = bot_token
-        self.chat_id = chat_id
+        # 메시지에 표시할 종목명 (Universe.load가 돌려준 표, 기본: settings.TICKER_NAMES)
+        self.ticker_names = settings.TICKER_NAMES if ticker_names is None else ticker_names
+        # 여러 채팅방으로 보낼 수 있도록 쉼표로 구분된 문자열 또는 리스트를 받습니다.
+        if isinstance(chat_id, str):
+            chat_id = [part.strip() for part in chat_id.split(",") if part.strip()]
+        self.chat_ids = list(chat_id)
+        self.chat_id = self.chat_ids[0] if self.chat_ids else None
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
-    
-    def send_message(self, message: str) -> bool:
-        """텔레그램으로 메시지 전송"""
+        self.timeout = settings.TELEGRAM_TIMEOUT
+        self.max_retries = settings.TELEGRAM_MAX_RETRIES
+
+        # keep-alive 연결을 재사용하는 세션 (채팅방 수만큼 동시 연결)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(4, len(self.chat_ids)))
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.chat_ids)), thread_name_prefix="telegram")
+        # send_messages_async 전용 (채팅방별 전송 풀을 점유하지 않도록 분리)
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telegram-bg")
+
+    def _post(self, chat_id: str, text: str) -> bool:
+        """한 채팅방에 메시지 하나를 보냅니다. 429는 retry_after만큼, 5xx/네트워크 오류는 지수 백오프로 재시도합니다."""
+        url = f"{self.base_url}/sendMessage"
+        payload = {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": "HTML"
+        }
+        with metrics.timer("telegram.send_message") as record:
+            record.bytes = len(text.encode("utf-8"))
+            for attempt in range(self.max_retries + 1):
+                record.retries = attempt
+                delay = min(2 ** attempt, 30)
+                try:
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+                except requests.RequestException as e:
+                    print(f"Telegram 전송 실패: {e}")
+                else:
+                    if response.status_code == 200:
+                        return True
+                    if response.status_code == 429:
+                        try:
+                            delay = float(response.json().get("parameters", {}).get("retry_after", delay))
+                        except ValueError:
+                            pass
+                    elif response.status_code < 500:
+                        print(f"Telegram 전송 실패: HTTP {response.status_code} {response.text[:200]}")
+                        return False
+                if attempt < self.max_retries:
+                    time.sleep(delay)
+        return False
+
+    def _send_chunks(self, chat_id: str, chunks: list) -> bool:
+        # 같은 채팅방에서는 순서를 지키기 위해 순차 전송
+        return all([self._post(chat_id, chunk) for chunk in chunks])
+
+    def send_messages(self, chunks: list) -> bool:
+        """메시지 조각들을 모든 채팅방에 동시에 보냅니다. 모두 성공하면 True"""
         try:
-            url = f"{self.base_url}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            }
-            response = requests.post(url, json=payload)
-            return response.status_code == 200
+            futures = [self._executor.submit(self._send_chunks, chat_id, chunks) for chat_id in self.chat_ids]
+            return all([future.result() for future in futures])
         except Exception as e:
             print(f"Telegram 전송 실패: {e}")
             return False
-    
-    def format_summary(self, summary_list: list) -> str:
-        """분석 결과를 텔레그램 메시지로 포맷팅"""
-        from config import settings
-        
+
+    def send_messages_async(self, chunks: list):
+        """백그라운드에서 전송을 시작하고 Future(결과: bool)를 반환합니다."""
+        return self._background.submit(self.send_messages, chunks)
+
+    def send_message(self, message: str) -> bool:
+        """텔레그램으로 메시지 전송 (길이 제한을 넘으면 줄 단위로 나눠 전송)"""
+        return self.send_messages(self._split_text(message))
+
+    @staticmethod
+    def _split_text(message: str, limit: int = MAX_MESSAGE_LENGTH) -> list:
+        chunks, current = [], ""
+        for line in message.split("\n"):
+            while len(line) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:limit])
+                line = line[limit:]
+            candidate = f"{current}\n{line}" if current else line
+            if len(candidate) > limit:
+                chunks.append(current)
+                candidate = line
+            current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def close(self):
+        self._background.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _summary_sections(self, summary_list: list):
+        """(헤더 줄 목록, [(섹션 제목, 종목별 블록 목록)])"""
         today = datetime.now().strftime('%Y-%m-%d')
-        lines = [f"📊 <b>Stock Analysis Report</b>", f"📅 {today}", ""]
-        
+        header = [f"📊 <b>Stock Analysis Report</b>", f"📅 {today}", ""]
+
         buy_signals = []
         watch_signals = []
-        
+
         for item in summary_list:
             ticker = item['ticker']
-            ticker_name = settings.TICKER_NAMES.get(ticker, ticker)
+            ticker_name = self.ticker_names.get(ticker, ticker)
             current_price = item['current_price']
-            
+
             # 매수가 계산
             buy_price_1 = current_price * (1 + item['s1'])
             buy_price_2 = current_price * (1 + item['s2'])
             buy_price_3 = current_price * (1 + item['s3'])
-            
+
             # Signal 판단 (1σ 기준)
             is_buy = current_price <= buy_price_1
             signal = "🟢 매수" if is_buy else "⚪ 관망"
-            
+
             line = (
                 f"<b>{ticker}</b> ({ticker_name})\n"
                 f"  현재가: ${current_price:.2f}({item['daily_change']*100:+.2f}%)\n"
                 f"  1σ: ${buy_price_1:.2f} | 2σ: ${buy_price_2:.2f} | 3σ: ${buy_price_3:.2f}\n"
                 f"  Signal: {signal}"
             )
-            
+
             if is_buy:
                 buy_signals.append(line)
             else:
                 watch_signals.append(line)
-        
+
         # 매수 신호 먼저 표시
+        sections = []
         if buy_signals:
-            lines.append("🚨 <b>매수 신호</b>")
-            lines.extend(buy_signals)
-            lines.append("")
-        
+            sections.append(("🚨 <b>매수 신호</b>", buy_signals))
         if watch_signals:
-            lines.append("👀 <b>관망</b>")
-            lines.extend(watch_signals)
-        
+            sections.append(("👀 <b>관망</b>", watch_signals))
+        return header, sections
+
+    def format_summary(self, summary_list: list) -> str:
+        """분석 결과를 텔레그램 메시지로 포맷팅"""
+        header, sections = self._summary_sections(summary_list)
+        lines = list(header)
+        for i, (title, blocks) in enumerate(sections):
+            lines.append(title)
+            lines.extend(blocks)
+            if i < len(sections) - 1:
+                lines.append("")
         return "\n".join(lines)
 
+    def format_summary_chunks(self, summary_list: list, limit: int = MAX_MESSAGE_LENGTH) -> list:
+        """
+        format_summary와 같은 내용을 종목 경계에서 나눠 limit 이하의 메시지 목록으로 반환합니다.
+        이어지는 메시지에는 섹션 제목을 다시 붙입니다.
+        """
+        header, sections = self._summary_sections(summary_list)
+        chunks = []
+        current = "\n".join(header)
+        for i, (title, blocks) in enumerate(sections):
+            separator = "\n\n" if i > 0 else "\n"
+            for j, block in enumerate(blocks):
+                addition = f"{separator}{title}\n{block}" if j == 0 else f"\n{block}"
+                if current and len(current) + len(addition) > limit:
+                    chunks.append(current)
+                    current = f"{title} (계속)\n{block}" if j > 0 else f"{title}\n{block}"
+                else:
+                    current += addition
+        if current:
+            chunks.append(current)
+        return chunks
+
 
-def get_telegram_notifier():
-    """환경변수에서 텔레그램 설정 로드"""
+def get_telegram_notifier(ticker_names: dict = None):
+    """환경변수에서 텔레그램 설정 로드 (TELEGRAM_CHAT_ID는 쉼표로 여러 개 지정 가능)"""
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    
+
     if bot_token and chat_id:
-        return TelegramNotifier(bot_token, chat_id)
+        return TelegramNotifier(bot_token, chat_id, ticker_names)
     return None
@@ -0,0 +1,52 @@
+# src/universe.py
+import zlib
+
+from config import settings
+
+
+class Universe:
+    @staticmethod
+    def load(path: str = None) -> tuple:
+        """
+        분석 대상 종목 목록과 종목명 표를 반환합니다: (티커 목록, {티커: 종목명})
+        path(기본: settings.UNIVERSE_FILE)가 없으면 settings.TICKERS를 그대로 사용합니다.
+        파일 형식: 한 줄에 한 종목, "티커" 또는 "티커,종목명" (빈 줄과 #으로 시작하는 줄은 무시)
+        종목명 표는 settings.TICKER_NAMES의 사본에 파일의 종목명을 더한 것으로, 설정은 바꾸지 않습니다.
+        """
+        names = dict(settings.TICKER_NAMES)
+        path = path or settings.UNIVERSE_FILE
+        if not path:
+            return list(settings.TICKERS), names
+
+        tickers = []
+        seen = set()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                ticker, _, name = line.partition(",")
+                ticker = ticker.strip().upper()
+                if ticker in seen:
+                    continue
+                seen.add(ticker)
+                tickers.append(ticker)
+                if name.strip():
+                    names[ticker] = name.strip()
+        return tickers, names
+
+    @staticmethod
+    def shard(tickers: list, index: int, count: int) -> list:
+        """
+        종목을 count개 샤드로 나눈 뒤 index번째 샤드를 반환합니다 (0부터 시작).
+        티커 문자열의 CRC32로 나누므로 목록에 종목이 추가/삭제되어도 나머지 종목의 샤드는 바뀌지 않습니다.
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"shard index {index} out of range for {count} shards")
+        return [ticker for ticker in tickers if zlib.crc32(ticker.encode("utf-8")) % count == index]
+
+    @staticmethod
+    def parse_shard(text: str) -> tuple:
+        """'1/4' -> (0, 4)  (명령줄에서는 1부터 셉니다)"""
+        number, _, count = text.partition("/")
+        return int(number) - 1, int(count)
@@ -0,0 +1,168 @@
+# src/watch.py
+"""
+장중 감시 데몬.
+세션 시작 시 종목별 매수 트리거 가격(σ 하락 1~3단계, Z-Score 목표가 1~3단계)을 (종목 수, 6) 배열로 한 번 계산하고,
+설정된 간격마다 시세를 일괄 조회해 모든 종목을 벡터 연산 한 번으로 비교합니다.
+상태는 고정 크기 배열뿐이라 하루 종일 실행해도 메모리가 늘지 않습니다.
+
+실행: python -m src.watch [--tickers SOXL,TQQQ] [--interval 60] [--until 16:00] [--max-ticks N]
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+from config import settings
+from src.metrics import metrics
+from src.signals import SignalScanner
+from src.universe import Universe
+
+LEVEL_NAMES = ("1σ 하락", "2σ 하락", "3σ 하락", "Z -1", "Z -2", "Z -3")
+
+
+class TriggerIndex:
+    """
+    종목별 트리거 가격 배열과 알림 상태(히스테리시스/쿨다운)를 담는 인덱스.
+    - σ 하락 k단계: 전일 종가 × (1 + s_k)  (update_dashboard의 current_price × (1 + s1) 규칙,
+      s_k는 일일 실행과 같은 전체 기간 등락률 표준편차 기준 - SignalScanner.overall_stds)
+    - Z 목표가 k단계: SMA + Z_k × STD     (MarketAnalyzer.get_target_price)
+    """
+
+    def __init__(self, tickers: list, prev_close: np.ndarray, triggers: np.ndarray, session: str):
+        self.tickers = list(tickers)
+        self.session = session
+        self.prev_close = np.asarray(prev_close, dtype=np.float64)
+        # 계산할 수 없는 트리거(0 이하)는 NaN으로 두어 비교에서 항상 False가 되도록 합니다.
+        triggers = np.asarray(triggers, dtype=np.float64)
+        self.triggers = np.where(triggers > 0, triggers, np.nan)
+        # 알림 후 가격이 트리거 × (1 + WATCH_REARM_PCT) 위로 회복해야 다시 알립니다.
+        self.rearm = self.triggers * (1 + settings.WATCH_REARM_PCT)
+        self.armed = np.ones(self.triggers.shape, dtype=bool)
+        self.last_alert = np.full(self.triggers.shape, -np.inf)
+
+    @staticmethod
+    def build(tickers: list, price_cache=None, window: int = None, session: str = None) -> "TriggerIndex":
+        """전일까지의 종가로 트리거 가격을 계산합니다. 오늘 날짜의 장중 봉은 제외합니다."""
+        window = window or settings.LOOKBACK_PERIOD
+        session = session or datetime.now().strftime('%Y-%m-%d')
+        closes = SignalScanner.load_closes(tickers, window + 1, price_cache)
+        stds = SignalScanner.overall_stds(list(closes), price_cache, before=session)
+
+        rows = []
+        for ticker in tickers:
+            close = closes.get(ticker)
+            if close is None:
+                continue
+            close = close[close.index.strftime('%Y-%m-%d') < session].iloc[-(window + 1):]
+            summary = SignalScanner.compute(ticker, close, window, settings.THRESHOLDS, stds[ticker])
+            if summary:
+                rows.append(summary)
+
+        prev_close = np.array([item['current_price'] for item in rows])
+        triggers = np.array([
+            [item['current_price'] * (1 + item[key]) for key in ('s1', 's2', 's3')]
+            + [item[key] for key in ('target_1', 'target_2', 'target_3')]
+            for item in rows
+        ]).reshape(len(rows), len(LEVEL_NAMES))
+        return TriggerIndex([item['ticker'] for item in rows], prev_close, triggers, session)
+
+    def evaluate(self, prices: np.ndarray, now: float = None) -> np.ndarray:
+        """
+        현재가 배열로 모든 종목/단계를 한 번에 비교해 새로 알릴 (종목, 단계) 마스크를 반환합니다.
+        NaN 가격(조회 실패)은 상태를 바꾸지 않습니다.
+        """
+        now = time.monotonic() if now is None else now
+        price = np.asarray(prices, dtype=np.float64)[:, None]
+        crossed = price <= self.triggers
+        fire = crossed & self.armed & (now - self.last_alert >= settings.WATCH_COOLDOWN_SEC)
+        self.armed &= ~fire
+        self.armed |= price > self.rearm
+        self.last_alert[fire] = now
+        return fire
+
+    def format_alerts(self, fire: np.ndarray, prices: np.ndarray, ticker_names: dict = None) -> str:
+        """알림 마스크를 텔레그램 메시지로 만듭니다 (종목별 가장 깊은 단계까지 한 줄, 종목명 기본: settings.TICKER_NAMES)."""
+        ticker_names = settings.TICKER_NAMES if ticker_names is None else ticker_names
+        lines = [f"⏰ <b>장중 매수 알림</b> {datetime.now():%H:%M}"]
+        for row in np.flatnonzero(fire.any(axis=1)):
+            ticker = self.tickers[row]
+            ticker_name = ticker_names.get(ticker, ticker)
+            change = prices[row] / self.prev_close[row] - 1
+            levels = ", ".join(
+                f"{LEVEL_NAMES[col]} ${self.triggers[row, col]:.2f}" for col in np.flatnonzero(fire[row])
+            )
+            lines.append(f"<b>{ticker}</b> ({ticker_name}) ${prices[row]:.2f}({change*100:+.2f}%)\n  {levels}")
+        return "\n".join(lines)
+
+
+def run(tickers: list, interval: float, until: str = None, max_ticks: int = None, notify: bool = True,
+        ticker_names: dict = None):
+    """until(HH:MM) 또는 max_ticks까지 interval초마다 시세를 조회하고 알림을 보냅니다."""
+    from src.data_fetcher import DataFetcher
+    from src.telegram_notifier import get_telegram_notifier
+
+    price_cache = None
+    if settings.PRICE_CACHE_ENABLED:
+        from src.price_cache import PriceCache
+        price_cache = PriceCache()
+
+    telegram = get_telegram_notifier(ticker_names) if notify else None
+    index = None
+    ticks = 0
+    next_tick = time.monotonic()
+    try:
+        while max_ticks is None or ticks < max_ticks:
+            if until and datetime.now().strftime('%H:%M') >= until:
+                break
+            # 날짜가 바뀌면 새 세션의 트리거를 다시 계산합니다.
+            if index is None or index.session != datetime.now().strftime('%Y-%m-%d'):
+                with metrics.timer("watch.build_index"):
+                    index = TriggerIndex.build(tickers, price_cache)
+                print(f"[watch] session {index.session}: {len(index.tickers)} tickers indexed")
+
+            prices = DataFetcher.get_quotes(index.tickers)
+            with metrics.timer("watch.evaluate") as record:
+                fire = index.evaluate(prices)
+                record.rows = len(index.tickers)
+            ticks += 1
+
+            if fire.any():
+                message = index.format_alerts(fire, prices, ticker_names)
+                print(message)
+                if telegram:
+                    telegram.send_message(message)
+
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if telegram:
+            telegram.close()
+    print(f"[watch] stopped after {ticks} ticks")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="장중 트리거 가격 감시 데몬")
+    parser.add_argument("--tickers", default=None, help="쉼표 구분 (기본: 종목 목록 파일 또는 settings.TICKERS)")
+    parser.add_argument("--interval", type=float, default=settings.WATCH_INTERVAL_SEC, help="시세 조회 간격(초)")
+    parser.add_argument("--until", default=None, help="이 시각(HH:MM, 로컬)에 종료")
+    parser.add_argument("--max-ticks", type=int, default=None)
+    parser.add_argument("--no-telegram", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        tickers, ticker_names = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()], settings.TICKER_NAMES
+    else:
+        tickers, ticker_names = Universe.load()
+    metrics.reset()
+    run(tickers, args.interval, until=args.until, max_ticks=args.max_ticks, notify=not args.no_telegram,
+        ticker_names=ticker_names)
+    report_path = metrics.write_report(mode="watch", tickers=len(tickers))
+    if report_path:
+        print(f"Metrics report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# src/write_queue.py
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from config import settings
+from src.metrics import metrics
+
+# 재시도할 HTTP 상태 코드 (할당량 초과, 서버 오류)
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    분당 rate_per_min개 토큰이 일정하게 채워지는 토큰 버킷.
+    acquire()는 토큰이 생길 때까지 기다립니다 (stop이 설정되면 중단). 여러 스레드에서 함께 쓸 수 있습니다.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: float = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity or max(1.0, rate_per_min / 6)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0, stop: threading.Event = None):
+        """토큰을 가져가고, 기다린 시간(초)을 반환합니다. 기다리는 중에 stop이 설정되면 토큰 없이 None을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return None
+            waited += delay
+
+
+class WriteDeferred(Exception):
+    """기한이 지나 전송을 멈춘 요청 (파일로 저장됩니다)"""
+
+
+def status_code(error: Exception):
+    """gspread APIError/requests 예외의 HTTP 상태 코드 (없으면 None)"""
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def call_with_backoff(fn, name: str, max_retries: int = None, stop: threading.Event = None):
+    """
+    429/5xx 응답이면 지터를 더한 지수 백오프(최대 SHEETS_BACKOFF_MAX_SEC)로 재시도합니다.
+    Retry-After 헤더가 있으면 그 시간 이상 기다립니다. 그 밖의 오류는 그대로 올립니다.
+    기다리는 중에 stop이 설정되면 WriteDeferred를 올립니다.
+    """
+    max_retries = settings.SHEETS_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            code = status_code(e)
+            if code not in RETRYABLE_STATUS or attempt == max_retries:
+                raise
+            delay = min(settings.SHEETS_BACKOFF_MAX_SEC, 2 ** attempt) + random.uniform(0, 1)
+            retry_after = getattr(getattr(e, "response", None), "headers", {}).get("Retry-After")
+            if retry_after and str(retry_after).isdigit():
+                delay = max(delay, float(retry_after))
+            metrics.count(f"{name}.retry")
+            print(f"Sheets {name}: HTTP {code}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                raise WriteDeferred(name) from e
+
+
+def send_request(spreadsheet, method: str, body: dict, stop: threading.Event = None):
+    """batch_update / values_batch_update 본문 하나를 재시도와 함께 전송하고 지표를 기록합니다."""
+    with metrics.timer(f"sheets.{method}") as record:
+        if method == "batch_update":
+            record.rows = len(body["requests"])
+        else:
+            record.rows = sum(len(data["values"]) for data in body["data"])
+        record.bytes = len(json.dumps(body, default=str)) if metrics.enabled else 0
+        return call_with_backoff(lambda: getattr(spreadsheet, method)(body), method, stop=stop)
+
+
+class WriteBehindQueue:
+    """
+    시트 쓰기 요청(batch_update / values_batch_update 본문)을 백그라운드 스레드에서 차례로 전송합니다.
+    - 분당 쓰기 할당량에 맞춘 토큰 버킷으로 속도를 제한하고, 429/5xx는 지수 백오프로 재시도합니다.
+    - drain(timeout)은 큐가 비거나 기한이 지날 때까지 기다리고, 남은 요청은 SHEETS_PENDING_DIR에 저장합니다.
+    - load_pending()은 이전 실행에서 저장된 요청을 새 요청보다 먼저 보내도록 큐에 넣습니다.
+    요청마다 on_done(status) 콜백을 달 수 있습니다. status: "sent" | "persisted" | "failed"
+    """
+
+    def __init__(self, spreadsheet, limiter: TokenBucket = None, pending_dir: str = None):
+        self.spreadsheet = spreadsheet
+        self.limiter = limiter or TokenBucket(settings.SHEETS_WRITE_QUOTA_PER_MIN)
+        self.pending_dir = pending_dir or settings.SHEETS_PENDING_DIR
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        # 기한이 지나 보내지 못한 요청 (큐에 남은 요청보다 앞선 순서)
+        self._deferred = []
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, method: str, body: dict, on_done=None):
+        """method: "batch_update" 또는 "values_batch_update" """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sheets-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((method, body, on_done))
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def _send(self, method: str, body: dict):
+        # 기한이 지나면 토큰을 기다리지 않고 바로 저장 대상으로 넘깁니다 (drain이 기한을 넘기지 않도록).
+        if self._stopping.is_set() or self.limiter.acquire(stop=self._stopping) is None:
+            raise WriteDeferred(method)
+        send_request(self.spreadsheet, method, body, stop=self._stopping)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                method, body, on_done = item
+                try:
+                    self._send(method, body)
+                    status = "sent"
+                    self.sent += 1
+                except WriteDeferred:
+                    self._deferred.append(item)
+                    continue
+                except Exception as e:
+                    print(f"Error writing to Google Sheets ({method}): {e}")
+                    status = "failed"
+                    self.failed += 1
+                if on_done:
+                    on_done(status)
+            finally:
+                self._queue.task_done()
+
+    def drain(self, timeout: float = None) -> int:
+        """
+        큐가 빌 때까지 최대 timeout초(기본: SHEETS_DRAIN_TIMEOUT_SEC) 기다립니다.
+        남은 요청은 파일로 저장하고 개수를 반환합니다 (다음 실행에서 load_pending으로 다시 보냅니다).
+        """
+        timeout = settings.SHEETS_DRAIN_TIMEOUT_SEC if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+        if not self._queue.unfinished_tasks:
+            return 0
+
+        # 전송 스레드를 멈추고(전송 중인 요청은 응답까지 기다립니다) 남은 요청을 원래 순서대로 저장합니다.
+        self._stopping.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join()
+        items, self._deferred = self._deferred, []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if item is not None:
+                items.append(item)
+        self._stopping.clear()
+        self._thread = None
+        if not items:
+            return 0
+
+        path = self._persist([{"method": method, "body": body} for method, body, _ in items])
+        for _, _, on_done in items:
+            if on_done:
+                on_done("persisted")
+        print(f"Sheets: {len(items)} pending write requests saved to {path} (sent on the next run)")
+        return len(items)
+
+    def _persist(self, items: list) -> str:
+        os.makedirs(self.pending_dir, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}.json"
+        path = os.path.join(self.pending_dir, name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.pending_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(items, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def load_pending(self) -> int:
+        """
+        이전 실행에서 저장된 요청을 저장 순서대로 큐에 넣고 개수를 반환합니다.
+        파일은 이름을 바꿔 가져가므로 여러 워커가 동시에 실행돼도 한 곳에서만 다시 보냅니다.
+        """
+        if not os.path.isdir(self.pending_dir):
+            return 0
+        count = 0
+        for name in sorted(os.listdir(self.pending_dir)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.pending_dir, name)
+            taken = f"{path}.{os.getpid()}.loading"
+            try:
+                os.rename(path, taken)
+            except FileNotFoundError:
+                continue
+            with open(taken, "r", encoding="utf-8") as f:
+                items = json.load(f)
+            for item in items:
+                self.submit(item["method"], item["body"])
+            os.remove(taken)
+            count += len(items)
+        return count
@@ -0,0 +1,68 @@
+# tests/test_price_cache.py
+"""
+가격 캐시 전체 재수집(오래된 캐시, 수정주가 조정)이 분석 시작일 이전 이력을 period로 잘라내지 않는지 확인합니다.
+Yahoo 수집은 합성 시세(10년)에서 start 이후 또는 최근 5년만 돌려주는 대체 함수로 바꿔 네트워크 없이 실행합니다.
+
+실행: python -m pytest tests
+"""
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.data_fetcher import DataFetcher
+from src.price_cache import PriceCache
+from benchmarks.synthetic import make_ohlcv
+
+TICKER = "SYN0000"
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    full = DataFetcher.normalize_index(make_ohlcv(TICKER, years=10))
+    scale = {"factor": 1.0}
+
+    def get_many(tickers, start_by_ticker=None, period="5y", max_workers=None):
+        start = (start_by_ticker or {}).get(TICKER)
+        cutoff = pd.Timestamp(start) if start else full.index[-1] - pd.DateOffset(years=5)
+        df = full[full.index >= cutoff].copy()
+        df[["Open", "High", "Low", "Close"]] *= scale["factor"]
+        return {ticker: df if ticker == TICKER else pd.DataFrame() for ticker in tickers}
+
+    monkeypatch.setattr(DataFetcher, "get_many", staticmethod(get_many))
+    return full, scale
+
+
+def seven_years_ago(full: pd.DataFrame) -> str:
+    return (full.index[-1] - pd.DateOffset(years=7)).strftime('%Y-%m-%d')
+
+
+def test_first_fetch_covers_history_start(tmp_path, yahoo):
+    full, _ = yahoo
+    start = seven_years_ago(full)
+    cache = PriceCache(cache_dir=str(tmp_path))
+    df = DataFetcher.get_many_cached([TICKER], cache, history_start={TICKER: start})[TICKER]
+    assert df.index[0] <= pd.Timestamp(start) + timedelta(days=4)
+    assert cache.covers(TICKER, start)
+
+
+@pytest.mark.parametrize("reason", ["stale", "adjusted"])
+def test_full_refresh_keeps_history_before_period(tmp_path, yahoo, reason):
+    full, scale = yahoo
+    start = seven_years_ago(full)
+    cache = PriceCache(cache_dir=str(tmp_path))
+    first = DataFetcher.get_many_cached([TICKER], cache, history_start={TICKER: start})[TICKER]
+
+    if reason == "stale":
+        meta_path = tmp_path / f"{TICKER}.json"
+        meta = json.loads(meta_path.read_text())
+        meta["refreshed_at"] = (datetime.now() - timedelta(days=365)).isoformat(timespec="seconds")
+        meta_path.write_text(json.dumps(meta))
+    else:
+        scale["factor"] = 0.5  # 분할 등으로 과거 종가 전체가 바뀐 경우
+
+    refreshed = DataFetcher.get_many_cached([TICKER], cache, history_start={TICKER: start})[TICKER]
+    assert refreshed.index[0] == first.index[0]
+    assert len(refreshed) == len(first)
+    assert refreshed['Close'].iloc[0] == pytest.approx(first['Close'].iloc[0] * scale["factor"])
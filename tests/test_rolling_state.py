@@ -0,0 +1,104 @@
+# tests/test_rolling_state.py
+"""
+이동 통계 증분 갱신(STATS_INCREMENTAL)이 여러 날 이어서 실행해도 전체 재계산과 같은 결과를 내는지 확인합니다.
+가격 캐시 경로(원본 종가)와 시트에서 읽은 반올림 종가에 새 봉을 붙이는 경로를 모두 날짜별로 비교합니다.
+
+실행: python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from config import settings
+from src.analyzer import MarketAnalyzer
+from src.data_fetcher import DataFetcher
+from src.price_cache import PriceCache
+from src.rolling_state import RollingStatsState
+from benchmarks.synthetic import make_ohlcv
+
+TICKER = "SYN0000"
+DAYS = 4
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STATS_STATE_DIR", str(tmp_path / "stats"))
+    return DataFetcher.normalize_index(make_ohlcv(TICKER, years=5))
+
+
+def run_day(job: dict, price_cache, end_date: str, incremental: bool, monkeypatch) -> dict:
+    monkeypatch.setattr(settings, "STATS_INCREMENTAL", incremental)
+    return main.analyze_ticker(dict(job), price_cache, end_date)[0]
+
+
+def assert_same_summary(got: dict, want: dict):
+    for key, value in want.items():
+        if isinstance(value, float):
+            assert got[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+        else:
+            assert got[key] == value, key
+
+
+@pytest.mark.parametrize("source", ["price_cache", "sheet"])
+def test_multi_day_incremental_matches_full_recompute(history, tmp_path, monkeypatch, source):
+    """
+    price_cache: 매일 캐시의 원본 종가 전체로 분석 (상태를 이어받는 경로)
+    sheet: 가격 캐시 없이 시트의 반올림 종가(소수 둘째 자리) + 마지막 날짜부터 새로 받은 원본 종가로 분석
+    """
+    price_cache = PriceCache(cache_dir=str(tmp_path / "prices")) if source == "price_cache" else None
+    start = (history.index[-1] - pd.DateOffset(years=3)).strftime('%Y-%m-%d')
+    sheet = None
+
+    for day in range(DAYS, 0, -1):
+        frame = history.iloc[:len(history) - day + 1]
+        end = frame.index[-1].strftime('%Y-%m-%d')
+        job = {'ticker': TICKER, 'start_date': start, 'existing_df': None, 'fetched': frame}
+        if price_cache is None and sheet is not None:
+            job['existing_df'] = sheet
+            job['fetched'] = frame[frame.index >= sheet.index[-1]]
+
+        incremental = run_day(job, price_cache, end, True, monkeypatch)
+        baseline = run_day(job, price_cache, end, False, monkeypatch)
+        assert_same_summary(incremental['summary'], baseline['summary'])
+
+        # 시트에는 종가가 소수 둘째 자리로 반올림되어 기록됩니다.
+        sheet = incremental['df'][['Close']].round(2)
+
+    state = RollingStatsState.load(TICKER)
+    assert state.last_date == history.index[-1]
+
+
+def test_state_rejects_rounded_history(history):
+    """종가가 반올림된 이력은 시작일/봉 수/마지막 종가가 같아도 저장된 상태를 이어받지 않습니다."""
+    window = settings.LOOKBACK_PERIOD
+    previous = history[['Close']].iloc[:-1].copy()
+    state = RollingStatsState.from_frame(MarketAnalyzer.calculate_statistics(previous, window=window), window)
+
+    rounded = history[['Close']].copy()
+    rounded.iloc[:-2, 0] = rounded['Close'].iloc[:-2].round(2)
+    assert not state.matches(rounded)
+    assert state.matches(history[['Close']].copy())
+
+    df, state = MarketAnalyzer.calculate_statistics_incremental(rounded, state, window=window)
+    expected = MarketAnalyzer.calculate_statistics(rounded[['Close']].copy(), window=window)
+    assert state.overall_std() == pytest.approx(expected['Return'].std(), rel=1e-12)
+    assert state.check_consistency(df, full=True) < settings.STATS_CONSISTENCY_TOLERANCE
+
+
+def test_last_bar_check_matches_full_check_and_detects_drift(history):
+    window = settings.LOOKBACK_PERIOD
+    df = history[['Close']].copy()
+    state = RollingStatsState.from_frame(MarketAnalyzer.calculate_statistics(df.iloc[:-3].copy(), window=window), window)
+    df, state = MarketAnalyzer.calculate_statistics_incremental(df, state, window=window)
+
+    assert state.check_consistency(df) < settings.STATS_CONSISTENCY_TOLERANCE
+    assert state.check_consistency(df, full=True) < settings.STATS_CONSISTENCY_TOLERANCE
+    expected = MarketAnalyzer.calculate_statistics(df[['Close']].copy(), window=window).iloc[-1]
+    trailing = RollingStatsState.trailing_statistics(df['Close'].to_numpy(), window)
+    for col in ('Vol_Std', 'SMA_Price', 'STD_Price', 'Z_Score'):
+        assert trailing[col] == pytest.approx(expected[col], rel=1e-12)
+
+    state.closes.mean *= 1.001
+    with pytest.raises(ValueError):
+        state.check_consistency(df)
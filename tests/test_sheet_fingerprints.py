@@ -0,0 +1,85 @@
+# tests/test_sheet_fingerprints.py
+"""
+시트 행 해시(SHEETS_FINGERPRINTS)로 바뀐 내용이 없는 실행의 쓰기를 건너뛰는지 확인합니다.
+같은 날 재실행은 시트 쓰기 요청이 없어야 하고, 날짜만 바뀐 실행(휴장일)은 분석일/최종 업데이트/종료날짜 칸만 씁니다.
+Yahoo/Sheets/Telegram은 benchmarks/fakes.py의 대체 구현으로 네트워크 없이 실행합니다.
+
+실행: python -m pytest tests
+"""
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import settings
+from benchmarks import fakes
+from benchmarks.synthetic import ticker_names
+
+SHEET_WRITES = ("sheets.batch_update", "sheets.values_batch_update")
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TICKERS", ticker_names(3))
+    for name, directory in (("PRICE_CACHE_DIR", "prices"), ("STATS_STATE_DIR", "stats"),
+                            ("SHEETS_PENDING_DIR", "sheets-pending"), ("SHEETS_FINGERPRINT_DIR", "sheets-fingerprints")):
+        monkeypatch.setattr(settings, name, str(tmp_path / directory))
+    monkeypatch.setattr(settings, "RESULT_DB_PATH", str(tmp_path / "results.sqlite"))
+    monkeypatch.setattr(settings, "SHEETS_FINGERPRINTS", True)
+    monkeypatch.setattr(settings, "SHEETS_WRITE_QUOTA_PER_MIN", 1e9)
+    with fakes.install() as (counter, spreadsheet, _):
+        yield counter, spreadsheet
+
+
+def run_main(tmp_path, monkeypatch, counter, name: str) -> dict:
+    """새 실행 기록(체크포인트)으로 main.main()을 실행하고 시트 쓰기 호출 수를 반환합니다."""
+    import main
+
+    monkeypatch.setattr(settings, "RUN_DIR", str(tmp_path / f"runs-{name}"))
+    counter.counts.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.main()
+    return {call: counter.counts[call] for call in SHEET_WRITES}
+
+
+def test_same_day_rerun_writes_nothing(offline, tmp_path, monkeypatch):
+    counter, spreadsheet = offline
+    first = run_main(tmp_path, monkeypatch, counter, "first")
+    assert sum(first.values()) > 0
+
+    rerun = run_main(tmp_path, monkeypatch, counter, "rerun")
+    assert rerun == {call: 0 for call in SHEET_WRITES}
+
+
+def test_next_day_refreshes_only_date_cells(offline, tmp_path, monkeypatch):
+    import main
+    from src import sheets_manager
+
+    counter, spreadsheet = offline
+    run_main(tmp_path, monkeypatch, counter, "first")
+    before = {title: worksheet.get_all_values() for title, worksheet in spreadsheet.sheets.items()}
+
+    tomorrow = datetime.now() + timedelta(days=1)
+
+    class NextDay(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return tomorrow
+
+    monkeypatch.setattr(main, "datetime", NextDay)
+    monkeypatch.setattr(sheets_manager, "datetime", NextDay)
+    writes = run_main(tmp_path, monkeypatch, counter, "next-day")
+    # 종목 시트와 Dashboard 플러시마다 값 쓰기 한 번 (서식/행 삽입 등 batch_update는 없음)
+    assert writes["sheets.batch_update"] == 0 and writes["sheets.values_batch_update"] > 0
+
+    day = tomorrow.strftime('%Y-%m-%d')
+    dashboard = spreadsheet.sheets["Dashboard"].get_all_values()
+    for row, old in zip(dashboard[1:], before["Dashboard"][1:]):
+        assert row[0] == day and row[7].startswith(day)
+        assert row[1:7] == old[1:7]
+    for ticker in settings.TICKERS:
+        values = spreadsheet.sheets[ticker].get_all_values()
+        assert values[2][1] == day
+        values[2][1] = before[ticker][2][1]
+        assert values == before[ticker]
@@ -0,0 +1,25 @@
+# tests/test_universe.py
+"""
+종목 목록 파일을 읽어도 설정(settings.TICKER_NAMES)이 바뀌지 않고, 파일별 종목명이 서로 섞이지 않는지 확인합니다.
+
+실행: python -m pytest tests
+"""
+from config import settings
+from src.universe import Universe
+
+
+def test_load_returns_names_without_touching_settings(tmp_path):
+    before = dict(settings.TICKER_NAMES)
+    first = tmp_path / "first.txt"
+    first.write_text("# 종목\nsoxl,반도체\nNEW1,첫 파일\nNEW1,중복\n\n", encoding="utf-8")
+    second = tmp_path / "second.txt"
+    second.write_text("NEW2\n", encoding="utf-8")
+
+    tickers, names = Universe.load(str(first))
+    assert tickers == ["SOXL", "NEW1"]
+    assert names["SOXL"] == "반도체" and names["NEW1"] == "첫 파일"
+
+    tickers, names = Universe.load(str(second))
+    assert tickers == ["NEW2"]
+    assert "NEW1" not in names and names.get("SOXL") == before.get("SOXL")
+    assert settings.TICKER_NAMES == before
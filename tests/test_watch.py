@@ -0,0 +1,74 @@
+# tests/test_watch.py
+"""
+장중 감시 트리거 가격과 시그널 전용 모드의 s1~s3가 일일 실행(main.analyze_ticker → build_summary)이
+시트/텔레그램에 내보내는 σ 매수가(current_price × (1 + s_k))와 같은지 확인합니다. 네트워크 없이 합성 시세와 임시 디렉터리로 실행합니다.
+
+실행: python -m pytest tests
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import settings
+from src.data_fetcher import DataFetcher
+from src.price_cache import PriceCache
+from src.watch import TriggerIndex
+from benchmarks.synthetic import make_ohlcv
+
+TICKERS = ["SYN0000", "SYN0001"]
+
+
+@pytest.fixture
+def local_state(tmp_path, monkeypatch):
+    """가격 캐시/이동 통계 상태/결과 저장소를 임시 디렉터리로 돌리고, 추가 수집은 빈 결과로 대체합니다."""
+    monkeypatch.setattr(settings, "STATS_STATE_DIR", str(tmp_path / "stats"))
+    monkeypatch.setattr(settings, "RESULT_DB_PATH", str(tmp_path / "results.sqlite"))
+    monkeypatch.setattr(
+        DataFetcher, "get_many", staticmethod(lambda tickers, *args, **kwargs: {t: pd.DataFrame() for t in tickers})
+    )
+    cache = PriceCache(cache_dir=str(tmp_path / "prices"))
+    yesterday = datetime.now() - timedelta(days=1)
+    for ticker in TICKERS:
+        cache.append(ticker, DataFetcher.normalize_index(make_ohlcv(ticker, years=5, end=yesterday)))
+    return cache
+
+
+def daily_summaries(cache: PriceCache) -> dict:
+    """일일 실행과 같은 경로(analyze_ticker)로 종목 요약을 만듭니다."""
+    import main
+
+    start = (datetime.now() - timedelta(days=365 * 3)).strftime('%Y-%m-%d')
+    end = datetime.now().strftime('%Y-%m-%d')
+    summaries = {}
+    for ticker in TICKERS:
+        job = {'ticker': ticker, 'start_date': start, 'existing_df': None, 'fetched': cache.load(ticker)}
+        summaries[ticker] = main.analyze_ticker(job, cache, end)[0]['summary']
+    return summaries
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+def test_sigma_triggers_match_daily_summary(local_state, monkeypatch, incremental):
+    # incremental=False: 저장된 상태 없이 가격 캐시의 분석 기간으로 다시 계산하는 경로
+    monkeypatch.setattr(settings, "STATS_INCREMENTAL", incremental)
+    summaries = daily_summaries(local_state)
+    index = TriggerIndex.build(TICKERS, local_state)
+
+    assert index.tickers == TICKERS
+    for row, ticker in enumerate(TICKERS):
+        summary = summaries[ticker]
+        assert index.prev_close[row] == pytest.approx(summary['current_price'], rel=1e-12)
+        expected = [summary['current_price'] * (1 + summary[key]) for key in ('s1', 's2', 's3')]
+        np.testing.assert_allclose(index.triggers[row, :3], expected, rtol=1e-9)
+
+
+def test_signals_scan_matches_daily_summary(local_state):
+    """signals --dashboard가 쓰는 s1~s3도 일일 실행과 같은 기준이어야 합니다 (같은 Dashboard 컬럼)."""
+    from src.signals import SignalScanner
+
+    summaries = daily_summaries(local_state)
+    for item in SignalScanner.scan(TICKERS, price_cache=local_state):
+        summary = summaries[item['ticker']]
+        for key in ('volatility', 's1', 's2', 's3'):
+            assert item[key] == pytest.approx(summary[key], rel=1e-9)